@@ -0,0 +1,37 @@
+import threading
+import unittest
+
+from uplaysync.change_feed import ChangeFeed, format_sse
+
+
+class ChangeFeedTests(unittest.TestCase):
+    def test_since_returns_events_after_cursor(self):
+        feed = ChangeFeed()
+        feed.publish('job', {'id': 'a'})
+        second = feed.publish('item', {'video_id': 'v1'})
+
+        self.assertEqual([event['id'] for event in feed.since(0)], [1, 2])
+        self.assertEqual(feed.since(second), [])
+        self.assertEqual(
+            format_sse(feed.since(1)[0]),
+            'id: 2\nevent: item\ndata: {"video_id":"v1"}\n\n',
+        )
+
+    def test_stale_or_foreign_cursor_requires_resync(self):
+        feed = ChangeFeed(capacity=2)
+        for i in range(4):
+            feed.publish('job', {'n': i})
+
+        self.assertIsNone(feed.since(1))
+        self.assertEqual([event['id'] for event in feed.since(2)], [3, 4])
+        self.assertIsNone(feed.since(99))
+
+    def test_waiting_reader_wakes_on_publish(self):
+        feed = ChangeFeed()
+        timer = threading.Timer(0.05, feed.publish, args=('snapshot', {'key': 'pl'}))
+        timer.start()
+
+        events = feed.since(0, timeout=2)
+
+        timer.join()
+        self.assertEqual([event['event'] for event in events], ['snapshot'])
@@ -38,3 +38,26 @@ class DownloaderTests(unittest.TestCase):
             self.assertTrue(opts['noplaylist'])
             self.assertIn('m4a', opts['format'])
             self.assertEqual(opts['postprocessors'][0]['preferredcodec'], 'm4a')
+
+    def test_progress_and_postprocessor_hooks_are_wired_into_ytdlp(self):
+        progress = []
+
+        class HookingYoutubeDL(FakeYoutubeDL):
+            def extract_info(self, url, download=True):
+                for hook in self.opts['progress_hooks']:
+                    hook({'status': 'finished', 'downloaded_bytes': 5})
+                for hook in self.opts['postprocessor_hooks']:
+                    hook({'status': 'started', 'postprocessor': 'FFmpegExtractAudio'})
+                    hook({'status': 'finished', 'postprocessor': 'FFmpegExtractAudio'})
+                return super().extract_info(url, download)
+
+        with tempfile.TemporaryDirectory() as td:
+            downloader = DirectYtdlpDownloader(youtubedl_cls=HookingYoutubeDL)
+            result = downloader.download(
+                url='https://youtu.be/abc', video_id='abc', title='Fake Title', folder=td, progress_hook=progress.append,
+            )
+
+            self.assertTrue(result.ok)
+            self.assertEqual(progress, [{'status': 'finished', 'downloaded_bytes': 5}])
+            self.assertIsNotNone(result.postprocess_seconds)
+            self.assertGreaterEqual(result.postprocess_seconds, 0.0)
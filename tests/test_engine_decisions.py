@@ -1,4 +1,5 @@
 import tempfile
+import time
 import unittest
 from pathlib import Path
 
@@ -175,3 +176,368 @@ class EngineDecisionTests(unittest.TestCase):
             self.assertEqual(result['summary']['failed'], 0)
             self.assertEqual(result['summary']['downloaded'], 0)
             self.assertEqual(result['summary']['skipped'], 1)
+
+    def test_journal_mode_compacts_into_snapshot_at_end_of_run(self):
+        with tempfile.TemporaryDirectory() as td:
+            folder = Path(td)
+            fake = FakeDownloader()
+            result = engine.sync_playlists(
+                {'playlists': [{'name': 'P', 'url': 'playlist', 'folder': str(folder)}]},
+                state_path=folder / 'sync_state.json',
+                id_map_path=folder / 'id_map.json',
+                history_path=folder / 'download_history.json',
+                playlist_provider=lambda _: [
+                    {'id': 'a1', 'title': 'Song A', 'url': 'a1'},
+                    {'id': 'b1', 'title': 'Song B', 'url': 'b1'},
+                ],
+                downloader=fake,
+                journal_compact_every=100,
+            )
+
+            self.assertEqual(result['summary']['downloaded'], 2)
+            self.assertFalse(state.journal_path_for(folder / 'sync_state.json').exists())
+            saved = state.load_state_file(folder / 'sync_state.json')
+            self.assertEqual(saved['history'], ['a1', 'b1'])
+
+    def test_playlists_are_prefetched_concurrently_but_processed_in_order(self):
+        import threading
+
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            barrier = threading.Barrier(3, timeout=5)
+
+            def provider(url):
+                barrier.wait()
+                return [{'id': f'{url}-1', 'title': f'Song {url}', 'url': f'{url}-1'}]
+
+            playlists = [
+                {'name': name, 'url': name, 'folder': str(root / name)}
+                for name in ('A', 'B', 'C')
+            ]
+            for playlist in playlists:
+                Path(playlist['folder']).mkdir()
+            fake = FakeDownloader()
+            engine.sync_playlists(
+                {'playlists': playlists},
+                state_path=root / 'sync_state.json',
+                id_map_path=root / 'id_map.json',
+                history_path=root / 'download_history.json',
+                playlist_provider=provider,
+                downloader=fake,
+                max_parallel_playlist_fetches=3,
+            )
+
+            self.assertEqual([call[1] for call in fake.calls], ['A-1', 'B-1', 'C-1'])
+
+    def test_download_concurrency_runs_workers_in_parallel_without_path_collisions(self):
+        import threading
+        import time
+
+        class ParallelDownloader(FakeDownloader):
+            def __init__(self):
+                super().__init__()
+                self.lock = threading.Lock()
+                self.active = set()
+                self.max_active = 0
+                self.collisions = 0
+
+            def download(self, *, url, video_id, title, folder):
+                key = (folder, title)
+                with self.lock:
+                    if key in self.active:
+                        self.collisions += 1
+                    self.active.add(key)
+                    self.max_active = max(self.max_active, len(self.active))
+                time.sleep(0.05)
+                try:
+                    return super().download(url=url, video_id=video_id, title=title, folder=folder)
+                finally:
+                    with self.lock:
+                        self.active.discard(key)
+
+        with tempfile.TemporaryDirectory() as td:
+            folder = Path(td)
+            items = [{'id': f'v{i}', 'title': f'Song {i}', 'url': f'v{i}'} for i in range(6)]
+            items.append({'id': 'dup', 'title': 'Song 0', 'url': 'dup'})
+            fake = ParallelDownloader()
+            result = engine.sync_playlists(
+                {'playlists': [{'name': 'P', 'url': 'playlist', 'folder': str(folder)}]},
+                state_path=folder / 'sync_state.json',
+                id_map_path=folder / 'id_map.json',
+                history_path=folder / 'download_history.json',
+                playlist_provider=lambda _: items,
+                downloader=fake,
+                download_concurrency=3,
+            )
+
+            self.assertGreater(fake.max_active, 1)
+            self.assertEqual(fake.collisions, 0)
+            self.assertEqual(result['summary']['downloaded'], 7)
+            self.assertEqual(len(result['state']['history']), 7)
+
+    def test_download_pool_applies_results_in_submission_order(self):
+        import time
+
+        class SlowFirstDownloader(FakeDownloader):
+            def download(self, *, url, video_id, title, folder):
+                time.sleep(0.2 if video_id == 'v0' else 0.01)
+                return super().download(url=url, video_id=video_id, title=title, folder=folder)
+
+        with tempfile.TemporaryDirectory() as td:
+            folder = Path(td)
+            items = [{'id': f'v{i}', 'title': f'Song {i}', 'url': f'v{i}'} for i in range(6)]
+            finished = []
+            result = engine.sync_playlists(
+                {'playlists': [{'name': 'P', 'url': 'playlist', 'folder': str(folder)}]},
+                state_path=folder / 'sync_state.json',
+                id_map_path=folder / 'id_map.json',
+                history_path=folder / 'download_history.json',
+                playlist_provider=lambda _: items,
+                downloader=SlowFirstDownloader(),
+                download_concurrency=3,
+                log=finished.append,
+            )
+
+            self.assertEqual(result['state']['history'], [f'v{i}' for i in range(6)])
+            self.assertEqual(
+                [line for line in finished if line.startswith('  [완료]')],
+                [f'  [완료] Song {i} -> Song {i}.m4a' for i in range(6)],
+            )
+
+    def test_streamed_entries_download_before_playlist_is_exhausted(self):
+        with tempfile.TemporaryDirectory() as td:
+            folder = Path(td)
+            fake = FakeDownloader()
+            seen_calls = []
+
+            def provider(_url):
+                yield {'id': 'a1', 'title': 'First', 'url': 'a1'}
+                seen_calls.append(len(fake.calls))
+                yield {'id': 'b1', 'title': 'Second', 'url': 'b1'}
+
+            result = engine.sync_playlists(
+                {'playlists': [{'name': 'P', 'url': 'playlist', 'folder': str(folder)}]},
+                state_path=folder / 'sync_state.json',
+                id_map_path=folder / 'id_map.json',
+                history_path=folder / 'download_history.json',
+                playlist_provider=provider,
+                downloader=fake,
+                stream_playlists=True,
+            )
+
+            self.assertEqual(seen_calls, [1])
+            self.assertEqual(result['summary']['downloaded'], 2)
+            snapshot = next(iter(result['state']['playlist_snapshots'].values()))
+            self.assertEqual([item['video_id'] for item in snapshot['items']], ['a1', 'b1'])
+
+    def test_shared_state_is_mutated_under_lock_but_downloads_run_outside_it(self):
+        import threading
+
+        with tempfile.TemporaryDirectory() as td:
+            folder = Path(td)
+            shared = state.empty_state()
+            lock = threading.Lock()
+            saved = []
+            lines = []
+
+            class LockCheckingDownloader(FakeDownloader):
+                def download(self, **kwargs):
+                    assert not lock.locked()
+                    return super().download(**kwargs)
+
+            def on_state_saved(current):
+                self.assertTrue(lock.locked())
+                saved.append(current)
+
+            result = engine.sync_playlists(
+                {'playlists': [{'name': 'P', 'url': 'playlist', 'folder': str(folder)}]},
+                state_path=folder / 'sync_state.json',
+                id_map_path=folder / 'id_map.json',
+                history_path=folder / 'download_history.json',
+                playlist_provider=lambda _: [{'id': 'a1', 'title': 'First', 'url': 'a1'}],
+                downloader=LockCheckingDownloader(),
+                state=shared,
+                state_lock=lock,
+                on_state_saved=on_state_saved,
+                log=lines.append,
+            )
+
+            self.assertIs(result['state'], shared)
+            self.assertEqual(shared['items']['a1']['status'], 'downloaded')
+            self.assertTrue(saved and all(current is shared for current in saved))
+            self.assertIn('[다운로드] First', lines)
+            self.assertEqual(state.load_state_file(folder / 'sync_state.json')['items']['a1']['status'], 'downloaded')
+
+    def test_on_state_saved_skips_blocks_that_did_not_change_the_state(self):
+        import threading
+
+        with tempfile.TemporaryDirectory() as td:
+            folder = Path(td)
+            shared = state.empty_state()
+            items = []
+            for index in range(3):
+                video_id, title = f'v{index}', f'Song {index}'
+                (folder / f'{title}.m4a').write_text('audio', encoding='utf-8')
+                state.record_downloaded(
+                    shared, video_id=video_id, title=title, url=video_id,
+                    playlist_name='P', folder=str(folder), filename=f'{title}.m4a',
+                )
+                items.append({'id': video_id, 'title': title, 'url': video_id})
+            saved = []
+
+            result = engine.sync_playlists(
+                {'playlists': [{'name': 'P', 'url': 'playlist', 'folder': str(folder)}]},
+                state_path=folder / 'sync_state.json',
+                id_map_path=folder / 'id_map.json',
+                history_path=folder / 'download_history.json',
+                playlist_provider=lambda _: items,
+                downloader=FakeDownloader(),
+                state=shared,
+                state_lock=threading.Lock(),
+                on_state_saved=saved.append,
+                log=lambda line: None,
+            )
+
+            self.assertEqual(result['summary']['already_synced'], 3)
+            # The playlist snapshot and the final save; the three read-only decisions don't count.
+            self.assertEqual(len(saved), 2)
+
+    def test_cancel_event_stops_the_run_and_skips_cancelled_results(self):
+        import threading
+
+        with tempfile.TemporaryDirectory() as td:
+            folder = Path(td)
+            cancel = threading.Event()
+            calls = []
+
+            class CancellingDownloader:
+                def download(self, *, url, video_id, title, folder, cancel_event=None):
+                    calls.append(video_id)
+                    cancel_event.set()
+                    return DownloadResult(False, video_id, title, url, error='download cancelled', cancelled=True)
+
+            result = engine.sync_playlists(
+                {'playlists': [{'name': 'P', 'url': 'playlist', 'folder': str(folder)}]},
+                state_path=folder / 'sync_state.json',
+                id_map_path=folder / 'id_map.json',
+                history_path=folder / 'download_history.json',
+                playlist_provider=lambda _: [
+                    {'id': 'a1', 'title': 'First', 'url': 'a1'},
+                    {'id': 'b1', 'title': 'Second', 'url': 'b1'},
+                ],
+                downloader=CancellingDownloader(),
+                cancel_event=cancel,
+                log=lambda _line: None,
+            )
+
+            self.assertEqual(calls, ['a1'])
+            self.assertTrue(result['summary']['cancelled'])
+            self.assertEqual(result['summary']['failed'], 0)
+            self.assertNotEqual(result['state']['items']['a1'].get('status'), 'failed')
+
+    def test_on_event_reports_decisions_downloads_and_playlist_timings(self):
+        with tempfile.TemporaryDirectory() as td:
+            folder = Path(td)
+            (folder / 'Have.m4a').write_text('audio', encoding='utf-8')
+            received = []
+            lines = []
+
+            class ProgressDownloader(FakeDownloader):
+                def download(self, *, progress_hook=None, **kwargs):
+                    progress_hook({'status': 'finished', 'downloaded_bytes': 5, 'total_bytes': 5})
+                    return super().download(**kwargs)
+
+            engine.sync_playlists(
+                {'playlists': [{'name': 'P', 'url': 'playlist', 'folder': str(folder)}]},
+                state_path=folder / 'sync_state.json',
+                id_map_path=folder / 'id_map.json',
+                history_path=folder / 'download_history.json',
+                playlist_provider=lambda _: [
+                    {'id': 'h1', 'title': 'Have', 'url': 'h1'},
+                    {'id': 'n1', 'title': 'New', 'url': 'n1'},
+                ],
+                downloader=ProgressDownloader(),
+                on_event=received.append,
+                log=lines.append,
+            )
+
+            by_type = {}
+            for event in received:
+                by_type.setdefault(event.type, []).append(event.data)
+            self.assertEqual(
+                [(data['video_id'], data['queued'], data['reason']) for data in by_type['item_decided']],
+                [('h1', False, 'existing title-compatible file'), ('n1', True, 'new item')],
+            )
+            self.assertEqual(by_type['download_progress'][0]['downloaded_bytes'], 5)
+            finished = by_type['download_finished'][0]
+            self.assertEqual((finished['video_id'], finished['ok'], finished['bytes']), ('n1', True, 5))
+            playlist = by_type['playlist_finished'][0]
+            self.assertEqual((playlist['total'], playlist['checked'], playlist['queued']), (2, 2, 1))
+            self.assertGreaterEqual(playlist['seconds'], playlist['fetch_seconds'])
+            self.assertEqual(by_type['sync_finished'][0]['summary']['downloaded'], 1)
+            self.assertIn('[다운로드] New', lines)
+
+    def test_prefetched_playlists_report_fetch_and_wait_time_separately(self):
+        with tempfile.TemporaryDirectory() as td:
+            folder = Path(td)
+
+            def slow_provider(url):
+                time.sleep(0.1)
+                return [{'id': f'{url}1', 'title': f'Song {url}', 'url': f'{url}1'}]
+
+            result = engine.sync_playlists(
+                {'playlists': [
+                    {'name': 'A', 'url': 'a', 'folder': str(folder)},
+                    {'name': 'B', 'url': 'b', 'folder': str(folder)},
+                ]},
+                state_path=folder / 'sync_state.json',
+                id_map_path=folder / 'id_map.json',
+                history_path=folder / 'download_history.json',
+                playlist_provider=slow_provider,
+                downloader=FakeDownloader(),
+                max_parallel_playlist_fetches=2,
+                log=lambda _line: None,
+            )
+
+            playlists = result['summary']['timings']['playlists']
+            for name in ('A', 'B'):
+                self.assertGreaterEqual(playlists[name]['playlist_fetch']['seconds'], 0.1)
+                self.assertEqual(playlists[name]['playlist_wait']['count'], 1)
+            # B was fetched while A was processed, so the loop barely waited for it.
+            self.assertLess(playlists['B']['playlist_wait']['seconds'], playlists['B']['playlist_fetch']['seconds'])
+
+    def test_summary_includes_phase_timings_overall_and_per_playlist(self):
+        with tempfile.TemporaryDirectory() as td:
+            folder = Path(td)
+
+            class PostprocessingDownloader(FakeDownloader):
+                def download(self, **kwargs):
+                    result = super().download(**kwargs)
+                    result.postprocess_seconds = 0.0
+                    return result
+
+            result = engine.sync_playlists(
+                {'playlists': [{'name': 'P', 'url': 'playlist', 'folder': str(folder)}]},
+                state_path=folder / 'sync_state.json',
+                id_map_path=folder / 'id_map.json',
+                history_path=folder / 'download_history.json',
+                playlist_provider=lambda _: [
+                    {'id': 'a1', 'title': 'First', 'url': 'a1'},
+                    {'id': 'b1', 'title': 'Second', 'url': 'b1'},
+                ],
+                downloader=PostprocessingDownloader(),
+                log=lambda _line: None,
+            )
+
+            summary = result['summary']
+            phases = summary['timings']['phases']
+            self.assertEqual(phases['matching']['count'], 2)
+            self.assertEqual(phases['download']['count'], 2)
+            self.assertEqual(phases['postprocess']['count'], 2)
+            self.assertEqual(phases['folder_scan']['count'], 1)
+            self.assertEqual(phases['playlist_fetch']['count'], 1)
+            # Two per-item saves plus the final one, which is not attributed to a playlist.
+            self.assertEqual(phases['state_save']['count'], 3)
+            self.assertEqual(summary['timings']['playlists']['P']['state_save']['count'], 2)
+            self.assertGreaterEqual(summary['seconds'], phases['download']['seconds'])
+            self.assertTrue(summary['started_at'] <= summary['finished_at'])
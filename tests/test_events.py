@@ -0,0 +1,54 @@
+import unittest
+from unittest import mock
+
+from uplaysync import events
+from uplaysync.events import ConsoleSink, EventBus, SyncEvent
+
+
+class EventBusTests(unittest.TestCase):
+    def test_failing_sink_does_not_stop_other_sinks(self):
+        received = []
+
+        def broken(_event):
+            raise RuntimeError('sink bug')
+
+        bus = EventBus(broken, None, received.append)
+        with self.assertLogs('uplaysync.events', level='ERROR'):
+            bus.emit(events.ITEM_DECIDED, title='Song', queued=False, reason='user trashed')
+
+        self.assertEqual(len(received), 1)
+        self.assertEqual(received[0].to_dict()['reason'], 'user trashed')
+
+    def test_download_progress_hook_is_throttled_but_keeps_final_status(self):
+        received = []
+        bus = EventBus(received.append)
+        hook = bus.download_progress({'playlist_name': 'P', 'video_id': 'a1', 'title': 'Song'})
+        with mock.patch('uplaysync.events.time.monotonic', side_effect=[10.0, 10.1, 10.2, 10.8]):
+            hook({'status': 'downloading', 'downloaded_bytes': 1, 'total_bytes': 10})
+            hook({'status': 'downloading', 'downloaded_bytes': 2, 'total_bytes': 10})
+            hook({'status': 'finished', 'downloaded_bytes': 10, 'total_bytes': 10})
+            hook({'status': 'downloading', 'downloaded_bytes': 3, 'total_bytes_estimate': 12})
+
+        self.assertEqual([event.data['downloaded_bytes'] for event in received], [1, 10, 3])
+        self.assertEqual(received[-1].data['total_bytes'], 12)
+
+
+class ConsoleSinkTests(unittest.TestCase):
+    def test_renders_the_existing_progress_lines(self):
+        lines = []
+        sink = ConsoleSink(lines.append)
+        sink(SyncEvent(events.PLAYLIST_STARTED, {'playlist': 'P'}))
+        sink(SyncEvent(events.PLAYLIST_FETCHED, {'streamed': False, 'total': 2}))
+        sink(SyncEvent(events.ITEM_DECIDED, {'title': 'Old', 'queued': False, 'reason': 'state file exists'}))
+        sink(SyncEvent(events.ITEM_DECIDED, {'title': 'Gone', 'queued': True, 'reason': 'state file missing'}))
+        sink(SyncEvent(events.DOWNLOAD_FINISHED, {'title': 'Gone', 'ok': True, 'filename': 'Gone.m4a'}))
+        sink(SyncEvent(events.DOWNLOAD_FINISHED, {'title': 'Bad', 'ok': False, 'error': 'blocked'}))
+        sink(SyncEvent(events.DOWNLOAD_PROGRESS, {'title': 'Gone', 'downloaded_bytes': 1}))
+
+        self.assertEqual(lines, [
+            '\n플레이리스트 처리 중: P',
+            '플레이리스트에서 2개의 항목을 발견했습니다.',
+            '[재다운로드] Gone',
+            '  [완료] Gone -> Gone.m4a',
+            '  [오류] Bad: blocked',
+        ])
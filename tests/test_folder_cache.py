@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from uplaysync import matching
+from uplaysync.folder_cache import MTIME_SETTLE_NS, FolderIndexCache
+
+
+class FolderIndexCacheTests(unittest.TestCase):
+    def _age_folder(self, folder):
+        old = os.stat(folder).st_mtime_ns - 10 * MTIME_SETTLE_NS
+        os.utime(folder, ns=(old, old))
+
+    def test_unchanged_folder_is_served_from_persisted_index(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            folder = root / 'music'
+            folder.mkdir()
+            (folder / 'Hot!.m4a').write_text('audio', encoding='utf-8')
+            self._age_folder(folder)
+            cache_path = root / 'folder_index_cache.json'
+            first = FolderIndexCache(cache_path)
+            self.assertEqual(dict(first.get_existing_files(folder)), {'hot': 'Hot!.m4a'})
+            first.save()
+
+            second = FolderIndexCache(cache_path)
+            index = second.get_existing_files(folder)
+
+            self.assertEqual((second.hits, second.misses), (1, 0))
+            self.assertIsInstance(index, matching.FolderIndex)
+            self.assertEqual(matching.find_existing_file_match('Hot!', index), 'Hot!.m4a')
+
+    def test_entry_whose_count_does_not_match_its_files_is_dropped_and_rescanned(self):
+        import json
+
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            folder = root / 'music'
+            folder.mkdir()
+            (folder / 'Hot!.m4a').write_text('audio', encoding='utf-8')
+            (folder / 'Cold.m4a').write_text('audio', encoding='utf-8')
+            self._age_folder(folder)
+            cache_path = root / 'folder_index_cache.json'
+            first = FolderIndexCache(cache_path)
+            first.get_existing_files(folder)
+            first.save()
+            raw = json.loads(cache_path.read_text(encoding='utf-8'))
+            entry = raw['folders'][os.path.abspath(folder)]
+            entry['files'] = entry['files'][:1]  # truncated listing, count still 2
+            cache_path.write_text(json.dumps(raw), encoding='utf-8')
+
+            second = FolderIndexCache(cache_path)
+            index = second.get_existing_files(folder)
+            second.save()
+
+            self.assertEqual((second.hits, second.misses), (0, 1))
+            self.assertEqual(dict(index), {'hot': 'Hot!.m4a', 'cold': 'Cold.m4a'})
+            repaired = json.loads(cache_path.read_text(encoding='utf-8'))['folders'][os.path.abspath(folder)]
+            self.assertEqual(len(repaired['files']), repaired['count'])
+
+    def test_changed_or_recent_folder_is_rescanned(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            folder = root / 'music'
+            folder.mkdir()
+            cache_path = root / 'folder_index_cache.json'
+            cache = FolderIndexCache(cache_path)
+            cache.get_existing_files(folder)
+            cache.save()
+
+            recent = FolderIndexCache(cache_path)
+            recent.get_existing_files(folder)
+            self.assertEqual(recent.misses, 1)
+
+            (folder / 'New.m4a').write_text('audio', encoding='utf-8')
+            changed = FolderIndexCache(cache_path)
+            self.assertEqual(dict(changed.get_existing_files(folder)), {'new': 'New.m4a'})
+            self.assertEqual(changed.misses, 1)
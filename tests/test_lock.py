@@ -0,0 +1,53 @@
+import threading
+import unittest
+
+from uplaysync.lock import SyncGate
+
+
+class SyncGateTests(unittest.TestCase):
+    def test_waiter_acquires_as_soon_as_holder_releases(self):
+        gate = SyncGate()
+        self.assertTrue(gate.acquire(blocking=False))
+        self.assertFalse(gate.acquire(blocking=False))
+        acquired = threading.Event()
+
+        def waiter():
+            if gate.acquire_unless(lambda: False):
+                acquired.set()
+
+        thread = threading.Thread(target=waiter)
+        thread.start()
+        self.assertFalse(acquired.wait(0.1))
+        gate.release()
+        self.assertTrue(acquired.wait(1))
+        thread.join(1)
+        self.assertTrue(gate.locked())
+
+    def test_wake_lets_waiter_abort_without_acquiring(self):
+        gate = SyncGate()
+        gate.acquire()
+        cancel = threading.Event()
+        results = []
+        thread = threading.Thread(target=lambda: results.append(gate.acquire_unless(cancel.is_set)))
+        thread.start()
+        cancel.set()
+        gate.wake()
+        thread.join(1)
+
+        self.assertEqual(results, [False])
+        self.assertTrue(gate.locked())
+        gate.release()
+        self.assertFalse(gate.locked())
+
+    def test_shared_holders_run_together_and_exclude_exclusive(self):
+        gate = SyncGate()
+        self.assertTrue(gate.acquire_shared_unless(lambda: False))
+        self.assertTrue(gate.acquire_shared_unless(lambda: False))
+        self.assertFalse(gate.acquire(blocking=False))
+        gate.release_shared()
+        gate.release_shared()
+        self.assertTrue(gate.acquire(blocking=False))
+        cancel = threading.Event()
+        cancel.set()
+        self.assertFalse(gate.acquire_shared_unless(cancel.is_set))
+        gate.release()
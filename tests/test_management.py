@@ -130,3 +130,239 @@ class ManagementViewFilteringTests(unittest.TestCase):
         self.assertNotIn('orphan_items', view)
         self.assertNotIn('orphan_items', view['summary'])
         self.assertEqual(view['summary']['items'], 0)
+
+
+class RefreshAllPlaylistsTests(unittest.TestCase):
+    def test_refresh_all_records_snapshots_and_reports_failures(self):
+        def provider(url):
+            if url == 'broken':
+                raise RuntimeError('private playlist')
+            return [{'id': f'{url}1', 'title': f'{url} song', 'url': f'{url}1'}]
+
+        st = state.empty_state()
+        config = {'playlists': [
+            {'name': 'A', 'url': 'a', 'folder': '/tmp/a'},
+            {'name': 'Broken', 'url': 'broken', 'folder': '/tmp/b'},
+            {'name': 'C', 'url': 'c', 'folder': '/tmp/c'},
+        ]}
+
+        result = management.refresh_all_playlist_snapshots(st, config, playlist_provider=provider, max_workers=3)
+
+        self.assertEqual([snap['name'] for snap in result['snapshots']], ['A', 'C'])
+        self.assertEqual(result['errors'], [{'index': 1, 'error': 'private playlist'}])
+        self.assertEqual(len(st['playlist_snapshots']), 2)
+
+
+class QueuePriorityTests(unittest.TestCase):
+    def _state_with_snapshot(self, root, count):
+        st = state.empty_state()
+        management.record_playlist_snapshot(
+            st,
+            {'name': 'P', 'url': 'playlist-url', 'folder': str(root)},
+            [{'id': f'v{i}', 'title': f'Song {i}', 'url': f'v{i}'} for i in range(count)],
+            index=0,
+        )
+        return st
+
+    def test_interactive_jobs_jump_bulk_backlog_and_bump_reorders(self):
+        with tempfile.TemporaryDirectory() as td:
+            st = self._state_with_snapshot(Path(td), 5)
+            bulk = [management.enqueue_item(st, f'v{i}')[0] for i in range(4)]
+            interactive, _ = management.enqueue_item(st, 'v4', priority=management.QUEUE_PRIORITY_INTERACTIVE)
+
+            self.assertIs(management.next_queued_job(st), interactive)
+            interactive['status'] = 'running'
+            self.assertIs(management.next_queued_job(st), bulk[0])
+
+            management.bump_queue_job(st, bulk[2]['id'])
+            self.assertIs(management.next_queued_job(st), bulk[2])
+            self.assertGreater(bulk[2]['priority'], management.QUEUE_PRIORITY_BULK)
+
+            bulk[2]['status'] = 'canceled'
+            busy = {management.queue_job_path_key(bulk[0])}
+            self.assertIs(management.next_queued_job(st, exclude_paths=busy), bulk[1])
+            self.assertIs(management.next_queued_job(st), bulk[0])
+
+    def test_interactive_enqueue_raises_priority_of_existing_bulk_job(self):
+        with tempfile.TemporaryDirectory() as td:
+            st = self._state_with_snapshot(Path(td), 2)
+            first, _ = management.enqueue_item(st, 'v0')
+            second, _ = management.enqueue_item(st, 'v1')
+
+            again, created = management.enqueue_item(st, 'v1', priority=management.QUEUE_PRIORITY_INTERACTIVE)
+
+            self.assertFalse(created)
+            self.assertIs(again, second)
+            self.assertIs(management.next_queued_job(st), second)
+            with self.assertRaises(ValueError):
+                second['status'] = 'running'
+                management.bump_queue_job(st, second['id'])
+            self.assertIs(management.next_queued_job(st), first)
+
+    def test_order_survives_compaction_and_plain_dict_state(self):
+        with tempfile.TemporaryDirectory() as td:
+            st = self._state_with_snapshot(Path(td), 3)
+            jobs = [management.enqueue_item(st, f'v{i}')[0] for i in range(3)]
+            jobs[0]['status'] = 'completed'
+            management.compact_queue(st, keep_finished=0)
+            self.assertIs(management.next_queued_job(st), jobs[1])
+
+            plain = dict(st)
+            management.bump_queue_job(plain, jobs[2]['id'])
+            self.assertIs(management.next_queued_job(plain), jobs[2])
+
+
+class ManagementViewIndexTests(unittest.TestCase):
+    def test_view_lists_each_folder_once_and_matches_per_item_status(self):
+        import os
+        from unittest import mock
+
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            st = state.empty_state()
+            items = [{'id': f'v{i}', 'title': f'Song {i}', 'url': f'v{i}'} for i in range(6)]
+            management.record_playlist_snapshot(st, {'name': 'P', 'url': 'pl', 'folder': str(root)}, items, index=0)
+            for i in range(4):
+                if i != 1:
+                    (root / f'Song {i}.m4a').write_text('audio', encoding='utf-8')
+                state.record_downloaded(
+                    st,
+                    video_id=f'v{i}',
+                    title=f'Song {i}',
+                    url=f'v{i}',
+                    playlist_name='P',
+                    folder=str(root),
+                    filename=f'Song {i}.m4a',
+                )
+            management.enqueue_item(st, 'v5')
+            config = {'playlists': [{'name': 'P', 'url': 'pl', 'folder': str(root)}]}
+
+            with mock.patch('uplaysync.state.os.scandir', wraps=os.scandir) as scandir:
+                view = management.build_management_view(config, st)
+
+            self.assertEqual(scandir.call_count, 1)
+            statuses = [item['status'] for item in view['playlists'][0]['items']]
+            expected = [management.status_for_item(st, item)[0] for item in st['playlist_snapshots'][view['playlists'][0]['key']]['items']]
+            self.assertEqual(statuses, expected)
+            self.assertEqual(statuses, ['downloaded', 'missing', 'downloaded', 'downloaded', 'not_downloaded', 'queued'])
+
+
+class ManagementViewPagingTests(unittest.TestCase):
+    def _fixture(self, root):
+        st = state.empty_state()
+        config = {'playlists': [
+            {'name': 'A', 'url': 'pl-a', 'folder': str(root)},
+            {'name': 'B', 'url': 'pl-b', 'folder': str(root)},
+        ]}
+        management.record_playlist_snapshot(
+            st, config['playlists'][0], [{'id': f'a{i}', 'title': f'A {i}', 'url': f'a{i}'} for i in range(5)], index=0
+        )
+        management.record_playlist_snapshot(st, config['playlists'][1], [{'id': 'b0', 'title': 'B 0', 'url': 'b0'}], index=1)
+        for i in (1, 3):
+            state.record_failure(st, video_id=f'a{i}', title=f'A {i}', url=f'a{i}', playlist_name='A', folder=str(root), reason='x')
+        return config, st
+
+    def test_status_filter_and_paging_keep_full_counts(self):
+        with tempfile.TemporaryDirectory() as td:
+            config, st = self._fixture(Path(td))
+
+            view = management.build_management_view(config, st, playlists=['0'], statuses=['not_downloaded'], offset=1, limit=1)
+
+            self.assertEqual(len(view['playlists']), 1)
+            playlist = view['playlists'][0]
+            self.assertEqual([item['video_id'] for item in playlist['items']], ['a2'])
+            self.assertEqual(playlist['matched'], 3)
+            self.assertEqual(playlist['counts'], {'not_downloaded': 3, 'failed': 2})
+            self.assertEqual(view['summary']['items'], 6)
+
+    def test_summary_only_omits_rows_and_limits_lists(self):
+        with tempfile.TemporaryDirectory() as td:
+            config, st = self._fixture(Path(td))
+            for i in range(3):
+                management.enqueue_item(st, f'a{i}')
+
+            view = management.build_management_view(config, st, summary_only=True, queue_limit=1)
+
+            self.assertEqual([p['items'] for p in view['playlists']], [[], []])
+            self.assertEqual(view['playlists'][0]['matched'], 5)
+            self.assertEqual([job['video_id'] for job in view['queue']], ['a2'])
+            self.assertEqual(view['summary']['queue'], 3)
+            with self.assertRaises(ValueError):
+                management.build_management_view(config, st, statuses=['bogus'])
+
+
+class SnapshotVideoIndexTests(unittest.TestCase):
+    def test_context_lookup_follows_rerecorded_and_replaced_snapshots(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            st = state.empty_state()
+            a = {'name': 'A', 'url': 'pl-a', 'folder': str(root / 'a')}
+            b = {'name': 'B', 'url': 'pl-b', 'folder': str(root / 'b')}
+            management.record_playlist_snapshot(st, a, [{'id': 'v1', 'title': 'One', 'url': 'v1'}], index=0)
+            management.record_playlist_snapshot(st, b, [{'id': 'v2', 'title': 'Two', 'url': 'v2'}, {'id': 'v1', 'title': 'One', 'url': 'v1'}], index=1)
+
+            self.assertEqual(management.item_context_for_video(st, 'v1')['folder'], a['folder'])
+            management.record_playlist_snapshot(st, a, [{'id': 'v3', 'title': 'Three', 'url': 'v3'}], index=0)
+            self.assertEqual(management.item_context_for_video(st, 'v1')['folder'], b['folder'])
+            self.assertIsNone(management.item_context_for_video(st, 'v9'))
+
+            key_b = management.playlist_key(b, 1)
+            st['playlist_snapshots'][key_b]['items'] = [{'video_id': 'v4', 'title': 'Four', 'url': 'v4', 'folder': b['folder']}]
+            self.assertIsNone(management.item_context_for_video(st, 'v1'))
+            self.assertEqual(management.item_context_for_video(st, 'v4')['title'], 'Four')
+
+    def test_bulk_enqueue_uses_indexes_instead_of_scanning(self):
+        from unittest import mock
+
+        with tempfile.TemporaryDirectory() as td:
+            st = state.empty_state()
+            items = [{'id': f'v{i}', 'title': f'Song {i}', 'url': f'v{i}'} for i in range(50)]
+            management.record_playlist_snapshot(st, {'name': 'P', 'url': 'pl', 'folder': td}, items, index=0)
+            for i in range(50):
+                management.enqueue_item(st, f'v{i}')
+
+            with mock.patch.object(management.SnapshotVideoIndex, '__init__', side_effect=AssertionError('rebuilt')):
+                job, created = management.enqueue_item(st, 'v7')
+                management.cancel_queue_job(st, job['id'])
+                again, created_again = management.enqueue_item(st, 'v7')
+
+            self.assertFalse(created)
+            self.assertTrue(created_again)
+            self.assertNotEqual(again['id'], job['id'])
+
+
+class BulkOperationTests(unittest.TestCase):
+    def test_bulk_enqueue_selected_statuses_and_report_per_item_results(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            st = state.empty_state()
+            playlist = {'name': 'P', 'url': 'pl', 'folder': str(root)}
+            items = [{'id': f'v{i}', 'title': f'Song {i}', 'url': f'v{i}'} for i in range(4)]
+            management.record_playlist_snapshot(st, playlist, items, index=0)
+            state.record_downloaded(st, video_id='v0', title='Song 0', url='v0', playlist_name='P', folder=str(root), filename='Song 0.m4a')
+            state.record_failure(st, video_id='v1', title='Song 1', url='v1', playlist_name='P', folder=str(root), reason='x')
+            (root / 'Song 2.m4a').write_text('audio', encoding='utf-8')
+            state.record_downloaded(st, video_id='v2', title='Song 2', url='v2', playlist_name='P', folder=str(root), filename='Song 2.m4a')
+
+            selected = management.select_playlist_items({'playlists': [playlist]}, st, 0, ['missing', 'failed'])
+            results = management.bulk_enqueue(st, ['ghost', *selected], statuses=selected)
+
+            self.assertEqual(selected, {'v0': 'missing', 'v1': 'failed'})
+            self.assertEqual([(r['video_id'], r['ok']) for r in results], [('ghost', False), ('v0', True), ('v1', True)])
+            self.assertEqual(results[0]['code'], 404)
+            self.assertEqual([r['job']['action'] for r in results[1:]], ['redownload', 'retry_failed'])
+
+    def test_bulk_trash_and_restore_continue_past_failures(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            st = state.empty_state()
+            for i in range(2):
+                (root / f'Song {i}.m4a').write_text('audio', encoding='utf-8')
+                state.record_downloaded(st, video_id=f'v{i}', title=f'Song {i}', url=f'v{i}', playlist_name='P', folder=str(root), filename=f'Song {i}.m4a')
+
+            trashed = management.bulk_trash(st, ['v0', 'nope', 'v1'])
+            restored = management.bulk_restore(st, ['v0', 'v0', 'v1'])
+
+            self.assertEqual([r['ok'] for r in trashed], [True, False, True])
+            self.assertEqual([r['video_id'] for r in restored], ['v0', 'v1'])
+            self.assertTrue((root / 'Song 1.m4a').exists())
@@ -63,3 +63,48 @@ class ExistingFileMatchingTests(unittest.TestCase):
 
     def test_unicode_variant_title_compatible_match(self):
         self.assert_matches('Artemas - BRAINS | Animated Video', 'Artemas - BRAINS ｜ Animated Video.m4a')
+
+
+class FolderIndexTests(unittest.TestCase):
+    FILES = [
+        'BIG SHAQ - MANS NOT HOT (Sad Meal Dubstep Remix).m4a',
+        "DROP IT LIKE IT'S HOT! (Prod. Luga).m4a",
+        'Hot!.m4a',
+        'Artist - Def. Remix.m4a',
+        'WING - Dopamine (SO-SO Remix) [Official Audio].m4a',
+        'WING - Digital Swamp [Official Audio].m4a',
+        'Digital Swamp.m4a',
+        'Artemas - BRAINS ｜ Animated Video.m4a',
+        'Swamp Digital Live.m4a',
+        'xDopaminex.m4a',
+    ]
+    TITLES = [
+        'Hot!', 'Def.', 'Dopamine', 'Dopamine (SO-SO Remix)', 'Digital Swamp', 'digital',
+        'Artemas - BRAINS | Animated Video', 'Swamp', 'opamine', 'Missing Song', '', '!!!', 'Live',
+    ]
+
+    def test_index_matches_linear_scan_for_every_title(self):
+        plain = {matching.normalize_title(Path(name).stem): name for name in self.FILES}
+        index = matching.FolderIndex(plain.items())
+
+        for title in self.TITLES:
+            with self.subTest(title=title):
+                self.assertEqual(
+                    matching.find_existing_file_match(title, index),
+                    matching.find_existing_file_match(title, plain),
+                )
+
+    def test_get_existing_files_builds_index_of_audio_files(self):
+        import tempfile
+
+        with tempfile.TemporaryDirectory() as td:
+            folder = Path(td)
+            (folder / 'Hot!.m4a').write_text('audio', encoding='utf-8')
+            (folder / 'Cover.jpg').write_text('image', encoding='utf-8')
+            (folder / 'Sub.m4a').mkdir()
+
+            index = matching.get_existing_files(folder)
+
+            self.assertIsInstance(index, matching.FolderIndex)
+            self.assertEqual(dict(index), {'hot': 'Hot!.m4a'})
+            self.assertEqual(matching.find_existing_file_match('Hot!', index), 'Hot!.m4a')
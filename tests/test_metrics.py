@@ -0,0 +1,62 @@
+import unittest
+
+from uplaysync.events import DOWNLOAD_FINISHED, SyncEvent
+from uplaysync.metrics import DownloadMetrics, MetricsRegistry, failure_reason_class
+
+
+class MetricsRegistryTests(unittest.TestCase):
+    def test_renders_prometheus_text_format(self):
+        registry = MetricsRegistry()
+        jobs = registry.gauge('jobs', 'Jobs by status.', ('status',))
+        requests = registry.counter('requests_total', 'Requests.', ('route',))
+        latency = registry.histogram('latency_seconds', 'Latency.', buckets=(0.1, 1.0))
+        registry.on_collect(lambda: jobs.set(3, status='queued'))
+        requests.inc(route='/api/"x"\n')
+        latency.observe(0.05)
+        latency.observe(0.5)
+        latency.observe(2.0)
+
+        text = registry.render()
+
+        self.assertIn('# TYPE jobs gauge\njobs{status="queued"} 3\n', text)
+        self.assertIn('requests_total{route="/api/\\"x\\"\\n"} 1\n', text)
+        self.assertIn('latency_seconds_bucket{le="0.1"} 1\n', text)
+        self.assertIn('latency_seconds_bucket{le="1"} 2\n', text)
+        self.assertIn('latency_seconds_bucket{le="+Inf"} 3\n', text)
+        self.assertIn('latency_seconds_sum 2.55\n', text)
+        self.assertIn('latency_seconds_count 3\n', text)
+
+    def test_rejects_wrong_labels_and_negative_counter_increments(self):
+        registry = MetricsRegistry()
+        counter = registry.counter('c_total', 'C.', ('source',))
+        with self.assertRaises(ValueError):
+            counter.inc(route='x')
+        with self.assertRaises(ValueError):
+            counter.inc(-1, source='x')
+
+
+class DownloadMetricsTests(unittest.TestCase):
+    def test_failure_reasons_are_bucketed(self):
+        self.assertEqual(failure_reason_class('ERROR: [youtube] abc: Private video. Sign in'), 'private')
+        self.assertEqual(failure_reason_class('ERROR: [youtube] abc: Video unavailable'), 'unavailable')
+        self.assertEqual(failure_reason_class('HTTP Error 429: Too Many Requests'), 'rate_limited')
+        self.assertEqual(failure_reason_class('download cancelled'), 'cancelled')
+        self.assertEqual(failure_reason_class(None), 'other')
+
+    def test_sync_event_sink_counts_bytes_throughput_and_failures(self):
+        registry = MetricsRegistry()
+        downloads = DownloadMetrics(registry)
+        sink = downloads.sink('sync')
+        sink(SyncEvent(DOWNLOAD_FINISHED, {'ok': True, 'bytes': 4000, 'seconds': 2.0}))
+        sink(SyncEvent(DOWNLOAD_FINISHED, {'ok': False, 'error': 'Video unavailable', 'seconds': 1.0}))
+        sink(SyncEvent(DOWNLOAD_FINISHED, {'ok': True, 'preexisting': True, 'bytes': 10}))
+        sink(SyncEvent('item_decided', {'queued': True}))
+
+        text = registry.render()
+
+        self.assertIn('uplaysync_downloads_total{source="sync",outcome="ok"} 1\n', text)
+        self.assertIn('uplaysync_downloads_total{source="sync",outcome="failed"} 1\n', text)
+        self.assertIn('uplaysync_download_failures_total{source="sync",reason="unavailable"} 1\n', text)
+        self.assertIn('uplaysync_download_bytes_total{source="sync"} 4000\n', text)
+        self.assertIn('uplaysync_download_throughput_bytes_per_second_sum{source="sync"} 2000\n', text)
+        self.assertIn('uplaysync_download_duration_seconds_count{source="sync"} 2\n', text)
@@ -0,0 +1,104 @@
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from uplaysync.playlist import PlaylistItems, PlaylistMetadataCache, PlaylistPrefetcher, PlaylistStream
+
+
+class PlaylistMetadataCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+
+    def provider(self, url):
+        self.calls.append(url)
+        return [{'id': f'{url}-{len(self.calls)}', 'title': 'Song', 'url': 'x'}]
+
+    def test_fresh_entry_is_reused_across_instances(self):
+        with tempfile.TemporaryDirectory() as td:
+            manual = PlaylistMetadataCache(Path(td), ttl=600, provider=self.provider)
+            refreshed = manual.refresh('pl')
+            sync_cache = PlaylistMetadataCache(Path(td), ttl=600, provider=self.provider)
+
+            items = sync_cache.get('pl')
+
+            self.assertEqual(items, refreshed)
+            self.assertEqual(self.calls, ['pl'])
+            self.assertEqual(sync_cache.stats(), {'hits': 1, 'misses': 0})
+            self.assertEqual(manual.stats(), {'hits': 0, 'misses': 1})
+
+    def test_expired_entry_and_force_refresh_hit_provider(self):
+        with tempfile.TemporaryDirectory() as td:
+            cache = PlaylistMetadataCache(Path(td), ttl=60, provider=self.provider)
+            cache.get('pl')
+            cache.get('pl', force_refresh=True)
+            with mock.patch('uplaysync.playlist.time.time', return_value=10**12):
+                cache.get('pl')
+
+            self.assertEqual(self.calls, ['pl', 'pl', 'pl'])
+            self.assertEqual(cache.stats(), {'hits': 0, 'misses': 3})
+
+    def test_streaming_iter_stores_only_after_exhaustion(self):
+        with tempfile.TemporaryDirectory() as td:
+            cache = PlaylistMetadataCache(Path(td), ttl=600, provider=self.provider)
+            stream = cache.iter('pl')
+
+            first = next(stream)
+            self.assertFalse(cache.path_for('pl').exists())
+            self.assertEqual(list(stream), [])
+
+            self.assertEqual(cache.get('pl'), [first])
+            self.assertEqual(cache.stats(), {'hits': 1, 'misses': 1})
+
+
+    def test_empty_or_partial_fetches_are_not_cached(self):
+        with tempfile.TemporaryDirectory() as td:
+            results = {
+                'empty': [],
+                'partial': PlaylistItems([{'id': 'a1'}], errors=1),
+                'stream': PlaylistStream([{'id': 'b1'}, None, {'id': 'b2'}]),
+            }
+            cache = PlaylistMetadataCache(Path(td), ttl=600, provider=results.__getitem__)
+
+            self.assertEqual(cache.get('empty'), [])
+            self.assertEqual(cache.get('partial'), [{'id': 'a1'}])
+            self.assertEqual(list(cache.iter('stream')), [{'id': 'b1'}, {'id': 'b2'}])
+
+            for url in results:
+                self.assertFalse(cache.path_for(url).exists())
+            self.assertEqual(results['stream'].errors, 1)
+
+
+class PlaylistPrefetcherStreamTests(unittest.TestCase):
+    def test_streamed_prefetch_yields_in_order_and_reraises_errors(self):
+        def provider(url):
+            yield {'id': f'{url}-1'}
+            if url == 'bad':
+                raise RuntimeError('boom')
+            yield {'id': f'{url}-2'}
+
+        with PlaylistPrefetcher(['a', 'bad'], provider, max_workers=2, stream=True) as prefetcher:
+            self.assertEqual([item['id'] for item in prefetcher.get('a')], ['a-1', 'a-2'])
+            self.assertEqual([item['id'] for item in prefetcher.get('a')], ['a-1', 'a-2'])
+            stream = prefetcher.get('bad')
+            self.assertEqual(next(stream)['id'], 'bad-1')
+            with self.assertRaises(RuntimeError):
+                next(stream)
+
+    def test_fetch_seconds_are_timed_on_the_worker_and_taken_once(self):
+        def provider(url):
+            time.sleep(0.05)
+            yield {'id': f'{url}-1'}
+
+        with PlaylistPrefetcher(['a', 'b'], provider, max_workers=2, stream=True) as prefetcher:
+            self.assertEqual([item['id'] for item in prefetcher.get('a')], ['a-1'])
+            self.assertGreaterEqual(prefetcher.take_fetch_seconds('a'), 0.05)
+            self.assertIsNone(prefetcher.take_fetch_seconds('a'))
+        with PlaylistPrefetcher(['a', 'b'], lambda url: list(provider(url)), max_workers=2) as prefetcher:
+            time.sleep(0.1)
+            self.assertEqual(prefetcher.get('b'), [{'id': 'b-1'}])
+            self.assertGreaterEqual(prefetcher.take_fetch_seconds('b'), 0.05)
+        with PlaylistPrefetcher(['a'], lambda url: list(provider(url))) as prefetcher:
+            prefetcher.get('a')
+            self.assertIsNone(prefetcher.take_fetch_seconds('a'))
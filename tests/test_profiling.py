@@ -0,0 +1,65 @@
+import cProfile
+import pstats
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from uplaysync.matching import normalize_title
+from uplaysync.profiling import PROFILE_DIR, hotspot_lines, profile_output_path, profile_requested, run_profiled
+
+
+def _busy(n):
+    return sum(i * i for i in range(n))
+
+
+class ProfilingTests(unittest.TestCase):
+    def test_output_path_is_next_to_the_state_file(self):
+        path = profile_output_path(Path('data') / 'sync_state.json')
+
+        self.assertEqual(path.parent, Path('data') / PROFILE_DIR)
+        self.assertRegex(path.name, r'^sync-\d{8}-\d{6}\.pstats$')
+
+    def test_profile_requested_accepts_common_truthy_values(self):
+        self.assertTrue(all(profile_requested(value) for value in ('1', 'true', 'YES', ' on ')))
+        self.assertFalse(any(profile_requested(value) for value in (None, '', '0', 'false')))
+
+    def test_run_profiled_includes_sync_worker_threads_and_logs_hotspots(self):
+        def target():
+            normalize_title('[MV] Song (Official Video)')
+            with ThreadPoolExecutor(max_workers=1, thread_name_prefix='uplaysync-download') as pool:
+                pool.submit(_busy, 20000).result()
+            return 'done'
+
+        lines = []
+        with tempfile.TemporaryDirectory() as tmp:
+            output = Path(tmp) / PROFILE_DIR / 'run.pstats'
+            result = run_profiled(target, output, log=lines.append, hotspots=5)
+
+            stats = pstats.Stats(str(output))
+            functions = {name for _filename, _line, name in stats.stats}
+
+        self.assertEqual(result, 'done')
+        self.assertIn('normalize_title', functions)
+        self.assertIn('_busy', functions)
+        log = '\n'.join(lines)
+        self.assertIn('[프로파일] self time 상위 5개', log)
+        self.assertIn('[프로파일] matching:', log)
+        self.assertIn(f'[프로파일] 저장: {output}', log)
+
+    def test_run_profiled_writes_the_profile_when_the_target_raises(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = Path(tmp) / 'run.pstats'
+            with self.assertRaises(RuntimeError):
+                run_profiled(lambda: (_ for _ in ()).throw(RuntimeError('boom')), output, log=lambda line: None)
+
+            self.assertTrue(output.exists())
+
+    def test_hotspot_lines_skip_empty_groups(self):
+        profile = cProfile.Profile()
+        profile.runcall(_busy, 100)
+
+        lines = hotspot_lines(pstats.Stats(profile), limit=3)
+
+        self.assertTrue(lines[0].startswith('[프로파일] self time 상위 3개'))
+        self.assertFalse(any('yt-dlp' in line or 'matching' in line for line in lines))
@@ -0,0 +1,45 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from uplaysync.run_history import load_status, record_run, run_record, update_status
+
+
+class RunHistoryTests(unittest.TestCase):
+    def test_record_run_keeps_newest_runs_and_other_status_keys(self):
+        with tempfile.TemporaryDirectory() as td:
+            path = Path(td) / 'status.json'
+            update_status(path, last_run='2026-01-01 00:00:00')
+            for index in range(4):
+                record_run(path, {'seconds': index}, limit=3)
+            update_status(path, last_run='2026-01-02 00:00:00')
+
+            status = json.loads(path.read_text(encoding='utf-8'))
+            self.assertEqual([run['seconds'] for run in status['runs']], [1, 2, 3])
+            self.assertEqual(status['last_run'], '2026-01-02 00:00:00')
+
+    def test_run_record_compacts_summary_and_failures(self):
+        summary = {
+            'started_at': 's', 'finished_at': 'f', 'seconds': 12.5, 'checked': 3, 'downloaded': 1,
+            'cancelled': False, 'playlist_cache': {'hits': 1},
+            'timings': {
+                'phases': {'download': {'count': 1, 'seconds': 10.0, 'max': 10.0, 'histogram': {'30.0': 1}}},
+                'playlists': {'P': {'download': {'count': 1, 'seconds': 10.0, 'max': 10.0, 'histogram': {}}}},
+            },
+        }
+
+        record = run_record(summary)
+        self.assertEqual(record['counts'], {'checked': 3, 'downloaded': 1})
+        self.assertEqual(record['playlists'], {'P': {'download': 10.0}})
+        self.assertTrue(record['ok'])
+
+        failed = run_record(started_at='s', error=RuntimeError('boom'))
+        self.assertEqual((failed['ok'], failed['error'], failed['started_at']), (False, 'boom', 's'))
+
+    def test_load_status_tolerates_missing_or_corrupt_file(self):
+        with tempfile.TemporaryDirectory() as td:
+            path = Path(td) / 'status.json'
+            self.assertEqual(load_status(path), {})
+            path.write_text('[1, 2]', encoding='utf-8')
+            self.assertEqual(load_status(path), {})
@@ -0,0 +1,56 @@
+import unittest
+
+from uplaysync.runner import InProcessSync
+
+
+class InProcessSyncTests(unittest.TestCase):
+    def test_events_stream_log_lines_then_done_with_summary(self):
+        def target(run):
+            run.log('\n플레이리스트 처리 중: P')
+            run.log('[다운로드] Song')
+            return {'state': {}, 'summary': {'downloaded': 1}}
+
+        run = InProcessSync(target).start()
+        events = list(run.events())
+
+        self.assertEqual(
+            [event.get('message') for event in events[:-1]],
+            ['플레이리스트 처리 중: P', '[다운로드] Song'],
+        )
+        self.assertEqual(events[-1]['type'], 'done')
+        self.assertTrue(events[-1]['ok'])
+        self.assertEqual(events[-1]['summary'], {'downloaded': 1})
+        self.assertTrue(run.join(1))
+
+    def test_failure_and_cancellation_are_reported_on_done(self):
+        def target(run):
+            run.cancel()
+            raise RuntimeError('boom')
+
+        run = InProcessSync(target).start()
+        done = list(run.events())[-1]
+
+        self.assertFalse(done['ok'])
+        self.assertTrue(done['cancelled'])
+        self.assertEqual(done['error'], 'boom')
+        self.assertIsInstance(run.error, RuntimeError)
+
+    def test_buffer_is_bounded_and_unconsumed_logs_go_to_the_console(self):
+        import contextlib
+        import io
+
+        def target(run):
+            for index in range(10):
+                run.log(f'line {index}')
+
+        run = InProcessSync(target, buffer_size=3)
+        console = io.StringIO()
+        with contextlib.redirect_stdout(console):
+            run.start()
+            run.join(1)
+        events = list(run.events())
+
+        self.assertEqual(console.getvalue().splitlines(), [f'line {index}' for index in range(10)])
+        self.assertIn('밀린 이벤트 8개', events[0]['message'])
+        self.assertEqual([event.get('message') for event in events[1:-1]], ['line 8', 'line 9'])
+        self.assertEqual(events[-1]['type'], 'done')
@@ -0,0 +1,133 @@
+import json
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+from uplaysync import management, sqlite_state, state
+
+
+class SqliteStateTests(unittest.TestCase):
+    def _populated_state(self, root):
+        st = state.empty_state()
+        management.record_playlist_snapshot(
+            st,
+            {'name': 'P', 'url': 'playlist-url', 'folder': str(root)},
+            [{'id': 'ok1', 'title': 'OK Song', 'url': 'ok1'}, {'id': 'bad1', 'title': 'Bad Song', 'url': 'bad1'}],
+            index=0,
+        )
+        state.record_downloaded(
+            st,
+            video_id='ok1',
+            title='OK Song',
+            url='https://youtu.be/ok1',
+            playlist_name='P',
+            folder=str(root),
+            filename='OK Song.m4a',
+        )
+        state.record_failure(
+            st,
+            video_id='bad1',
+            title='Bad Song',
+            url='https://youtu.be/bad1',
+            playlist_name='P',
+            folder=str(root),
+            reason='private video',
+        )
+        management.enqueue_item(st, 'bad1', action='retry_failed')
+        return st
+
+    def test_round_trip_through_state_api_and_legacy_mirror(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            db = root / 'sync_state.sqlite3'
+            st = self._populated_state(root)
+
+            state.save_state(st, db, root / 'id_map.json', root / 'download_history.json')
+            loaded = state.load_state_file(db)
+
+            self.assertEqual(loaded['items'], st['items'])
+            self.assertEqual(loaded['history'], ['ok1', 'bad1'])
+            self.assertEqual(loaded['queue'][0]['video_id'], 'bad1')
+            snapshot = next(iter(loaded['playlist_snapshots'].values()))
+            self.assertEqual([item['video_id'] for item in snapshot['items']], ['ok1', 'bad1'])
+            legacy = json.loads((root / 'id_map.json').read_text(encoding='utf-8'))
+            self.assertEqual(legacy['bad1'], 'ERROR: private video')
+
+    def test_record_helpers_write_rows_through_store(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            db = root / 'sync_state.sqlite3'
+            st = state.load_state_file(db)
+            store = state.open_state_journal(db)
+
+            state.record_attempt(st, 'new1', journal=store)
+            state.record_downloaded(
+                st,
+                video_id='new1',
+                title='New Song',
+                url='https://youtu.be/new1',
+                playlist_name='P',
+                folder=str(root),
+                filename='New Song.m4a',
+                journal=store,
+            )
+
+            with sqlite3.connect(db) as conn:
+                status = conn.execute('SELECT status FROM items WHERE video_id = ?', ('new1',)).fetchone()[0]
+                playlists = conn.execute('SELECT playlist_name FROM item_playlists WHERE video_id = ?', ('new1',)).fetchall()
+            self.assertEqual(status, 'downloaded')
+            self.assertEqual(playlists, [('P',)])
+            self.assertEqual(state.load_state_file(db)['history'], ['new1'])
+
+    def test_load_or_migrate_imports_json_sibling_once(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            st = self._populated_state(root)
+            state.save_state(st, root / 'sync_state.json', root / 'id_map.json', root / 'download_history.json')
+            db = state.resolve_state_path(root / 'sync_state.json', 'sqlite')
+
+            loaded = state.load_or_migrate_state(db, root / 'id_map.json', root / 'download_history.json')
+
+            self.assertEqual(db.name, 'sync_state.sqlite3')
+            self.assertTrue(db.exists())
+            self.assertEqual(loaded['items']['ok1']['filename'], 'OK Song.m4a')
+            with self.assertRaises(FileExistsError):
+                sqlite_state.import_json_state(root / 'sync_state.json', db)
+
+    def test_store_reuses_one_connection_per_thread_and_sets_up_schema_once(self):
+        import threading
+
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            db = root / 'sync_state.sqlite3'
+            st = self._populated_state(root)
+            store = sqlite_state.sqlite_store(db)
+            store.save(st)
+            conn = store.connect()
+            scripts = []
+            conn.set_trace_callback(scripts.append)
+            for _ in range(3):
+                store.append_item(st, 'ok1', history=True)
+            conn.set_trace_callback(None)
+            other = []
+            worker = threading.Thread(target=lambda: other.append(store.connect()))
+            worker.start()
+            worker.join()
+
+            self.assertIs(state.open_state_journal(db), store)
+            self.assertIs(store.connect(), conn)
+            self.assertIsNot(other[0], conn)
+            self.assertFalse(any('CREATE' in sql or 'PRAGMA' in sql for sql in scripts))
+            self.assertEqual(state.load_state_file(db)['history'][-1], 'ok1')
+
+    def test_unknown_backend_falls_back_to_json_with_a_warning(self):
+        from unittest import mock
+
+        with mock.patch.dict('os.environ', {'UPLAYSYNC_STATE_BACKEND': 'sqllite'}):
+            with self.assertLogs('uplaysync.state', level='WARNING') as logs:
+                backend = state.resolve_state_backend({'state_backend': 'sqlite'})
+
+        self.assertEqual(backend, 'json')
+        self.assertIn("UPLAYSYNC_STATE_BACKEND 'sqllite'", logs.output[0])
+        self.assertEqual(state.resolve_state_backend({'state_backend': ' SQLite '}), 'sqlite')
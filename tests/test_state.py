@@ -73,3 +73,93 @@ class StateMigrationTests(unittest.TestCase):
 
             self.assertEqual(json.loads(path.read_text(encoding='utf-8')), {'abc': 'Song.m4a'})
             self.assertFalse((Path(td) / '.id_map.json.tmp').exists())
+
+
+class StateJournalTests(unittest.TestCase):
+    def test_load_state_file_replays_journal_and_ignores_torn_tail(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            sync_state = root / 'sync_state.json'
+            state.save_state(state.empty_state(), sync_state, root / 'id_map.json', root / 'download_history.json')
+            journal = state.StateJournal(sync_state, compact_every=10, fsync=False)
+            st = state.empty_state()
+            state.record_attempt(st, 'ok1', journal=journal)
+            state.record_downloaded(
+                st,
+                video_id='ok1',
+                title='OK Song',
+                url='https://youtu.be/ok1',
+                playlist_name='P',
+                folder=str(root),
+                filename='OK Song.m4a',
+                journal=journal,
+            )
+            with journal.path.open('a', encoding='utf-8') as f:
+                f.write('{"op": "item", "id": "torn')
+
+            loaded = state.load_state_file(sync_state)
+
+            self.assertEqual(journal.pending, 2)
+            self.assertEqual(loaded['items']['ok1']['status'], 'downloaded')
+            self.assertEqual(loaded['items']['ok1']['attempt_count'], 1)
+            self.assertEqual(loaded['history'], ['ok1'])
+
+    def test_save_state_compacts_journal(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            sync_state = root / 'sync_state.json'
+            journal = state.StateJournal(sync_state, compact_every=1, fsync=False)
+            st = state.empty_state()
+            state.record_attempt(st, 'x1', journal=journal)
+            self.assertTrue(journal.needs_compaction())
+
+            state.save_state(st, sync_state, root / 'id_map.json', root / 'download_history.json', journal=journal)
+
+            self.assertFalse(journal.path.exists())
+            self.assertEqual(journal.pending, 0)
+            self.assertEqual(state.load_state_file(sync_state)['items']['x1']['attempt_count'], 1)
+
+
+class LegacyMirrorWriterTests(unittest.TestCase):
+    def _record(self, st, video_id, root):
+        state.record_downloaded(
+            st,
+            video_id=video_id,
+            title=video_id,
+            url=f'https://youtu.be/{video_id}',
+            playlist_name='P',
+            folder=str(root),
+            filename=f'{video_id}.m4a',
+        )
+
+    def test_mirror_is_rewritten_only_when_content_changes(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            paths = (root / 'sync_state.json', root / 'id_map.json', root / 'download_history.json')
+            writer = state.legacy_mirror_writer(paths[1], paths[2])
+            st = state.empty_state()
+            self._record(st, 'a1', root)
+            state.save_state(st, *paths)
+            state.record_attempt(st, 'a1')
+            state.save_state(st, *paths)
+
+            self.assertEqual(writer.writes, 1)
+            self.assertEqual(st.dirty_items, set())
+            self._record(st, 'b1', root)
+            state.save_state(st, *paths)
+            self.assertEqual(writer.writes, 2)
+            self.assertEqual(json.loads(paths[2].read_text(encoding='utf-8')), ['a1', 'b1'])
+
+    def test_mirror_writes_are_coalesced_until_flush(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            paths = (root / 'sync_state.json', root / 'id_map.json', root / 'download_history.json')
+            st = state.empty_state()
+            self._record(st, 'a1', root)
+            state.save_state(st, *paths, mirror_interval=3600)
+            self._record(st, 'b1', root)
+            state.save_state(st, *paths, mirror_interval=3600)
+
+            self.assertNotIn('b1', json.loads(paths[1].read_text(encoding='utf-8')))
+            state.flush_legacy_mirrors()
+            self.assertEqual(json.loads(paths[1].read_text(encoding='utf-8'))['b1'], 'b1.m4a')
@@ -0,0 +1,62 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from uplaysync import state
+from uplaysync.state_cache import StateCache
+
+
+class StateCacheTests(unittest.TestCase):
+    def test_reuses_loaded_state_until_file_changes(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            path = root / 'sync_state.json'
+            state.save_state(state.empty_state(), path, root / 'id_map.json', root / 'download_history.json')
+            cache = StateCache()
+
+            first = cache.get(path)
+            second = cache.get(path)
+            self.assertIs(first, second)
+            self.assertEqual((cache.loads, cache.hits, cache.version), (1, 1, 1))
+
+            external = state.empty_state()
+            state.record_attempt(external, 'x1')
+            state.save_state(external, path, root / 'id_map.json', root / 'download_history.json')
+
+            reloaded = cache.get(path)
+            self.assertIsNot(reloaded, first)
+            self.assertIn('x1', reloaded['items'])
+            self.assertEqual(cache.version, 2)
+
+    def test_store_and_invalidate_bump_version(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            path = root / 'sync_state.json'
+            cache = StateCache()
+            st = cache.get(path)
+            state.record_attempt(st, 'x1')
+            state.save_state(st, path, root / 'id_map.json', root / 'download_history.json')
+
+            self.assertEqual(cache.store(path, st), 2)
+            self.assertIs(cache.get(path), st)
+            self.assertEqual(cache.loads, 1)
+            cache.invalidate()
+            self.assertIsNot(cache.get(path), st)
+            self.assertEqual(cache.version, 4)
+
+    def test_pinned_state_survives_invalidate_until_unpinned(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            path = root / 'sync_state.json'
+            st = state.empty_state()
+            state.save_state(st, path, root / 'id_map.json', root / 'download_history.json')
+            cache = StateCache()
+
+            cache.pin(path, st)
+            cache.invalidate()
+            self.assertIs(cache.get(path), st)
+            self.assertEqual(cache.loads, 0)
+
+            cache.unpin()
+            cache.invalidate()
+            self.assertIsNot(cache.get(path), st)
@@ -0,0 +1,27 @@
+import unittest
+
+from uplaysync.timing import PHASE_DOWNLOAD, PHASE_MATCHING, PhaseTimer
+
+
+class PhaseTimerTests(unittest.TestCase):
+    def test_records_totals_and_histograms_overall_and_per_playlist(self):
+        timer = PhaseTimer()
+        timer.record(PHASE_DOWNLOAD, 0.3, 'A')
+        timer.record(PHASE_DOWNLOAD, 45.0, 'B')
+        timer.record(PHASE_MATCHING, 0.0004)
+
+        result = timer.to_dict()
+        download = result['phases'][PHASE_DOWNLOAD]
+        self.assertEqual((download['count'], download['seconds'], download['max']), (2, 45.3, 45.0))
+        self.assertEqual(download['histogram'], {'0.5': 1, '120.0': 1})
+        self.assertEqual(result['phases'][PHASE_MATCHING]['histogram'], {'0.001': 1})
+        self.assertEqual(set(result['playlists']), {'A', 'B'})
+        self.assertEqual(result['playlists']['B'][PHASE_DOWNLOAD]['count'], 1)
+
+    def test_measure_records_even_when_the_block_raises(self):
+        timer = PhaseTimer()
+        with self.assertRaises(ValueError):
+            with timer.measure(PHASE_MATCHING, 'A'):
+                raise ValueError('boom')
+
+        self.assertEqual(timer.playlist('A')[PHASE_MATCHING]['count'], 1)
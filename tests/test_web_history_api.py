@@ -21,11 +21,16 @@ def install_fake_flask():
             return decorator
         def run(self, *args, **kwargs):
             return None
+        def before_request(self, func):
+            return func
+        def after_request(self, func):
+            return func
 
     fake.Flask = FakeFlask
     fake.Response = lambda *args, **kwargs: ('response', args, kwargs)
     fake.jsonify = lambda value=None, *args, **kwargs: value if value is not None else kwargs
-    fake.request = types.SimpleNamespace(json=None)
+    fake.request = types.SimpleNamespace(json=None, args={}, headers={})
+    fake.g = types.SimpleNamespace()
     fake.render_template = lambda name: name
     sys.modules.setdefault('flask', fake)
 
@@ -92,7 +97,7 @@ class WebHistoryApiTests(unittest.TestCase):
             )
             state.save_state(st, root / 'sync_state.json', root / 'id_map.json', root / 'download_history.json')
 
-            result = app_mod.get_history()
+            result, status, headers = app_mod.get_history()
 
             self.assertEqual(result[0]['id'], 'bad1')
             self.assertEqual(result[0]['status'], 'failed')
@@ -111,7 +116,7 @@ class WebHistoryApiTests(unittest.TestCase):
             (root / 'id_map.json').write_text(json.dumps({'ok1': 'OK Song.m4a'}), encoding='utf-8')
             (root / 'download_history.json').write_text(json.dumps(['ok1']), encoding='utf-8')
 
-            result = app_mod.get_history()
+            result, status, headers = app_mod.get_history()
 
             self.assertEqual(result[0]['id'], 'ok1')
             self.assertEqual(result[0]['filename'], 'OK Song.m4a')
@@ -126,9 +131,554 @@ class WebHistoryApiTests(unittest.TestCase):
             (root / 'id_map.json').write_text(json.dumps({'bad1': 'ERROR: blocked', 'ok1': 'OK Song.m4a'}), encoding='utf-8')
             (root / 'download_history.json').write_text(json.dumps(['ok1', 'bad1']), encoding='utf-8')
 
-            result = app_mod.get_history()
+            result, status, headers = app_mod.get_history()
 
             self.assertEqual(result[0]['id'], 'bad1')
             self.assertEqual(result[0]['status'], 'failed')
             self.assertEqual(result[0]['failure_reason'], 'blocked')
             self.assertEqual(result[1]['filename'], 'OK Song.m4a')
+
+    def test_cleared_history_is_not_served_from_a_coalesced_legacy_mirror(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            app_mod = import_web_app_with_fake_flask()
+            app_mod.STATE_FILE_PATH = str(root / 'sync_state.json')
+            app_mod.ID_MAP_PATH = str(root / 'id_map.json')
+            app_mod.HISTORY_PATH = str(root / 'download_history.json')
+            app_mod.LEGACY_MIRROR_INTERVAL = 30.0
+            st = state.empty_state()
+            state.record_failure(st, video_id='v1', title='One', url='u1', playlist_name='P', folder=str(root), reason='x')
+            state.save_state(st, root / 'sync_state.json', root / 'id_map.json', root / 'download_history.json')
+            with app_mod.state_transaction() as current:
+                state.record_failure(current, video_id='v2', title='Two', url='u2', playlist_name='P', folder=str(root), reason='y')
+                app_mod.save_current_state(current)
+
+            before = app_mod.get_history()[0]
+            app_mod.clear_history()
+            after = app_mod.get_history()[0]
+
+            self.assertEqual([row['id'] for row in before], ['v2', 'v1'])
+            self.assertEqual(after, [])
+            self.assertEqual(json.loads((root / 'download_history.json').read_text(encoding='utf-8')), [])
+
+    def test_get_history_honors_if_none_match_until_state_changes(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            app_mod = import_web_app_with_fake_flask()
+            app_mod.STATE_FILE_PATH = str(root / 'sync_state.json')
+            app_mod.ID_MAP_PATH = str(root / 'id_map.json')
+            app_mod.HISTORY_PATH = str(root / 'download_history.json')
+            st = state.empty_state()
+            state.record_failure(st, video_id='bad1', title='Bad', url='u', playlist_name='P', folder=str(root), reason='x')
+            state.save_state(st, root / 'sync_state.json', root / 'id_map.json', root / 'download_history.json')
+            try:
+                _, _, headers = app_mod.get_history()
+                app_mod.request.headers = {'If-None-Match': headers['ETag']}
+                not_modified = app_mod.get_history()
+                with app_mod.state_transaction() as current:
+                    state.record_failure(current, video_id='bad2', title='Bad 2', url='u2', playlist_name='P', folder=str(root), reason='y')
+                    app_mod.save_current_state(current)
+                changed, status, new_headers = app_mod.get_history()
+            finally:
+                app_mod.request.headers = {}
+
+            self.assertEqual(not_modified[2]['status'], 304)
+            self.assertEqual(status, 200)
+            self.assertNotEqual(new_headers['ETag'], headers['ETag'])
+            self.assertEqual([row['id'] for row in changed], ['bad2', 'bad1'])
+
+    def test_get_history_pages_with_cursor_filter_and_jsonl_stream(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            app_mod = import_web_app_with_fake_flask()
+            app_mod.STATE_FILE_PATH = str(root / 'sync_state.json')
+            app_mod.ID_MAP_PATH = str(root / 'id_map.json')
+            app_mod.HISTORY_PATH = str(root / 'download_history.json')
+            st = state.empty_state()
+            for i in range(5):
+                state.record_downloaded(
+                    st, video_id=f'v{i}', title=f'Song {i}', url=f'v{i}', playlist_name='P',
+                    folder=str(root), filename=f'Song {i}.m4a',
+                )
+            state.save_state(st, root / 'sync_state.json', root / 'id_map.json', root / 'download_history.json')
+            try:
+                app_mod.request.args = {'limit': '2'}
+                first, _, _ = app_mod.get_history()
+                app_mod.request.args = {'limit': '2', 'after': first['next_after']}
+                second, _, _ = app_mod.get_history()
+                app_mod.request.args = {'limit': '2', 'q': 'song 1'}
+                searched, _, _ = app_mod.get_history()
+                app_mod.request.args = {'format': 'jsonl', 'after': 'v1'}
+                streamed = app_mod.get_history()
+            finally:
+                app_mod.request.args = {}
+
+            self.assertEqual([row['id'] for row in first['items']], ['v4', 'v3'])
+            self.assertEqual(first['next_after'], '3:v3')
+            self.assertEqual([row['id'] for row in second['items']], ['v2', 'v1'])
+            self.assertEqual(searched, {'items': [searched['items'][0]], 'next_after': None})
+            self.assertEqual(searched['items'][0]['id'], 'v1')
+            self.assertEqual(streamed[2]['mimetype'], 'application/x-ndjson')
+            self.assertEqual([json.loads(line)['id'] for line in streamed[1][0]], ['v0'])
+
+    def test_jsonl_export_reads_the_state_in_chunks(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            app_mod = import_web_app_with_fake_flask()
+            app_mod.STATE_FILE_PATH = str(root / 'sync_state.json')
+            app_mod.ID_MAP_PATH = str(root / 'id_map.json')
+            app_mod.HISTORY_PATH = str(root / 'download_history.json')
+            app_mod.HISTORY_EXPORT_CHUNK = 2
+            st = state.empty_state()
+            for i in range(5):
+                state.record_downloaded(
+                    st, video_id=f'v{i}', title=f'Song {i}', url=f'v{i}', playlist_name='P',
+                    folder=str(root), filename=f'Song {i}.m4a',
+                )
+            state.save_state(st, root / 'sync_state.json', root / 'id_map.json', root / 'download_history.json')
+            snapshot = app_mod._history_snapshot
+            reads = []
+
+            def recording_snapshot(after, query, count):
+                reads.append((after, count))
+                return snapshot(after, query, count)
+
+            app_mod._history_snapshot = recording_snapshot
+            try:
+                app_mod.request.args = {'format': 'jsonl'}
+                lines = app_mod.get_history()[1][0]
+                self.assertEqual(json.loads(next(lines))['id'], 'v4')
+                self.assertEqual(len(reads), 1)
+                everything = ['v4'] + [json.loads(line)['id'] for line in lines]
+                full_reads = list(reads)
+                reads.clear()
+                app_mod.request.args = {'format': 'jsonl', 'limit': '3'}
+                limited = [json.loads(line)['id'] for line in app_mod.get_history()[1][0]]
+            finally:
+                app_mod.request.args = {}
+
+            self.assertEqual(everything, ['v4', 'v3', 'v2', 'v1', 'v0'])
+            self.assertEqual(full_reads, [(None, 2), ('3:v3', 2), ('1:v1', 2)])
+            self.assertEqual(limited, ['v4', 'v3', 'v2'])
+            self.assertEqual(reads, [(None, 2), ('3:v3', 1)])
+
+    def test_history_cursor_survives_redownloads_between_pages(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            app_mod = import_web_app_with_fake_flask()
+            app_mod.STATE_FILE_PATH = str(root / 'sync_state.json')
+            app_mod.ID_MAP_PATH = str(root / 'id_map.json')
+            app_mod.HISTORY_PATH = str(root / 'download_history.json')
+            st = state.empty_state()
+            for i in range(6):
+                state.record_downloaded(
+                    st, video_id=f'v{i}', title=f'Song {i}', url=f'v{i}', playlist_name='P',
+                    folder=str(root), filename=f'Song {i}.m4a',
+                )
+            state.save_state(st, root / 'sync_state.json', root / 'id_map.json', root / 'download_history.json')
+
+            def page(after=None):
+                app_mod.request.args = {'limit': '2', **({'after': after} if after else {})}
+                return app_mod.get_history()[0]
+
+            def redownload(video_id):
+                with app_mod.state_transaction() as current:
+                    state.add_history(current, video_id)
+                    app_mod.save_current_state(current)
+
+            try:
+                first = page()
+                redownload('v4')  # the cursor row moves to the top
+                second = page(first['next_after'])
+                redownload('v0')  # an unseen row below the cursor moves to the top
+                third = page(second['next_after'])
+            finally:
+                app_mod.request.args = {}
+
+            self.assertEqual([row['id'] for row in first['items']], ['v5', 'v4'])
+            self.assertEqual([row['id'] for row in second['items']], ['v3', 'v2'])
+            self.assertEqual([row['id'] for row in third['items']], ['v1'])
+            self.assertIsNone(third['next_after'])
+
+
+class DownloadQueueWorkerTests(unittest.TestCase):
+    def test_queued_job_starts_when_sync_gate_is_released(self):
+        import threading
+
+        from uplaysync.downloader import DownloadResult
+
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            app_mod = import_web_app_with_fake_flask()
+            app_mod.STATE_FILE_PATH = str(root / 'sync_state.json')
+            app_mod.ID_MAP_PATH = str(root / 'id_map.json')
+            app_mod.HISTORY_PATH = str(root / 'download_history.json')
+            st = state.empty_state()
+            state.record_failure(
+                st,
+                video_id='bad1',
+                title='Bad Song',
+                url='https://youtu.be/bad1',
+                playlist_name='P',
+                folder=str(root),
+                reason='private video',
+            )
+            state.save_state(st, root / 'sync_state.json', root / 'id_map.json', root / 'download_history.json')
+            started = threading.Event()
+            finished = threading.Event()
+
+            class FakeDownloader:
+                def download(self, *, url, video_id, title, folder, cancel_event=None):
+                    started.set()
+                    (Path(folder) / 'Bad Song.m4a').write_text('audio', encoding='utf-8')
+                    return DownloadResult(True, video_id, title, url, filename='Bad Song.m4a')
+
+            app_mod.DirectYtdlpDownloader = FakeDownloader
+            original_save = app_mod.save_current_state
+
+            def save_and_signal(current):
+                original_save(current)
+                if any(job.get('status') == 'completed' for job in current.get('queue', [])):
+                    finished.set()
+
+            app_mod.save_current_state = save_and_signal
+            self.assertTrue(app_mod.sync_process_lock.acquire(blocking=False))
+            try:
+                app_mod.enqueue_management_item('bad1')
+                self.assertFalse(started.wait(0.2))
+            finally:
+                app_mod.sync_process_lock.release()
+
+            self.assertTrue(started.wait(1))
+            self.assertTrue(finished.wait(2))
+            self.assertEqual(app_mod.load_current_state()['items']['bad1']['status'], 'downloaded')
+
+    def test_slots_run_jobs_concurrently_but_never_share_an_output_path(self):
+        import threading
+        import time
+
+        from uplaysync.downloader import DownloadResult
+        from uplaysync.management import enqueue_item
+
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            app_mod = import_web_app_with_fake_flask()
+            app_mod.STATE_FILE_PATH = str(root / 'sync_state.json')
+            app_mod.ID_MAP_PATH = str(root / 'id_map.json')
+            app_mod.HISTORY_PATH = str(root / 'download_history.json')
+            st = state.empty_state()
+            for video_id, title in (('a1', 'Same Song'), ('a2', 'Same Song'), ('b1', 'Other'), ('c1', 'Third')):
+                state.record_failure(
+                    st,
+                    video_id=video_id,
+                    title=title,
+                    url=f'https://youtu.be/{video_id}',
+                    playlist_name='P',
+                    folder=str(root),
+                    reason='blocked',
+                )
+            state.save_state(st, root / 'sync_state.json', root / 'id_map.json', root / 'download_history.json')
+            lock = threading.Lock()
+            active = set()
+            stats = {'max_active': 0, 'collisions': 0, 'done': 0}
+            all_done = threading.Event()
+
+            class FakeDownloader:
+                def download(self, *, url, video_id, title, folder, cancel_event=None):
+                    with lock:
+                        if title in active:
+                            stats['collisions'] += 1
+                        active.add(title)
+                        stats['max_active'] = max(stats['max_active'], len(active))
+                    time.sleep(0.05)
+                    with lock:
+                        active.discard(title)
+                    return DownloadResult(False, video_id, title, url, error='still blocked')
+
+            app_mod.DirectYtdlpDownloader = FakeDownloader
+            original_record = app_mod.DownloadQueueWorker._record_result
+
+            def record_and_count(worker, job_id, result):
+                original_record(worker, job_id, result)
+                with lock:
+                    stats['done'] += 1
+                    if stats['done'] == 4:
+                        all_done.set()
+
+            app_mod.DownloadQueueWorker._record_result = record_and_count
+            worker = app_mod.DownloadQueueWorker(slots=3)
+            with app_mod.state_transaction() as current:
+                for video_id in ('a1', 'a2', 'b1', 'c1'):
+                    enqueue_item(current, video_id)
+                app_mod.save_current_state(current)
+            worker.notify()
+
+            self.assertTrue(all_done.wait(3))
+            self.assertGreater(stats['max_active'], 1)
+            self.assertEqual(stats['collisions'], 0)
+            statuses = {job['video_id']: job['status'] for job in app_mod.load_current_state()['queue']}
+            self.assertEqual(set(statuses.values()), {'failed'})
+
+
+class ManagementApiTests(unittest.TestCase):
+    def test_query_args_select_summary_and_reject_bad_values(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            app_mod = import_web_app_with_fake_flask()
+            app_mod.STATE_FILE_PATH = str(root / 'sync_state.json')
+            app_mod.CONFIG_FILE_PATH = str(root / 'config.yaml')
+            (root / 'config.yaml').write_text(f'playlists:\n  - name: P\n    url: pl\n    folder: {root}\n', encoding='utf-8')
+            st = state.empty_state()
+            from uplaysync import management
+            management.record_playlist_snapshot(st, {'name': 'P', 'url': 'pl'}, [{'id': 'v1', 'title': 'Song', 'url': 'v1'}], index=0)
+            state.save_state(st, root / 'sync_state.json', root / 'id_map.json', root / 'download_history.json')
+            try:
+                app_mod.request.args = {'summary_only': '1'}
+                summary, _, _ = app_mod.get_management_view()
+                app_mod.request.args = {'limit': 'many'}
+                error = app_mod.get_management_view()
+            finally:
+                app_mod.request.args = {}
+
+            self.assertEqual(summary['playlists'][0]['items'], [])
+            self.assertEqual(summary['playlists'][0]['counts'], {'not_downloaded': 1})
+            self.assertEqual(error[1], 400)
+
+
+class ManagementEventsTests(unittest.TestCase):
+    def test_mutations_publish_deltas_to_event_stream(self):
+        from uplaysync.downloader import DownloadResult
+
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            app_mod = import_web_app_with_fake_flask()
+            app_mod.STATE_FILE_PATH = str(root / 'sync_state.json')
+            app_mod.ID_MAP_PATH = str(root / 'id_map.json')
+            app_mod.HISTORY_PATH = str(root / 'download_history.json')
+            st = state.empty_state()
+            state.record_failure(st, video_id='bad1', title='Bad', url='u', playlist_name='P', folder=str(root), reason='x')
+            state.save_state(st, root / 'sync_state.json', root / 'id_map.json', root / 'download_history.json')
+
+            class FailingDownloader:
+                def download(self, *, url, video_id, title, folder, cancel_event=None):
+                    return DownloadResult(False, video_id, title, url, error='still blocked')
+
+            app_mod.DirectYtdlpDownloader = FailingDownloader
+            response = app_mod.management_events()
+            stream = response[1][0]
+            self.assertEqual(next(stream), 'retry: 3000\n\n')
+
+            app_mod.enqueue_management_item('bad1')
+            first = next(stream)
+
+            self.assertIn('event: job\n', first)
+            payload = json.loads(first.split('data: ', 1)[1])
+            self.assertEqual(payload['job']['video_id'], 'bad1')
+            self.assertEqual(payload['summary']['queue'], 1)
+            kinds = []
+            while 'item' not in kinds:
+                kinds.append(next(stream).split('event: ', 1)[1].split('\n', 1)[0])
+            self.assertEqual(kinds[-1], 'item')
+
+    def test_bulk_enqueue_saves_once_and_wakes_worker_once(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            app_mod = import_web_app_with_fake_flask()
+            app_mod.STATE_FILE_PATH = str(root / 'sync_state.json')
+            app_mod.ID_MAP_PATH = str(root / 'id_map.json')
+            app_mod.HISTORY_PATH = str(root / 'download_history.json')
+            app_mod.CONFIG_FILE_PATH = str(root / 'config.yaml')
+            (root / 'config.yaml').write_text(f'playlists:\n  - name: P\n    url: pl\n    folder: {root}\n', encoding='utf-8')
+            st = state.empty_state()
+            from uplaysync import management
+            management.record_playlist_snapshot(
+                st, {'name': 'P', 'url': 'pl', 'folder': str(root)},
+                [{'id': f'v{i}', 'title': f'Song {i}', 'url': f'v{i}'} for i in range(5)], index=0,
+            )
+            for i in range(5):
+                state.record_failure(st, video_id=f'v{i}', title=f'Song {i}', url=f'v{i}', playlist_name='P', folder=str(root), reason='x')
+            state.save_state(st, root / 'sync_state.json', root / 'id_map.json', root / 'download_history.json')
+            calls = {'save': 0, 'notify': 0}
+            original_save = app_mod.save_current_state
+
+            def counting_save(current):
+                calls['save'] += 1
+                original_save(current)
+
+            app_mod.save_current_state = counting_save
+            app_mod.queue_worker.notify = lambda: calls.__setitem__('notify', calls['notify'] + 1)
+            try:
+                app_mod.request.json = {'playlist': 0}
+                response = app_mod.bulk_enqueue_management_items()
+            finally:
+                app_mod.request.json = None
+
+            self.assertEqual((response['ok'], response['failed']), (5, 0))
+            self.assertEqual(calls, {'save': 1, 'notify': 1})
+            self.assertEqual(len(app_mod.load_current_state()['queue']), 5)
+
+
+class InProcessSyncApiTests(unittest.TestCase):
+    def test_run_streams_engine_progress_and_shares_the_cached_state(self):
+        from uplaysync.downloader import DownloadResult
+
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            app_mod = import_web_app_with_fake_flask()
+            app_mod.STATE_FILE_PATH = str(root / 'sync_state.json')
+            app_mod.ID_MAP_PATH = str(root / 'id_map.json')
+            app_mod.HISTORY_PATH = str(root / 'download_history.json')
+            app_mod.SYNC_LOCK_PATH = str(root / '.uplaysync.lock')
+            app_mod.STATUS_FILE_PATH = str(root / 'status.json')
+            app_mod.CONFIG_FILE_PATH = str(root / 'config.yaml')
+            (root / 'config.yaml').write_text(f'playlists:\n  - name: P\n    url: pl\n    folder: {root}\n', encoding='utf-8')
+            state.save_state(state.empty_state(), root / 'sync_state.json', root / 'id_map.json', root / 'download_history.json')
+            cached = app_mod.load_current_state()
+
+            class FakeDownloader:
+                def download(self, *, url, video_id, title, folder, cancel_event=None, progress_hook=None):
+                    progress_hook({'status': 'finished', 'downloaded_bytes': 5, 'total_bytes': 5})
+                    (Path(folder) / f'{title}.m4a').write_text('audio', encoding='utf-8')
+                    return DownloadResult(True, video_id, title, url, filename=f'{title}.m4a')
+
+            engine_sync = app_mod.sync_playlists
+
+            def sync_with_fakes(config, **kwargs):
+                kwargs['playlist_cache'] = None
+                return engine_sync(
+                    config,
+                    playlist_provider=lambda _url: [{'id': 'a1', 'title': 'Song', 'url': 'a1'}],
+                    downloader=FakeDownloader(),
+                    **kwargs,
+                )
+
+            app_mod.sync_playlists = sync_with_fakes
+            response = app_mod.run_sync()
+            lines = list(response[1][0])
+
+            self.assertIn('data: [다운로드] Song\n\n', lines)
+            progress = [
+                json.loads(line.split('data: ', 1)[1])
+                for line in lines
+                if line.startswith('event: progress\n')
+            ]
+            self.assertEqual(
+                [event['type'] for event in progress],
+                ['playlist_started', 'playlist_fetched', 'item_decided', 'download_progress',
+                 'download_finished', 'playlist_finished', 'sync_finished'],
+            )
+            self.assertEqual(progress[3]['downloaded_bytes'], 5)
+            self.assertIn('data: [시스템] 프로세스 종료 (성공)\n\n', lines)
+            self.assertEqual(lines[-1], 'event: close\ndata: close\n\n')
+            self.assertIs(app_mod.load_current_state(), cached)
+            self.assertEqual(cached['items']['a1']['status'], 'downloaded')
+            self.assertTrue(app_mod.sync_process_lock.acquire(blocking=False))
+            app_mod.sync_process_lock.release()
+            runs = app_mod.get_config()['recent_runs']
+            self.assertEqual(len(runs), 1)
+            self.assertTrue(runs[0]['ok'])
+            self.assertEqual(runs[0]['counts']['downloaded'], 1)
+            self.assertIn('download', runs[0]['phases'])
+
+    def test_enqueue_after_a_failed_mutation_survives_the_in_process_run(self):
+        from uplaysync.downloader import DownloadResult
+
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            app_mod = import_web_app_with_fake_flask()
+            app_mod.STATE_FILE_PATH = str(root / 'sync_state.json')
+            app_mod.ID_MAP_PATH = str(root / 'id_map.json')
+            app_mod.HISTORY_PATH = str(root / 'download_history.json')
+            app_mod.SYNC_LOCK_PATH = str(root / '.uplaysync.lock')
+            app_mod.STATUS_FILE_PATH = str(root / 'status.json')
+            app_mod.CONFIG_FILE_PATH = str(root / 'config.yaml')
+            app_mod.queue_worker.notify = lambda: None
+            (root / 'config.yaml').write_text(f'playlists:\n  - name: P\n    url: pl\n    folder: {root}\n', encoding='utf-8')
+            seeded = state.empty_state()
+            seeded['items']['b1'] = {'status': 'failed', 'title': 'Old', 'playlist_name': 'P', 'folder': str(root)}
+            state.save_state(seeded, root / 'sync_state.json', root / 'id_map.json', root / 'download_history.json')
+            responses = []
+
+            class FakeDownloader:
+                def download(self, *, url, video_id, title, folder, cancel_event=None, progress_hook=None):
+                    responses.append(app_mod.trash_management_item('missing'))
+                    app_mod.request.json = {}
+                    responses.append(app_mod.enqueue_management_item('b1'))
+                    (Path(folder) / f'{title}.m4a').write_text('audio', encoding='utf-8')
+                    return DownloadResult(True, video_id, title, url, filename=f'{title}.m4a')
+
+            engine_sync = app_mod.sync_playlists
+
+            def sync_with_fakes(config, **kwargs):
+                kwargs['playlist_cache'] = None
+                return engine_sync(
+                    config,
+                    playlist_provider=lambda _url: [{'id': 'a1', 'title': 'Song', 'url': 'a1'}],
+                    downloader=FakeDownloader(),
+                    **kwargs,
+                )
+
+            app_mod.sync_playlists = sync_with_fakes
+            lines = list(app_mod.run_sync()[1][0])
+
+            self.assertIn('data: [시스템] 프로세스 종료 (성공)\n\n', lines)
+            self.assertEqual([response[1] for response in responses], [404, 201])
+            cached = app_mod.load_current_state()
+            on_disk = state.load_state_file(root / 'sync_state.json')
+            for current in (cached, on_disk):
+                self.assertEqual([job['video_id'] for job in current['queue']], ['b1'])
+                self.assertEqual(current['items']['a1']['status'], 'downloaded')
+
+    def test_run_with_profile_writes_pstats_next_to_the_state_file(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            app_mod = import_web_app_with_fake_flask()
+            app_mod.STATE_FILE_PATH = str(root / 'sync_state.json')
+            app_mod.ID_MAP_PATH = str(root / 'id_map.json')
+            app_mod.HISTORY_PATH = str(root / 'download_history.json')
+            app_mod.SYNC_LOCK_PATH = str(root / '.uplaysync.lock')
+            app_mod.STATUS_FILE_PATH = str(root / 'status.json')
+            app_mod.CONFIG_FILE_PATH = str(root / 'config.yaml')
+            (root / 'config.yaml').write_text('playlists: []\n', encoding='utf-8')
+            app_mod.request.args = {'profile': '1'}
+
+            lines = list(app_mod.run_sync()[1][0])
+
+            self.assertTrue(any(line.startswith('data: [프로파일] 저장: ') for line in lines))
+            self.assertEqual(len(list((root / 'profiles').glob('sync-*.pstats'))), 1)
+            self.assertIn('data: [시스템] 프로세스 종료 (성공)\n\n', lines)
+
+
+class MetricsApiTests(unittest.TestCase):
+    def test_metrics_expose_queue_state_and_last_sync(self):
+        from uplaysync.run_history import record_run
+
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            app_mod = import_web_app_with_fake_flask()
+            app_mod.STATE_FILE_PATH = str(root / 'sync_state.json')
+            app_mod.ID_MAP_PATH = str(root / 'id_map.json')
+            app_mod.HISTORY_PATH = str(root / 'download_history.json')
+            app_mod.STATUS_FILE_PATH = str(root / 'status.json')
+            st = state.empty_state()
+            state.record_failure(st, video_id='bad1', title='Bad', url='u', playlist_name='P', folder=str(root), reason='x')
+            st['queue'] = [{'id': 'j1', 'video_id': 'bad1', 'status': 'queued', 'created_at': '2000-01-01T00:00:00+00:00'}]
+            state.save_state(st, root / 'sync_state.json', root / 'id_map.json', root / 'download_history.json')
+            record_run(root / 'status.json', {
+                'finished_at': '2026-01-01T00:00:00+00:00', 'seconds': 42.0, 'ok': True, 'cancelled': False,
+                'counts': {'downloaded': 2}, 'phases': {'state_save': {'seconds': 1.5}},
+            })
+
+            response = app_mod.get_metrics()
+            text = response[1][0]
+
+            self.assertEqual(response[2]['content_type'], 'text/plain; version=0.0.4; charset=utf-8')
+            self.assertIn('uplaysync_queue_jobs{status="queued"} 1\n', text)
+            self.assertIn('uplaysync_queue_jobs{status="running"} 0\n', text)
+            self.assertIn('uplaysync_state_items 1\n', text)
+            self.assertIn('uplaysync_last_sync_duration_seconds 42\n', text)
+            self.assertIn('uplaysync_last_sync_success 1\n', text)
+            self.assertIn('uplaysync_last_sync_phase_seconds{phase="state_save"} 1.5\n', text)
+            self.assertIn('uplaysync_state_load_seconds_count', text)
+            age = float(text.split('\nuplaysync_queue_oldest_queued_age_seconds ', 1)[1].split('\n', 1)[0])
+            self.assertGreater(age, 0)
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import json
+import threading
+from collections import deque
+from typing import Any
+
+DEFAULT_CHANGE_FEED_CAPACITY = 1000
+
+
+class ChangeFeed:
+    """Bounded, sequence-numbered log of change events that stream clients follow or resume.
+
+    ``since`` returns the events after a cursor, waiting up to ``timeout`` for
+    one to arrive. It returns ``None`` when the cursor is older than the
+    retained window (or from a previous process), so the client must resync.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CHANGE_FEED_CAPACITY):
+        self._cond = threading.Condition()
+        self._events: deque[dict[str, Any]] = deque(maxlen=max(1, int(capacity)))
+        self._sequence = 0
+
+    @property
+    def latest(self) -> int:
+        with self._cond:
+            return self._sequence
+
+    def publish(self, event: str, data: dict[str, Any] | None = None) -> int:
+        with self._cond:
+            self._sequence += 1
+            self._events.append({"id": self._sequence, "event": event, "data": data or {}})
+            self._cond.notify_all()
+            return self._sequence
+
+    def since(self, cursor: int, timeout: float | None = None) -> list[dict[str, Any]] | None:
+        with self._cond:
+            if cursor > self._sequence:
+                return None
+            if timeout and cursor == self._sequence:
+                self._cond.wait_for(lambda: self._sequence > cursor, timeout)
+            if self._events and cursor < self._events[0]["id"] - 1:
+                return None
+            return [event for event in self._events if event["id"] > cursor]
+
+
+def format_sse(event: dict[str, Any]) -> str:
+    payload = json.dumps(event["data"], ensure_ascii=False, separators=(",", ":"), default=str)
+    prefix = f"id: {event['id']}\n" if event.get("id") is not None else ""
+    return f"{prefix}event: {event['event']}\ndata: {payload}\n\n"
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import time
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
+from .matching import normalize_title
+
 
 class DownloadCancelled(Exception):
     """Raised internally when a queued download is cancelled."""
@@ -20,6 +23,22 @@ class DownloadResult:
     error: str | None = None
     preexisting: bool = False
     cancelled: bool = False
+    postprocess_seconds: float | None = None
+
+
+class _PostprocessTimer:
+    """yt-dlp ``postprocessor_hooks`` callback summing the time spent in post-processors (ffmpeg)."""
+
+    def __init__(self) -> None:
+        self.seconds = 0.0
+        self._started: dict[str, float] = {}
+
+    def __call__(self, status: dict[str, Any]) -> None:
+        name = status.get("postprocessor") or ""
+        if status.get("status") == "started":
+            self._started[name] = time.perf_counter()
+        elif status.get("status") == "finished" and name in self._started:
+            self.seconds += time.perf_counter() - self._started.pop(name)
 
 
 class DirectYtdlpDownloader:
@@ -35,7 +54,7 @@ class DirectYtdlpDownloader:
 
         return yt_dlp.YoutubeDL
 
-    def build_options(self, folder: str | Path, cancel_event=None) -> dict[str, Any]:
+    def build_options(self, folder: str | Path, cancel_event=None, progress_hook=None) -> dict[str, Any]:
         folder = Path(folder)
         opts = {
             "format": "bestaudio[ext=m4a]/bestaudio/best",
@@ -52,25 +71,41 @@ class DirectYtdlpDownloader:
                 }
             ],
         }
+        hooks = []
         if cancel_event is not None:
             def _cancel_hook(_status):
                 if cancel_event.is_set():
                     raise DownloadCancelled("download cancelled")
-            opts["progress_hooks"] = [_cancel_hook]
+            hooks.append(_cancel_hook)
+        if progress_hook is not None:
+            hooks.append(progress_hook)
+        if hooks:
+            opts["progress_hooks"] = hooks
         return opts
 
-    def download(self, *, url: str, video_id: str, title: str | None, folder: str | Path, cancel_event=None) -> DownloadResult:
+    def download(
+        self,
+        *,
+        url: str,
+        video_id: str,
+        title: str | None,
+        folder: str | Path,
+        cancel_event=None,
+        progress_hook=None,
+    ) -> DownloadResult:
         folder_path = Path(folder)
         folder_path.mkdir(parents=True, exist_ok=True)
         before = {p.name for p in folder_path.iterdir() if p.is_file()}
         if cancel_event is not None and cancel_event.is_set():
             return DownloadResult(False, video_id, title, url, error="download cancelled", cancelled=True)
-        opts = self.build_options(folder_path, cancel_event=cancel_event)
+        opts = self.build_options(folder_path, cancel_event=cancel_event, progress_hook=progress_hook)
+        postprocess = _PostprocessTimer()
+        opts["postprocessor_hooks"] = [postprocess]
         try:
             ydl_cls = self._youtube_dl_cls()
             with ydl_cls(opts) as ydl:
                 info = ydl.extract_info(url, download=True)
-            final_path = self._find_final_path(info, folder_path, before)
+            final_path = self._find_final_path(info, folder_path, before, title)
             if final_path is None:
                 return DownloadResult(False, video_id, title, url, error="download completed but final file was not found")
             return DownloadResult(
@@ -81,13 +116,20 @@ class DirectYtdlpDownloader:
                 filename=final_path.name,
                 path=str(final_path),
                 preexisting=final_path.name in before,
+                postprocess_seconds=postprocess.seconds,
             )
         except DownloadCancelled as exc:
             return DownloadResult(False, video_id, title, url, error=str(exc), cancelled=True)
         except Exception as exc:  # yt-dlp raises many concrete exception types
             return DownloadResult(False, video_id, title, url, error=str(exc))
 
-    def _find_final_path(self, info: dict[str, Any] | None, folder: Path, before: set[str]) -> Path | None:
+    def _find_final_path(
+        self,
+        info: dict[str, Any] | None,
+        folder: Path,
+        before: set[str],
+        title: str | None = None,
+    ) -> Path | None:
         if info:
             for requested in info.get("requested_downloads") or []:
                 candidate = requested.get("filepath") or requested.get("filename")
@@ -98,6 +140,10 @@ class DirectYtdlpDownloader:
                 if candidate and Path(candidate).exists():
                     return Path(candidate)
         after = [p for p in folder.iterdir() if p.is_file() and p.name not in before]
+        if title and len(after) > 1:
+            # Other workers may be writing into the same folder concurrently.
+            wanted = normalize_title(title)
+            after = [p for p in after if normalize_title(p.stem) == wanted] or after
         if after:
             return max(after, key=lambda p: p.stat().st_mtime)
         return None
@@ -1,31 +1,192 @@
 from __future__ import annotations
 
+import argparse
 import logging
 import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
 from typing import Any, Callable, Iterable
 
 from .config import load_config
 from .downloader import DirectYtdlpDownloader, DownloadResult
+from .events import (
+    DOWNLOAD_FINISHED,
+    ITEM_DECIDED,
+    PLAYLIST_FETCHED,
+    PLAYLIST_FINISHED,
+    PLAYLIST_STARTED,
+    SYNC_FINISHED,
+    ConsoleSink,
+    EventBus,
+    EventSink,
+)
+from .folder_cache import FOLDER_INDEX_CACHE_FILE, FolderIndexCache
 from .lock import AlreadyRunningError, ProcessLock
 from .management import record_playlist_snapshot
-from .matching import find_existing_file_match, get_existing_files
-from .playlist import get_playlist_items
+from .matching import find_existing_file_match, get_existing_files, normalize_title
+from .playlist import (
+    DEFAULT_MAX_PARALLEL_PLAYLIST_FETCHES,
+    DEFAULT_PLAYLIST_CACHE_TTL,
+    PLAYLIST_CACHE_DIR,
+    PlaylistMetadataCache,
+    PlaylistPrefetcher,
+    get_playlist_items,
+    iter_playlist_items,
+)
+from .profiling import profile_output_path, profile_requested, run_profiled
+from .run_history import DEFAULT_RUN_HISTORY_LIMIT, STATUS_FILE, record_run, run_record
 from .state import (
+    DEFAULT_JOURNAL_COMPACT_EVERY,
+    DEFAULT_LEGACY_MIRROR_INTERVAL,
     DOWNLOAD_HISTORY_FILE,
     ID_MAP_FILE,
     STATE_FILE,
+    ItemWriter,
     file_exists_for_entry,
+    flush_legacy_mirrors,
+    json_sibling_for,
     load_or_migrate_state,
+    open_state_journal,
     record_attempt,
     record_downloaded,
     record_failure,
+    resolve_state_backend,
+    resolve_state_path,
     save_state,
+    utc_now,
+)
+from .timing import (
+    PHASE_DOWNLOAD,
+    PHASE_FOLDER_SCAN,
+    PHASE_MATCHING,
+    PHASE_PLAYLIST_FETCH,
+    PHASE_PLAYLIST_WAIT,
+    PHASE_POSTPROCESS,
+    PHASE_STATE_SAVE,
+    PhaseTimer,
 )
 
 logger = logging.getLogger(__name__)
 
 
+class DownloadPool:
+    """Run downloads on worker threads; results are handed back to the caller's thread.
+
+    Results are released strictly in submission order, so state and history
+    writes match the playlist order regardless of which download finished
+    first. Finished results waiting behind a slower one count toward the
+    ``workers * 2`` jobs allowed in flight. Jobs targeting the same folder and
+    normalized title share a lock, so two workers never race on the same
+    ``%(title)s.%(ext)s`` output path.
+    """
+
+    def __init__(
+        self,
+        downloader: Any,
+        workers: int,
+        *,
+        cancel_event: threading.Event | None = None,
+        events: EventBus | None = None,
+    ):
+        self._downloader = downloader
+        self._cancel_event = cancel_event
+        self._events = events
+        self._workers = max(1, int(workers))
+        self._executor = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="uplaysync-download")
+        self._pending: dict[Future, tuple[int, dict[str, Any]]] = {}
+        self._finished: dict[int, tuple[dict[str, Any], DownloadResult]] = {}
+        self._sequence = 0
+        self._next_release = 0
+        self._path_locks: dict[tuple[str, str], threading.Lock] = {}
+        self._path_locks_guard = threading.Lock()
+
+    def _path_lock(self, job: dict[str, Any]) -> threading.Lock:
+        key = (os.path.abspath(job["folder"]), normalize_title(job["title"]))
+        with self._path_locks_guard:
+            return self._path_locks.setdefault(key, threading.Lock())
+
+    def _run(self, job: dict[str, Any]) -> DownloadResult:
+        with self._path_lock(job):
+            return _download(self._downloader, job, self._cancel_event, self._events)
+
+    def submit(self, job: dict[str, Any]) -> None:
+        future = self._executor.submit(self._run, job)
+        self._pending[future] = (self._sequence, job)
+        self._sequence += 1
+
+    def _collect(self, futures: Iterable[Future]) -> None:
+        for future in futures:
+            sequence, job = self._pending.pop(future)
+            try:
+                result = future.result()
+            except Exception as exc:  # downloader bugs must not abort the whole run
+                result = DownloadResult(False, job["video_id"], job["title"], job["url"], error=str(exc))
+            self._finished[sequence] = (job, result)
+
+    def _release(self) -> list[tuple[dict[str, Any], DownloadResult]]:
+        results = []
+        while self._next_release in self._finished:
+            results.append(self._finished.pop(self._next_release))
+            self._next_release += 1
+        return results
+
+    def completed(self, *, block: bool = False) -> list[tuple[dict[str, Any], DownloadResult]]:
+        """Collect finished jobs in submission order, blocking while the pool is saturated."""
+        results: list[tuple[dict[str, Any], DownloadResult]] = []
+        while self._pending:
+            outstanding = len(self._pending) + len(self._finished)
+            must_wait = not results and (block or outstanding >= self._workers * 2)
+            done, _ = wait(list(self._pending), timeout=None if must_wait else 0, return_when=FIRST_COMPLETED)
+            self._collect(done)
+            results.extend(self._release())
+            if not must_wait:
+                break
+        return results + self._release()
+
+    def drain(self) -> Iterable[tuple[dict[str, Any], DownloadResult]]:
+        while self._pending or self._finished:
+            yield from self.completed(block=True)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _download(
+    downloader: Any,
+    job: dict[str, Any],
+    cancel_event: threading.Event | None,
+    events: EventBus | None = None,
+) -> DownloadResult:
+    # Only pass the optional hooks that are in use so plain downloaders keep working.
+    extra: dict[str, Any] = {}
+    if cancel_event is not None:
+        extra["cancel_event"] = cancel_event
+    if events is not None:
+        extra["progress_hook"] = events.download_progress(job)
+    started = time.monotonic()
+    result = downloader.download(
+        url=job["url"],
+        video_id=job["video_id"],
+        title=job["title"],
+        folder=job["folder"],
+        **extra,
+    )
+    job["download_seconds"] = time.monotonic() - started
+    return result
+
+
+def _file_size(path: str | None) -> int | None:
+    if not path:
+        return None
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return None
+
+
 def video_url_from_item(item: dict[str, Any]) -> str | None:
     url = item.get("webpage_url") or item.get("url")
     if url and isinstance(url, str) and url.startswith("http"):
@@ -42,6 +203,7 @@ def should_queue_item(
     state: dict[str, Any],
     existing_files_map: dict[str, str],
     retry_failed: bool = False,
+    journal: ItemWriter | None = None,
 ) -> tuple[bool, str, str | None]:
     video_id = item.get("id")
     title = item.get("title")
@@ -72,6 +234,7 @@ def should_queue_item(
             playlist_name=playlist.get("name"),
             folder=folder,
             filename=matched_filename,
+            journal=journal,
         )
         return False, "existing title-compatible file", matched_filename
 
@@ -88,9 +251,94 @@ def sync_playlists(
     downloader: DirectYtdlpDownloader | None = None,
     retry_failed: bool = False,
     mirror_legacy: bool = True,
+    journal_compact_every: int | None = None,
+    json_export_path: str | Path | None = None,
+    mirror_interval: float = 0.0,
+    folder_index_cache_path: str | Path | None = None,
+    max_parallel_playlist_fetches: int = 1,
+    download_concurrency: int = 1,
+    playlist_cache: PlaylistMetadataCache | None = None,
+    stream_playlists: bool = False,
+    state: dict[str, Any] | None = None,
+    state_lock: Any = None,
+    on_state_saved: Callable[[dict[str, Any]], None] | None = None,
+    log: Callable[[str], None] = print,
+    on_event: EventSink | None = None,
+    cancel_event: threading.Event | None = None,
 ) -> dict[str, Any]:
-    state = load_or_migrate_state(state_path, id_map_path, history_path, mirror_legacy=mirror_legacy)
+    """Sync every configured playlist.
+
+    When ``journal_compact_every`` is set, per-item mutations are appended to
+    ``<state>.journal`` and the full snapshot is only rewritten every N records.
+    SQLite state paths always write per-item rows instead of full snapshots.
+    Legacy mirror writes are coalesced to one per ``mirror_interval`` seconds
+    and flushed when the run finishes. ``folder_index_cache_path`` persists
+    folder scans so unchanged directories are not walked again. Playlist
+    metadata is fetched up to ``max_parallel_playlist_fetches`` at a time while
+    playlists are still processed in config order. ``download_concurrency``
+    runs downloads on worker threads; their results are still recorded by
+    this thread, one at a time. With ``playlist_cache`` set, playlist
+    metadata is read through it (``playlist_provider`` is ignored).
+    With ``stream_playlists`` the provider returns an iterator: items are
+    matched and downloaded as entries arrive, and the playlist snapshot is
+    recorded once the stream is exhausted.
+
+    In-process callers can pass an already loaded ``state`` that other threads
+    share: every read and mutation then happens under ``state_lock`` (never
+    across a download), and ``on_state_saved`` runs under the lock after each
+    block that changed or saved the state (read-only decisions don't call it). Setting ``cancel_event`` stops the run after the current
+    item and cancels in-flight downloads.
+
+    Progress is reported as ``SyncEvent``s (see ``uplaysync.events``): the
+    console lines written to ``log`` are rendered from them, and ``on_event``
+    receives every event, including throttled ``download_progress`` from
+    yt-dlp's progress hooks (passed to the downloader as ``progress_hook``).
+
+    ``summary["timings"]`` holds wall-clock totals and duration histograms per
+    phase (playlist fetch, folder scan, matching, download, post-processing,
+    state save), overall and per playlist.
+    """
+    run_started = time.monotonic()
+    started_at = utc_now()
+    timer = PhaseTimer()
+    if state is None:
+        state = load_or_migrate_state(state_path, id_map_path, history_path, mirror_legacy=mirror_legacy)
     downloader = downloader or DirectYtdlpDownloader()
+    journal = open_state_journal(state_path, journal_compact_every)
+    folder_cache = FolderIndexCache(folder_index_cache_path) if folder_index_cache_path else None
+    events = EventBus(ConsoleSink(log), on_event)
+    progress_events = events if on_event is not None else None
+
+    state_changed = False
+
+    @contextmanager
+    def state_access():
+        # Blocks set ``state_changed`` when they mutate; ``persist`` always does.
+        nonlocal state_changed
+        with state_lock if state_lock is not None else nullcontext():
+            state_changed = False
+            yield
+            if state_changed and on_state_saved is not None:
+                on_state_saved(state)
+
+    def cancelled() -> bool:
+        return cancel_event is not None and cancel_event.is_set()
+
+    def persist(final: bool = False, playlist: str | None = None) -> None:
+        nonlocal state_changed
+        state_changed = True
+        with timer.measure(PHASE_STATE_SAVE, playlist):
+            save_state(
+                state,
+                state_path,
+                id_map_path,
+                history_path,
+                mirror_legacy=mirror_legacy,
+                journal=journal,
+                json_export_path=json_export_path,
+                mirror_interval=0.0 if final else mirror_interval,
+            )
+
     summary = {
         "checked": 0,
         "downloaded": 0,
@@ -103,116 +351,322 @@ def sync_playlists(
         "trashed": 0,
         "missing_metadata": 0,
         "redownload": 0,
+        "cancelled": False,
     }
+    if playlist_cache is not None:
+        summary["playlist_cache"] = {"hits": 0, "misses": 0}
 
-    for playlist_index, playlist in enumerate(config.get("playlists", []) or []):
-        name = playlist.get("name") or playlist.get("url") or "playlist"
-        folder = playlist.get("folder")
-        url = playlist.get("url")
-        if not folder or not url:
-            logger.warning("Skipping playlist with missing folder/url: %s", name)
-            continue
-
-        print(f"\n플레이리스트 처리 중: {name}")
-        existing_files_map = get_existing_files(folder)
-        items = playlist_provider(url)
-        record_playlist_snapshot(state, playlist, items, index=playlist_index)
-        print(f"플레이리스트에서 {len(items)}개의 항목을 발견했습니다.")
-
-        for item in items:
-            summary["checked"] += 1
-            video_id = item.get("id")
-            title = item.get("title")
-            should_queue, reason, matched = should_queue_item(
-                item,
-                playlist,
+    playlists = config.get("playlists", []) or []
+    prefetcher = PlaylistPrefetcher(
+        [playlist.get("url") for playlist in playlists if playlist.get("folder") and playlist.get("url")],
+        (playlist_cache.iter if stream_playlists else playlist_cache.get)
+        if playlist_cache is not None
+        else playlist_provider,
+        max_workers=max_parallel_playlist_fetches,
+        stream=stream_playlists,
+    )
+    pool = (
+        DownloadPool(downloader, download_concurrency, cancel_event=cancel_event, events=progress_events)
+        if download_concurrency > 1
+        else None
+    )
+
+    def apply_result(job: dict[str, Any], result: DownloadResult) -> None:
+        nonlocal state_changed
+        title = job["title"]
+        if job.get("download_seconds") is not None:
+            postprocess_seconds = result.postprocess_seconds or 0.0
+            timer.record(PHASE_DOWNLOAD, job["download_seconds"] - postprocess_seconds, job["playlist_name"])
+            if result.postprocess_seconds is not None:
+                timer.record(PHASE_POSTPROCESS, postprocess_seconds, job["playlist_name"])
+        if result.ok and result.filename:
+            record_downloaded(
                 state,
-                existing_files_map,
-                retry_failed=retry_failed,
+                video_id=job["video_id"],
+                title=title,
+                url=job["url"],
+                playlist_name=job["playlist_name"],
+                folder=job["folder"],
+                filename=result.filename,
+                journal=journal,
             )
-            if not should_queue:
+            if result.preexisting:
                 summary["skipped"] += 1
-                if reason == "state file exists":
-                    summary["already_synced"] += 1
-                elif reason == "existing title-compatible file":
-                    summary["existing_matched"] += 1
-                elif reason == "previous failure recorded":
-                    summary["previous_failed"] += 1
-                elif reason == "user trashed":
-                    summary["trashed"] += 1
-                elif reason == "missing id/title":
-                    summary["missing_metadata"] += 1
-                continue
+                summary["existing_matched"] += 1
+            else:
+                summary["downloaded"] += 1
+        elif not result.cancelled:
+            record_failure(
+                state,
+                video_id=job["video_id"],
+                title=title,
+                url=job["url"],
+                playlist_name=job["playlist_name"],
+                folder=job["folder"],
+                reason=result.error or "unknown download failure",
+                journal=journal,
+            )
+            summary["failed"] += 1
+        events.emit(
+            DOWNLOAD_FINISHED,
+            playlist=job["playlist_name"],
+            video_id=job["video_id"],
+            title=title,
+            ok=bool(result.ok and result.filename),
+            cancelled=result.cancelled,
+            preexisting=result.preexisting,
+            filename=result.filename,
+            error=result.error,
+            bytes=_file_size(result.path),
+            seconds=job.get("download_seconds"),
+        )
+        if result.cancelled:
+            return
+        state_changed = True
+        if journal is None or journal.needs_compaction():
+            persist(playlist=job["playlist_name"])
 
-            video_url = video_url_from_item(item)
-            if not video_id or not title or not video_url:
-                summary["skipped"] += 1
-                summary["missing_metadata"] += 1
+    def apply_results(results: Iterable[tuple[dict[str, Any], DownloadResult]]) -> None:
+        for finished_job, result in results:
+            with state_access():
+                apply_result(finished_job, result)
+
+    try:
+        for playlist_index, playlist in enumerate(playlists):
+            name = playlist.get("name") or playlist.get("url") or "playlist"
+            folder = playlist.get("folder")
+            url = playlist.get("url")
+            if not folder or not url:
+                logger.warning("Skipping playlist with missing folder/url: %s", name)
                 continue
+            if cancelled():
+                break
 
-            summary["queued"] += 1
-            if reason == "state file missing":
-                summary["redownload"] += 1
-                print(f"[재다운로드] {title}")
-            else:
-                print(f"[다운로드] {title}")
-            record_attempt(state, video_id)
-            result = downloader.download(url=video_url, video_id=video_id, title=title, folder=folder)
-            if result.ok and result.filename:
-                record_downloaded(
-                    state,
-                    video_id=video_id,
-                    title=title,
-                    url=video_url,
-                    playlist_name=name,
-                    folder=folder,
-                    filename=result.filename,
+            playlist_started = time.monotonic()
+            checked_before, queued_before = summary["checked"], summary["queued"]
+            events.emit(PLAYLIST_STARTED, playlist=name, index=playlist_index, count=len(playlists))
+            with timer.measure(PHASE_FOLDER_SCAN, name):
+                existing_files_map = (
+                    folder_cache.get_existing_files(folder) if folder_cache else get_existing_files(folder)
                 )
-                if result.preexisting:
-                    summary["skipped"] += 1
-                    summary["existing_matched"] += 1
-                else:
-                    summary["downloaded"] += 1
-                    print(f"  [완료] {title} -> {result.filename}")
-            else:
-                record_failure(
-                    state,
+            fetch_started = time.perf_counter()
+            items = prefetcher.get(url)
+            fetch_seconds = time.perf_counter() - fetch_started
+            streamed = not isinstance(items, list)
+            seen_items: list[dict[str, Any]] = []
+            if not streamed:
+                with state_access():
+                    record_playlist_snapshot(state, playlist, items, index=playlist_index)
+                    state_changed = True
+            events.emit(
+                PLAYLIST_FETCHED,
+                playlist=name,
+                index=playlist_index,
+                streamed=streamed,
+                total=None if streamed else len(items),
+                seconds=fetch_seconds,
+            )
+
+            # Streams fetch lazily, so time spent waiting for the next entry also counts as fetching.
+            entries = iter(items)
+            while not cancelled():
+                waited = time.perf_counter()
+                item = next(entries, None)
+                fetch_seconds += time.perf_counter() - waited
+                if item is None:
+                    break
+                if streamed:
+                    seen_items.append(item)
+                summary["checked"] += 1
+                video_id = item.get("id")
+                title = item.get("title")
+                with state_access():
+                    with timer.measure(PHASE_MATCHING, name):
+                        should_queue, reason, matched = should_queue_item(
+                            item,
+                            playlist,
+                            state,
+                            existing_files_map,
+                            retry_failed=retry_failed,
+                            journal=journal,
+                        )
+                    video_url = video_url_from_item(item)
+                    if should_queue and not (video_id and title and video_url):
+                        should_queue, reason = False, "missing url"
+                    if should_queue:
+                        record_attempt(state, video_id, journal=journal)
+                    # should_queue_item records title-matched files it adopts.
+                    state_changed = should_queue or reason == "existing title-compatible file"
+                events.emit(
+                    ITEM_DECIDED,
+                    playlist=name,
                     video_id=video_id,
                     title=title,
-                    url=video_url,
-                    playlist_name=name,
-                    folder=folder,
-                    reason=result.error or "unknown download failure",
+                    queued=should_queue,
+                    reason=reason,
+                    filename=matched,
                 )
-                summary["failed"] += 1
-                print(f"  [오류] {title}: {result.error or 'unknown download failure'}")
-            save_state(state, state_path, id_map_path, history_path, mirror_legacy=mirror_legacy)
-
-    save_state(state, state_path, id_map_path, history_path, mirror_legacy=mirror_legacy)
-    already_done = summary["already_synced"] + summary["existing_matched"]
-    print(
-        f"\n요약: 확인 {summary['checked']}개, 새 다운로드 {summary['downloaded']}개, "
-        f"이미 있음 {already_done}개, 이전 실패 스킵 {summary['previous_failed']}개, "
-        f"휴지통 스킵 {summary['trashed']}개, 신규 실패 {summary['failed']}개"
-    )
+                if not should_queue:
+                    summary["skipped"] += 1
+                    if reason == "state file exists":
+                        summary["already_synced"] += 1
+                    elif reason == "existing title-compatible file":
+                        summary["existing_matched"] += 1
+                    elif reason == "previous failure recorded":
+                        summary["previous_failed"] += 1
+                    elif reason == "user trashed":
+                        summary["trashed"] += 1
+                    elif reason in ("missing id/title", "missing url"):
+                        summary["missing_metadata"] += 1
+                    continue
+
+                summary["queued"] += 1
+                if reason == "state file missing":
+                    summary["redownload"] += 1
+                job = {"video_id": video_id, "title": title, "url": video_url, "playlist_name": name, "folder": folder}
+                if pool is None:
+                    apply_results([(job, _download(downloader, job, cancel_event, progress_events))])
+                    continue
+                pool.submit(job)
+                apply_results(pool.completed())
+
+            wait_seconds = fetch_seconds
+            prefetched_seconds = prefetcher.take_fetch_seconds(url)
+            if prefetched_seconds is not None:
+                # Blocking on a prefetched playlist is not the fetch itself; report both.
+                fetch_seconds = prefetched_seconds
+                timer.record(PHASE_PLAYLIST_WAIT, wait_seconds, name)
+            timer.record(PHASE_PLAYLIST_FETCH, fetch_seconds, name)
+            if streamed and not cancelled():
+                # A cancelled stream only saw part of the playlist; keep the previous snapshot.
+                with state_access():
+                    record_playlist_snapshot(state, playlist, seen_items, index=playlist_index)
+                    state_changed = True
+            events.emit(
+                PLAYLIST_FINISHED,
+                playlist=name,
+                index=playlist_index,
+                streamed=streamed,
+                cancelled=cancelled(),
+                total=len(seen_items) if streamed else len(items),
+                checked=summary["checked"] - checked_before,
+                queued=summary["queued"] - queued_before,
+                fetch_seconds=fetch_seconds,
+                wait_seconds=wait_seconds,
+                seconds=time.monotonic() - playlist_started,
+                phases=timer.playlist(name),
+            )
+
+        if pool is not None:
+            apply_results(pool.drain())
+    finally:
+        prefetcher.close()
+        if pool is not None:
+            pool.close()
+
+    summary["cancelled"] = cancelled()
+    with state_access():
+        persist(final=True)
+    if folder_cache:
+        folder_cache.save()
+    if playlist_cache is not None:
+        summary["playlist_cache"] = playlist_cache.stats()
+    summary["started_at"] = started_at
+    summary["finished_at"] = utc_now()
+    summary["seconds"] = round(time.monotonic() - run_started, 6)
+    summary["timings"] = timer.to_dict()
+    events.emit(SYNC_FINISHED, summary=summary)
     return {"state": state, "summary": summary}
 
 
+def sync_options_from_config(
+    config: dict[str, Any],
+    state_path: str | Path,
+    *,
+    refresh_playlists: bool = False,
+) -> dict[str, Any]:
+    """Translate config keys into ``sync_playlists`` keyword arguments for a resolved ``state_path``."""
+    state_path = Path(state_path)
+    journal_compact_every = None
+    if config.get("state_journal", False):
+        journal_compact_every = int(config.get("state_journal_compact_every") or DEFAULT_JOURNAL_COMPACT_EVERY)
+    json_export_path = None
+    if config.get("state_json_export") and state_path.suffix != ".json":
+        json_export_path = json_sibling_for(state_path)
+    folder_index_cache_path = None
+    if config.get("folder_index_cache", True):
+        folder_index_cache_path = state_path.parent / FOLDER_INDEX_CACHE_FILE
+    playlist_cache_ttl = 0.0 if refresh_playlists else float(
+        config.get("playlist_cache_ttl", DEFAULT_PLAYLIST_CACHE_TTL)
+    )
+    stream_playlists = bool(config.get("stream_playlist_entries", False))
+    playlist_cache = PlaylistMetadataCache(
+        state_path.parent / PLAYLIST_CACHE_DIR,
+        ttl=playlist_cache_ttl,
+        provider=iter_playlist_items if stream_playlists else get_playlist_items,
+    )
+    return {
+        "retry_failed": bool(config.get("retry_failed", False)),
+        "journal_compact_every": journal_compact_every,
+        "json_export_path": json_export_path,
+        "mirror_interval": float(config.get("legacy_mirror_interval", DEFAULT_LEGACY_MIRROR_INTERVAL)),
+        "folder_index_cache_path": folder_index_cache_path,
+        "download_concurrency": int(config.get("download_concurrency", 1)),
+        "playlist_cache": playlist_cache,
+        "stream_playlists": stream_playlists,
+        "max_parallel_playlist_fetches": int(
+            config.get("max_parallel_playlist_fetches", DEFAULT_MAX_PARALLEL_PLAYLIST_FETCHES)
+        ),
+    }
+
+
 def main(argv: Iterable[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Sync configured YouTube playlists.")
+    parser.add_argument(
+        "--refresh-playlists",
+        action="store_true",
+        help="ignore cached playlist metadata and fetch every playlist again",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="run the sync under cProfile, save a .pstats file next to the state file and print hotspots",
+    )
+    args = parser.parse_args(list(argv) if argv is not None else None)
     logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
     config = load_config("config.yaml")
-    retry_failed = bool(config.get("retry_failed", False))
     lock_path = os.environ.get("UPLAYSYNC_LOCK_FILE", ".uplaysync.lock")
+    state_path = resolve_state_path(
+        os.environ.get("UPLAYSYNC_STATE_FILE", STATE_FILE),
+        resolve_state_backend(config),
+    )
+    status_path = os.environ.get("UPLAYSYNC_STATUS_FILE", STATUS_FILE)
+    run_history_limit = int(config.get("run_history_limit", DEFAULT_RUN_HISTORY_LIMIT))
     try:
         with ProcessLock(lock_path):
-            sync_playlists(
-                config,
-                state_path=os.environ.get("UPLAYSYNC_STATE_FILE", STATE_FILE),
-                id_map_path=os.environ.get("UPLAYSYNC_ID_MAP_FILE", ID_MAP_FILE),
-                history_path=os.environ.get("UPLAYSYNC_HISTORY_FILE", DOWNLOAD_HISTORY_FILE),
-                retry_failed=retry_failed,
-            )
+            started_at = utc_now()
+
+            def run() -> dict[str, Any]:
+                return sync_playlists(
+                    config,
+                    state_path=state_path,
+                    id_map_path=os.environ.get("UPLAYSYNC_ID_MAP_FILE", ID_MAP_FILE),
+                    history_path=os.environ.get("UPLAYSYNC_HISTORY_FILE", DOWNLOAD_HISTORY_FILE),
+                    **sync_options_from_config(config, state_path, refresh_playlists=args.refresh_playlists),
+                )
+
+            try:
+                if args.profile or profile_requested(os.environ.get("UPLAYSYNC_PROFILE")):
+                    result = run_profiled(run, profile_output_path(state_path))
+                else:
+                    result = run()
+            except Exception as exc:
+                record_run(status_path, run_record(started_at=started_at, error=exc), run_history_limit)
+                raise
+            record_run(status_path, run_record(result["summary"]), run_history_limit)
     except AlreadyRunningError as exc:
         print(f"[중복 실행 방지] {exc}")
         return 2
+    finally:
+        flush_legacy_mirrors()
     return 0
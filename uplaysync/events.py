@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+PLAYLIST_STARTED = "playlist_started"
+PLAYLIST_FETCHED = "playlist_fetched"
+ITEM_DECIDED = "item_decided"
+DOWNLOAD_PROGRESS = "download_progress"
+DOWNLOAD_FINISHED = "download_finished"
+PLAYLIST_FINISHED = "playlist_finished"
+SYNC_FINISHED = "sync_finished"
+
+# yt-dlp calls progress hooks for every chunk; forward at most this often per download.
+DOWNLOAD_PROGRESS_INTERVAL = 0.5
+
+
+@dataclass(frozen=True)
+class SyncEvent:
+    type: str
+    data: dict[str, Any]
+    at: float = field(default_factory=time.time)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"type": self.type, "at": self.at, **self.data}
+
+
+EventSink = Callable[[SyncEvent], None]
+
+
+class EventBus:
+    """Fan a sync run's events out to sinks.
+
+    ``emit`` may be called from download worker threads, so sinks must be
+    thread-safe. A failing sink is logged and never aborts the sync.
+    """
+
+    def __init__(self, *sinks: EventSink | None):
+        self._sinks = [sink for sink in sinks if sink is not None]
+
+    def emit(self, event_type: str, **data: Any) -> None:
+        self.dispatch(SyncEvent(event_type, data))
+
+    def dispatch(self, event: SyncEvent) -> None:
+        """Deliver an already built event; also usable as a sink to chain buses."""
+        for sink in self._sinks:
+            try:
+                sink(event)
+            except Exception:
+                logger.exception("Sync event sink failed for %s", event.type)
+
+    def download_progress(self, job: dict[str, Any]) -> Callable[[dict[str, Any]], None]:
+        """Return a yt-dlp progress hook that emits throttled ``download_progress`` events for ``job``."""
+        last_emit = 0.0
+
+        def hook(status: dict[str, Any]) -> None:
+            nonlocal last_emit
+            now = time.monotonic()
+            if status.get("status") == "downloading" and now - last_emit < DOWNLOAD_PROGRESS_INTERVAL:
+                return
+            last_emit = now
+            self.emit(
+                DOWNLOAD_PROGRESS,
+                playlist=job["playlist_name"],
+                video_id=job["video_id"],
+                title=job["title"],
+                status=status.get("status"),
+                downloaded_bytes=status.get("downloaded_bytes"),
+                total_bytes=status.get("total_bytes") or status.get("total_bytes_estimate"),
+                speed=status.get("speed"),
+                eta=status.get("eta"),
+            )
+
+        return hook
+
+
+class ConsoleSink:
+    """Render events as the Korean progress lines ``sync.py`` prints."""
+
+    def __init__(self, write: Callable[[str], None] = print):
+        self._write = write
+
+    def __call__(self, event: SyncEvent) -> None:
+        line = self.format(event)
+        if line is not None:
+            self._write(line)
+
+    @staticmethod
+    def format(event: SyncEvent) -> str | None:
+        data = event.data
+        if event.type == PLAYLIST_STARTED:
+            return f"\n플레이리스트 처리 중: {data['playlist']}"
+        if event.type == PLAYLIST_FETCHED and not data.get("streamed"):
+            return f"플레이리스트에서 {data['total']}개의 항목을 발견했습니다."
+        if event.type == PLAYLIST_FINISHED and data.get("streamed") and not data.get("cancelled"):
+            return f"플레이리스트에서 {data['total']}개의 항목을 발견했습니다."
+        if event.type == ITEM_DECIDED and data.get("queued"):
+            prefix = "[재다운로드]" if data.get("reason") == "state file missing" else "[다운로드]"
+            return f"{prefix} {data['title']}"
+        if event.type == DOWNLOAD_FINISHED:
+            if data.get("cancelled"):
+                return f"  [중지] {data['title']}"
+            if not data.get("ok"):
+                return f"  [오류] {data['title']}: {data.get('error') or 'unknown download failure'}"
+            if not data.get("preexisting"):
+                return f"  [완료] {data['title']} -> {data['filename']}"
+            return None
+        if event.type == SYNC_FINISHED:
+            summary = data["summary"]
+            already_done = summary["already_synced"] + summary["existing_matched"]
+            line = (
+                f"\n요약: 확인 {summary['checked']}개, 새 다운로드 {summary['downloaded']}개, "
+                f"이미 있음 {already_done}개, 이전 실패 스킵 {summary['previous_failed']}개, "
+                f"휴지통 스킵 {summary['trashed']}개, 신규 실패 {summary['failed']}개"
+            )
+            if summary.get("cancelled"):
+                line = "\n[중지] 동기화가 중지되었습니다." + line
+            return line
+        return None
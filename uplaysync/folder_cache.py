@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Iterable
+
+from .matching import SUPPORTED_AUDIO_EXTENSIONS, FolderIndex, get_existing_files
+from .state import _atomic_write_json, _load_json
+
+FOLDER_INDEX_CACHE_FILE = "folder_index_cache.json"
+FOLDER_INDEX_CACHE_VERSION = 1
+# Directory mtimes this close to the scan may hide a same-tick change; don't trust them.
+MTIME_SETTLE_NS = 2_000_000_000
+
+logger = logging.getLogger(__name__)
+
+
+class FolderIndexCache:
+    """Persisted FolderIndex per folder, reused while the directory mtime is unchanged."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        raw = _load_json(self.path, {})
+        folders = raw.get("folders") if isinstance(raw, dict) else None
+        if not isinstance(raw, dict) or raw.get("version") != FOLDER_INDEX_CACHE_VERSION or not isinstance(folders, dict):
+            folders = {}
+        self._folders: dict[str, dict[str, Any]] = folders
+
+    @staticmethod
+    def _stat(folder: Path) -> os.stat_result | None:
+        try:
+            return folder.stat()
+        except OSError:
+            return None
+
+    @staticmethod
+    def _cached_files(cached: dict[str, Any]) -> list[list[str]] | None:
+        """The entry's ``files`` if they are well-formed and match its recorded ``count``."""
+        files = cached.get("files")
+        if not isinstance(files, list) or cached.get("count") != len(files):
+            return None
+        if not all(isinstance(pair, list) and len(pair) == 2 for pair in files):
+            return None
+        return files
+
+    def get_existing_files(
+        self,
+        folder_path: str | os.PathLike[str],
+        audio_extensions: Iterable[str] = SUPPORTED_AUDIO_EXTENSIONS,
+    ) -> FolderIndex:
+        folder = Path(folder_path)
+        key = os.path.abspath(folder)
+        extensions = sorted({ext.lower() for ext in audio_extensions})
+        before = self._stat(folder)
+        cached = self._folders.get(key)
+        if not isinstance(cached, dict):
+            cached = None
+        files = self._cached_files(cached) if cached else None
+        if cached and files is None:
+            # Truncated or hand-edited entry: drop it and rescan.
+            del self._folders[key]
+            self._dirty = True
+        if (
+            before is not None
+            and files is not None
+            and cached.get("extensions") == extensions
+            and cached.get("mtime_ns") == before.st_mtime_ns
+            and cached.get("inode") == before.st_ino
+            and cached.get("mtime_ns", 0) <= cached.get("scanned_at_ns", 0) - MTIME_SETTLE_NS
+        ):
+            self.hits += 1
+            return FolderIndex((norm, filename) for norm, filename in files)
+
+        self.misses += 1
+        scanned_at_ns = time.time_ns()
+        index = get_existing_files(folder, extensions)
+        after = self._stat(folder)
+        if before is None or after is None or after.st_mtime_ns != before.st_mtime_ns:
+            # Missing folder or changed during the scan: use the result but don't persist it.
+            if self._folders.pop(key, None) is not None:
+                self._dirty = True
+            return index
+        self._folders[key] = {
+            "mtime_ns": after.st_mtime_ns,
+            "inode": after.st_ino,
+            "scanned_at_ns": scanned_at_ns,
+            "count": len(index),
+            "extensions": extensions,
+            "files": [[norm, filename] for norm, filename in index.items()],
+        }
+        self._dirty = True
+        return index
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        try:
+            _atomic_write_json(self.path, {"version": FOLDER_INDEX_CACHE_VERSION, "folders": self._folders})
+            self._dirty = False
+        except OSError as exc:
+            logger.warning("Failed to write folder index cache %s: %s", self.path, exc)
@@ -2,7 +2,9 @@ from __future__ import annotations
 
 import fcntl
 import os
+import threading
 from pathlib import Path
+from typing import Callable
 
 
 class AlreadyRunningError(RuntimeError):
@@ -38,3 +40,77 @@ class ProcessLock:
 
     def __exit__(self, exc_type, exc, tb) -> None:
         self.release()
+
+
+class SyncGate:
+    """In-process sync lock; releasing it wakes waiters instead of leaving them to poll.
+
+    A full sync holds the gate exclusively. Queue downloads hold it shared, so
+    several of them can run together while still keeping a sync out.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._held = False
+        self._shared = 0
+
+    def acquire(self, blocking: bool = True) -> bool:
+        with self._cond:
+            if blocking:
+                while self._held or self._shared:
+                    self._cond.wait()
+            elif self._held or self._shared:
+                return False
+            self._held = True
+            return True
+
+    def acquire_unless(self, abort: Callable[[], bool]) -> bool:
+        """Block until the gate is free, giving up once ``abort()`` is true after a ``wake``."""
+        with self._cond:
+            while self._held or self._shared:
+                if abort():
+                    return False
+                self._cond.wait()
+            self._held = True
+            return True
+
+    def acquire_shared_unless(self, abort: Callable[[], bool]) -> bool:
+        """Like ``acquire_unless`` but only excludes an exclusive holder."""
+        with self._cond:
+            while self._held:
+                if abort():
+                    return False
+                self._cond.wait()
+            self._shared += 1
+            return True
+
+    def release(self) -> None:
+        with self._cond:
+            if not self._held:
+                raise RuntimeError("release of unheld SyncGate")
+            self._held = False
+            self._cond.notify_all()
+
+    def release_shared(self) -> None:
+        with self._cond:
+            if not self._shared:
+                raise RuntimeError("release of unheld shared SyncGate")
+            self._shared -= 1
+            if not self._shared:
+                self._cond.notify_all()
+
+    def wake(self) -> None:
+        """Make blocked ``acquire_unless`` callers re-check their abort condition."""
+        with self._cond:
+            self._cond.notify_all()
+
+    def locked(self) -> bool:
+        with self._cond:
+            return self._held or bool(self._shared)
+
+    def __enter__(self) -> "SyncGate":
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.release()
@@ -1,14 +1,24 @@
 from __future__ import annotations
 
 import hashlib
+import heapq
+import itertools
+import os
 import uuid
 from pathlib import Path
-from typing import Any, Iterable
+from typing import Any, Callable, Iterable
 
-from .playlist import get_playlist_items
-from .state import add_history, file_exists_for_entry, utc_now
+from .matching import normalize_title
+from .playlist import DEFAULT_MAX_PARALLEL_PLAYLIST_FETCHES, PlaylistPrefetcher, get_playlist_items
+from .state import DirectoryListing, add_history, cached_index, drop_index, file_exists_for_entry, utc_now
 
 QUEUE_ACTIVE_STATUSES = {"queued", "running"}
+# Higher runs first. Single actions from /manage jump ahead of bulk backfills.
+QUEUE_PRIORITY_BULK = 0
+QUEUE_PRIORITY_INTERACTIVE = 10
+QUEUE_INDEX = "queue_heap"
+SNAPSHOT_VIDEO_INDEX = "snapshot_videos"
+MANAGEMENT_ITEM_STATUSES = {"downloaded", "failed", "missing", "not_downloaded", "queued", "running", "trashed", "unknown"}
 TRASH_DIR_NAME = ".uplaysync-trash"
 
 
@@ -38,7 +48,8 @@ def compact_queue(state: dict[str, Any], *, keep_finished: int = 100) -> None:
         archive.extend(finished[:-keep_finished])
         finished = finished[-keep_finished:]
         state["queue_history"] = archive[-500:]
-    state["queue"] = active + finished
+    # In place, so the queue heap index keeps pointing at the live list.
+    state["queue"][:] = active + finished
 
 
 def video_url_from_snapshot_item(item: dict[str, Any]) -> str | None:
@@ -89,6 +100,7 @@ def record_playlist_snapshot(
         "items": normalized,
     }
     state["playlist_snapshots"][key] = snapshot
+    _snapshot_video_index(state).update(key, snapshot)
     return snapshot
 
 
@@ -110,6 +122,55 @@ def refresh_playlist_snapshot(
     return record_playlist_snapshot(state, playlist, items, index=playlist_index)
 
 
+def fetch_all_playlist_items(
+    config: dict[str, Any],
+    *,
+    playlist_provider=get_playlist_items,
+    max_workers: int = DEFAULT_MAX_PARALLEL_PLAYLIST_FETCHES,
+) -> list[dict[str, Any]]:
+    """Fetch every configured playlist concurrently; one result per playlist, in config order."""
+    playlists = config.get("playlists", []) or []
+    results: list[dict[str, Any]] = []
+    with PlaylistPrefetcher(
+        [playlist.get("url") for playlist in playlists],
+        playlist_provider,
+        max_workers=max_workers,
+    ) as prefetcher:
+        for index, playlist in enumerate(playlists):
+            result: dict[str, Any] = {"index": index, "playlist": playlist, "items": None, "error": None}
+            if not playlist.get("url"):
+                result["error"] = "playlist url is required"
+            else:
+                try:
+                    result["items"] = prefetcher.get(playlist["url"])
+                except Exception as exc:  # one broken playlist must not abort the rest
+                    result["error"] = str(exc)
+            results.append(result)
+    return results
+
+
+def record_fetched_playlists(state: dict[str, Any], fetched: Iterable[dict[str, Any]]) -> dict[str, Any]:
+    snapshots = []
+    errors = []
+    for result in fetched:
+        if result.get("error"):
+            errors.append({"index": result["index"], "error": result["error"]})
+            continue
+        snapshots.append(record_playlist_snapshot(state, result["playlist"], result["items"] or [], index=result["index"]))
+    return {"snapshots": snapshots, "errors": errors}
+
+
+def refresh_all_playlist_snapshots(
+    state: dict[str, Any],
+    config: dict[str, Any],
+    *,
+    playlist_provider=get_playlist_items,
+    max_workers: int = DEFAULT_MAX_PARALLEL_PLAYLIST_FETCHES,
+) -> dict[str, Any]:
+    fetched = fetch_all_playlist_items(config, playlist_provider=playlist_provider, max_workers=max_workers)
+    return record_fetched_playlists(state, fetched)
+
+
 def _entry_file_path(entry: dict[str, Any]) -> Path | None:
     filename = entry.get("filename")
     folder = entry.get("folder")
@@ -198,18 +259,76 @@ def restore_trashed_entry(state: dict[str, Any], video_id: str) -> dict[str, Any
 
 
 def _active_queue_job_for_video(state: dict[str, Any], video_id: str) -> dict[str, Any] | None:
-    for job in state.get("queue", []) or []:
-        if job.get("video_id") == video_id and job.get("status") in QUEUE_ACTIVE_STATUSES:
-            return job
-    return None
+    return _queue_index(state).active_for(video_id)
+
+
+class SnapshotVideoIndex:
+    """video_id -> {playlist key: position} over ``playlist_snapshots``.
+
+    ``record_playlist_snapshot`` keeps it current. ``lookup`` reports
+    staleness (``STALE``) when a snapshot's item list was swapped outside that
+    path, so the caller can rebuild instead of returning a wrong answer.
+    """
+
+    STALE = object()
+
+    def __init__(self, snapshots: dict[str, dict[str, Any]]):
+        self._snapshots = snapshots
+        self._videos: dict[str, dict[str, int]] = {}
+        self._items: dict[str, list[dict[str, Any]]] = {}
+        for key, snapshot in snapshots.items():
+            self.update(key, snapshot)
+
+    def tracks(self, snapshots: dict[str, dict[str, Any]]) -> bool:
+        return snapshots is self._snapshots and len(snapshots) == len(self._items)
+
+    def update(self, key: str, snapshot: dict[str, Any]) -> None:
+        for item in self._items.pop(key, []):
+            positions = self._videos.get(item.get("video_id"))
+            if positions is not None:
+                positions.pop(key, None)
+                if not positions:
+                    del self._videos[item.get("video_id")]
+        items = snapshot.get("items") or []
+        self._items[key] = items
+        for position, item in enumerate(items):
+            video_id = item.get("video_id")
+            if video_id:
+                self._videos.setdefault(video_id, {}).setdefault(key, position)
+
+    def lookup(self, video_id: str) -> Any:
+        positions = self._videos.get(video_id)
+        if not positions:
+            return None
+        # Same answer as a scan: the first snapshot (in dict order) that contains the video.
+        for key in self._snapshots if len(positions) > 1 else positions:
+            position = positions.get(key)
+            if position is None:
+                continue
+            items = (self._snapshots.get(key) or {}).get("items")
+            if items is not self._items.get(key) or position >= len(items) or items[position].get("video_id") != video_id:
+                return self.STALE
+            return items[position]
+        return self.STALE
+
+
+def _snapshot_video_index(state: dict[str, Any]) -> SnapshotVideoIndex:
+    ensure_management_sections(state)
+    snapshots = state["playlist_snapshots"]
+    index = cached_index(state, SNAPSHOT_VIDEO_INDEX, lambda current: SnapshotVideoIndex(current["playlist_snapshots"]))
+    if not index.tracks(snapshots):
+        index = SnapshotVideoIndex(snapshots)
+        if getattr(state, "indexes", None) is not None:
+            state.indexes[SNAPSHOT_VIDEO_INDEX] = index
+    return index
 
 
 def _snapshot_context_for_video(state: dict[str, Any], video_id: str) -> dict[str, Any] | None:
-    for snapshot in (state.get("playlist_snapshots", {}) or {}).values():
-        for item in snapshot.get("items", []) or []:
-            if item.get("video_id") == video_id:
-                return dict(item)
-    return None
+    item = _snapshot_video_index(state).lookup(video_id)
+    if item is SnapshotVideoIndex.STALE:
+        drop_index(state, SNAPSHOT_VIDEO_INDEX)
+        item = _snapshot_video_index(state).lookup(video_id)
+    return dict(item) if isinstance(item, dict) else None
 
 
 def item_context_for_video(state: dict[str, Any], video_id: str) -> dict[str, Any] | None:
@@ -237,12 +356,15 @@ def enqueue_item(
     video_id: str,
     *,
     action: str = "download",
+    priority: int = QUEUE_PRIORITY_BULK,
 ) -> tuple[dict[str, Any], bool]:
     ensure_management_sections(state)
     if action not in {"download", "redownload", "retry_failed"}:
         raise ValueError(f"unsupported queue action: {action}")
     existing = _active_queue_job_for_video(state, video_id)
     if existing:
+        if existing.get("status") == "queued" and priority > queue_job_priority(existing):
+            _set_job_priority(state, existing, priority)
         return existing, False
     context = item_context_for_video(state, video_id)
     if not context:
@@ -259,6 +381,7 @@ def enqueue_item(
         "folder": context.get("folder"),
         "action": action,
         "status": "queued",
+        "priority": int(priority),
         "created_at": now,
         "started_at": None,
         "finished_at": None,
@@ -266,6 +389,7 @@ def enqueue_item(
         "cancel_requested": False,
     }
     state["queue"].append(job)
+    _queue_index(state).sync()
     return job, True
 
 
@@ -294,55 +418,307 @@ def reset_interrupted_jobs(state: dict[str, Any]) -> int:
                 "error": "resumed after app restart",
                 "cancel_requested": False,
             })
+            _queue_index(state).push(job)
             count += 1
     return count
 
 
-def next_queued_job(state: dict[str, Any]) -> dict[str, Any] | None:
+def queue_job_path_key(job: dict[str, Any]) -> tuple[str, str]:
+    """Identify the output file a job writes, so jobs for the same path never overlap."""
+    return (os.path.abspath(job.get("folder") or ""), normalize_title(job.get("title") or job.get("video_id") or ""))
+
+
+def queue_job_priority(job: dict[str, Any]) -> int:
+    try:
+        return int(job.get("priority") or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+class QueueIndex:
+    """Heap over queued jobs: highest priority first, then oldest ``created_at``, then queue order.
+
+    Entries are invalidated lazily: a job that left ``queued`` or whose
+    priority changed since it was pushed is dropped when it reaches the top.
+    """
+
+    def __init__(self, queue: list[dict[str, Any]]):
+        self._queue = queue
+        self._heap: list[tuple[int, str, int, dict[str, Any]]] = []
+        self._active: dict[str, dict[str, Any]] = {}
+        self._sequence = itertools.count()
+        self._seen = 0
+        for job in queue:
+            if job.get("status") == "running":
+                self._active.setdefault(job.get("video_id"), job)
+        self.sync()
+
+    def tracks(self, queue: list[dict[str, Any]]) -> bool:
+        return queue is self._queue and len(queue) >= self._seen
+
+    def sync(self) -> None:
+        """Index jobs appended to the queue list since the last call."""
+        for job in self._queue[self._seen:]:
+            self.push(job)
+        self._seen = len(self._queue)
+
+    def push(self, job: dict[str, Any]) -> None:
+        if job.get("status") in QUEUE_ACTIVE_STATUSES:
+            current = self._active.get(job.get("video_id"))
+            if current is None or current.get("status") not in QUEUE_ACTIVE_STATUSES:
+                self._active[job.get("video_id")] = job
+        if job.get("status") == "queued":
+            heapq.heappush(self._heap, (-queue_job_priority(job), job.get("created_at") or "", next(self._sequence), job))
+
+    @staticmethod
+    def _is_current(entry: tuple[int, str, int, dict[str, Any]]) -> bool:
+        job = entry[3]
+        return job.get("status") == "queued" and -entry[0] == queue_job_priority(job)
+
+    def active_for(self, video_id: str) -> dict[str, Any] | None:
+        job = self._active.get(video_id)
+        return job if job is not None and job.get("status") in QUEUE_ACTIVE_STATUSES else None
+
+    def peek(self, exclude_paths: set[tuple[str, str]] | None = None) -> dict[str, Any] | None:
+        skipped = []
+        try:
+            while self._heap:
+                entry = self._heap[0]
+                if not self._is_current(entry):
+                    heapq.heappop(self._heap)
+                    continue
+                if exclude_paths and queue_job_path_key(entry[3]) in exclude_paths:
+                    skipped.append(heapq.heappop(self._heap))
+                    continue
+                return entry[3]
+            return None
+        finally:
+            for entry in skipped:
+                heapq.heappush(self._heap, entry)
+
+
+def _queue_index(state: dict[str, Any]) -> QueueIndex:
+    ensure_management_sections(state)
+    queue = state["queue"]
+    index = cached_index(state, QUEUE_INDEX, lambda current: QueueIndex(current["queue"]))
+    if not index.tracks(queue):
+        index = QueueIndex(queue)
+        if getattr(state, "indexes", None) is not None:
+            state.indexes[QUEUE_INDEX] = index
+    index.sync()
+    return index
+
+
+def _set_job_priority(state: dict[str, Any], job: dict[str, Any], priority: int) -> None:
+    job["priority"] = int(priority)
+    _queue_index(state).push(job)
+
+
+def next_queued_job(
+    state: dict[str, Any],
+    exclude_paths: set[tuple[str, str]] | None = None,
+) -> dict[str, Any] | None:
+    return _queue_index(state).peek(exclude_paths)
+
+
+def bump_queue_job(state: dict[str, Any], job_id: str, priority: int | None = None) -> dict[str, Any]:
+    """Change a queued job's priority; without ``priority`` it moves ahead of every queued job."""
     ensure_management_sections(state)
     for job in state.get("queue", []) or []:
-        if job.get("status") == "queued":
-            return job
-    return None
+        if job.get("id") != job_id:
+            continue
+        if job.get("status") != "queued":
+            raise ValueError(f"only queued jobs can be reprioritized: {job_id}")
+        if priority is None:
+            highest_other = max(
+                (
+                    queue_job_priority(other)
+                    for other in state["queue"]
+                    if other is not job and other.get("status") == "queued"
+                ),
+                default=None,
+            )
+            priority = queue_job_priority(job)
+            if highest_other is not None and highest_other >= priority:
+                priority = highest_other + 1
+        _set_job_priority(state, job, priority)
+        return job
+    raise KeyError(f"unknown queue job: {job_id}")
+
+
+def active_queue_jobs_by_video(state: dict[str, Any]) -> dict[str, dict[str, Any]]:
+    """Map video_id to its first queued/running job, matching ``_active_queue_job_for_video``."""
+    jobs: dict[str, dict[str, Any]] = {}
+    for job in state.get("queue", []) or []:
+        if job.get("status") in QUEUE_ACTIVE_STATUSES:
+            jobs.setdefault(job.get("video_id"), job)
+    return jobs
 
 
-def status_for_item(state: dict[str, Any], item: dict[str, Any]) -> tuple[str, dict[str, Any] | None]:
+def status_for_item(
+    state: dict[str, Any],
+    item: dict[str, Any],
+    *,
+    active_jobs: dict[str, dict[str, Any]] | None = None,
+    listing: DirectoryListing | None = None,
+) -> tuple[str, dict[str, Any] | None]:
+    """Resolve an item's display status; pass the per-call indexes when checking many items."""
     video_id = item.get("video_id")
-    active_job = _active_queue_job_for_video(state, video_id) if video_id else None
+    if not video_id:
+        active_job = None
+    elif active_jobs is not None:
+        active_job = active_jobs.get(video_id)
+    else:
+        active_job = _active_queue_job_for_video(state, video_id)
     if active_job:
         return active_job.get("status") or "queued", active_job
     entry = state.get("items", {}).get(video_id) if video_id else None
     if not entry:
         return "not_downloaded", None
     status = entry.get("status") or "unknown"
-    if status == "downloaded" and not file_exists_for_entry(entry, item.get("folder")):
+    if status == "downloaded" and not file_exists_for_entry(entry, item.get("folder"), listing):
         return "missing", entry
     return status, entry
 
 
-def build_management_view(config: dict[str, Any], state: dict[str, Any]) -> dict[str, Any]:
+# Queue action matching the per-row button for each display status.
+BULK_ENQUEUE_ACTIONS = {
+    "missing": "redownload",
+    "downloaded": "redownload",
+    "trashed": "redownload",
+    "failed": "retry_failed",
+    "not_downloaded": "download",
+}
+
+
+def _bulk_apply(
+    video_ids: Iterable[str],
+    apply: Callable[[str], dict[str, Any]],
+) -> list[dict[str, Any]]:
+    results = []
+    for video_id in dict.fromkeys(video_ids):
+        try:
+            results.append({"video_id": video_id, "ok": True, **apply(video_id)})
+        except KeyError as exc:
+            results.append({"video_id": video_id, "ok": False, "error": exc.args[0] if exc.args else str(exc), "code": 404})
+        except OSError as exc:
+            code = 404 if isinstance(exc, FileNotFoundError) else 500
+            results.append({"video_id": video_id, "ok": False, "error": str(exc), "code": code})
+        except ValueError as exc:
+            results.append({"video_id": video_id, "ok": False, "error": str(exc), "code": 400})
+    return results
+
+
+def bulk_enqueue(
+    state: dict[str, Any],
+    video_ids: Iterable[str],
+    *,
+    action: str | None = None,
+    priority: int = QUEUE_PRIORITY_BULK,
+    statuses: dict[str, str] | None = None,
+) -> list[dict[str, Any]]:
+    """Enqueue many items in one pass; ``action=None`` picks the action from each item's status."""
+
+    def apply(video_id: str) -> dict[str, Any]:
+        item_action = action
+        if item_action is None:
+            status = (statuses or {}).get(video_id)
+            if status is None:
+                entry = state.get("items", {}).get(video_id) or {}
+                status, _ = status_for_item(state, {"video_id": video_id, "folder": entry.get("folder")})
+            item_action = BULK_ENQUEUE_ACTIONS.get(status, "download")
+        job, created = enqueue_item(state, video_id, action=item_action, priority=priority)
+        return {"created": created, "job": job}
+
+    return _bulk_apply(video_ids, apply)
+
+
+def bulk_trash(state: dict[str, Any], video_ids: Iterable[str], *, reason: str = "user-trash") -> list[dict[str, Any]]:
+    return _bulk_apply(video_ids, lambda video_id: {"item": move_entry_to_trash(state, video_id, reason=reason)})
+
+
+def bulk_restore(state: dict[str, Any], video_ids: Iterable[str]) -> list[dict[str, Any]]:
+    return _bulk_apply(video_ids, lambda video_id: {"item": restore_trashed_entry(state, video_id)})
+
+
+def select_playlist_items(
+    config: dict[str, Any],
+    state: dict[str, Any],
+    playlist: int | str,
+    statuses: Iterable[str],
+) -> dict[str, str]:
+    """Return ``{video_id: status}`` for one playlist's snapshot items in the given display statuses."""
+    view = build_management_view(config, state, playlists=[playlist], statuses=statuses, queue_limit=0, trash_limit=0)
+    if not view["playlists"]:
+        raise KeyError(f"unknown playlist: {playlist}")
+    return {item["video_id"]: item["status"] for item in view["playlists"][0]["items"] if item.get("video_id")}
+
+
+def _view_item(item: dict[str, Any], status: str, entry: dict[str, Any]) -> dict[str, Any]:
+    return {
+        **item,
+        "status": status,
+        "filename": entry.get("filename"),
+        "failure_reason": entry.get("failure_reason"),
+        "attempt_count": entry.get("attempt_count"),
+        "updated_at": entry.get("updated_at"),
+        "downloaded_at": entry.get("downloaded_at"),
+        "trash_path": entry.get("trash_path"),
+    }
+
+
+def build_management_view(
+    config: dict[str, Any],
+    state: dict[str, Any],
+    *,
+    playlists: Iterable[int | str] | None = None,
+    statuses: Iterable[str] | None = None,
+    offset: int = 0,
+    limit: int | None = None,
+    summary_only: bool = False,
+    queue_limit: int | None = None,
+    trash_limit: int | None = None,
+) -> dict[str, Any]:
+    """Build the /manage payload.
+
+    Without arguments every snapshot item, the whole queue and the whole trash
+    are returned. ``playlists`` (indexes or keys) and ``statuses`` narrow the
+    item rows, ``offset``/``limit`` page them per playlist, and
+    ``summary_only`` drops rows but keeps per-playlist counts.
+    ``queue_limit``/``trash_limit`` keep only the newest N entries while the
+    summary still reports totals.
+    """
     ensure_management_sections(state)
+    status_filter = set(statuses) if statuses else None
+    if status_filter and not status_filter <= MANAGEMENT_ITEM_STATUSES:
+        raise ValueError(f"unknown status filter: {', '.join(sorted(status_filter - MANAGEMENT_ITEM_STATUSES))}")
+    selected = {str(value) for value in playlists} if playlists is not None else None
+    offset = max(0, int(offset or 0))
+    active_jobs = active_queue_jobs_by_video(state)
+    listing = DirectoryListing()
     playlists_out = []
+    total_items = 0
     for index, playlist in enumerate(config.get("playlists", []) or []):
         key = playlist_key(playlist, index)
         snapshot = (state.get("playlist_snapshots", {}) or {}).get(key, {})
+        snapshot_items = snapshot.get("items", []) or []
+        total_items += len(snapshot_items)
+        if selected is not None and str(index) not in selected and key not in selected:
+            continue
         items_out = []
         counts: dict[str, int] = {}
-        for item in snapshot.get("items", []) or []:
-            status, source = status_for_item(state, item)
+        position = 0
+        for item in snapshot_items:
+            status, source = status_for_item(state, item, active_jobs=active_jobs, listing=listing)
             counts[status] = counts.get(status, 0) + 1
+            if summary_only or (status_filter is not None and status not in status_filter):
+                continue
+            position += 1
+            if position <= offset or (limit is not None and len(items_out) >= limit):
+                continue
             video_id = item.get("video_id")
             entry = source if isinstance(source, dict) and source.get("video_id") == video_id else state.get("items", {}).get(video_id, {})
-            items_out.append({
-                **item,
-                "status": status,
-                "filename": entry.get("filename"),
-                "failure_reason": entry.get("failure_reason"),
-                "attempt_count": entry.get("attempt_count"),
-                "updated_at": entry.get("updated_at"),
-                "downloaded_at": entry.get("downloaded_at"),
-                "trash_path": entry.get("trash_path"),
-            })
+            items_out.append(_view_item(item, status, entry))
         playlists_out.append({
             "index": index,
             "key": key,
@@ -350,8 +726,10 @@ def build_management_view(config: dict[str, Any], state: dict[str, Any]) -> dict
             "url": playlist.get("url"),
             "folder": playlist.get("folder"),
             "last_scanned_at": snapshot.get("last_scanned_at"),
-            "count": len(items_out),
+            "count": len(snapshot_items),
             "counts": counts,
+            "matched": sum(count for status, count in counts.items() if status_filter is None or status in status_filter),
+            "offset": offset,
             "items": items_out,
         })
 
@@ -363,12 +741,19 @@ def build_management_view(config: dict[str, Any], state: dict[str, Any]) -> dict
     ]
     return {
         "playlists": playlists_out,
-        "queue": queue,
-        "trash": trash,
+        "queue": _newest(queue, queue_limit),
+        "trash": _newest(trash, trash_limit),
         "summary": {
-            "playlists": len(playlists_out),
-            "items": sum(p["count"] for p in playlists_out),
+            "playlists": len(config.get("playlists", []) or []),
+            "items": total_items,
+            "queue": len(queue),
             "queue_active": sum(1 for job in queue if job.get("status") in QUEUE_ACTIVE_STATUSES),
             "trash": len(trash),
         },
     }
+
+
+def _newest(rows: list[dict[str, Any]], limit: int | None) -> list[dict[str, Any]]:
+    if limit is None:
+        return rows
+    return rows[-limit:] if limit > 0 else []
@@ -1,8 +1,10 @@
+import bisect
 import os
 import re
 import unicodedata
+from collections.abc import Mapping
 from pathlib import Path
-from typing import Dict, Iterable, Optional
+from typing import Dict, Iterable, Iterator, Optional
 
 MIN_SINGLE_TOKEN_FUZZY_LENGTH = 6
 SUPPORTED_AUDIO_EXTENSIONS = frozenset({".m4a"})
@@ -59,11 +61,91 @@ def is_existing_file_match(title: str, existing_norm_name: str, title_is_normali
     return is_token_match(title, existing_norm_name, title_is_normalized=title_is_normalized)
 
 
+class FolderIndex(Mapping):
+    """{normalized_stem: filename} map with hash and token indexes for matching.
+
+    ``find`` returns exactly what a linear ``is_existing_file_match`` scan over
+    the map would: the first entry (in insertion order) that matches.
+    """
+
+    def __init__(self, files: Iterable[tuple[str, str]] = ()):
+        self._files: Dict[str, str] = {}
+        self._order: Dict[str, int] = {}
+        self._postings: Dict[str, set[str]] = {}
+        self._haystack: str | None = None
+        self._starts: list[int] = []
+        self._names: list[str] = []
+        for norm_name, filename in files:
+            self.add(norm_name, filename)
+
+    def add(self, norm_name: str, filename: str) -> None:
+        if norm_name not in self._files:
+            self._order[norm_name] = len(self._order)
+            for token in set(norm_name.split()):
+                self._postings.setdefault(token, set()).add(norm_name)
+            self._haystack = None
+        self._files[norm_name] = filename
+
+    def __getitem__(self, norm_name: str) -> str:
+        return self._files[norm_name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._files)
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def _substring_candidates(self, needle: str) -> set[str]:
+        if self._haystack is None:
+            # Normalized names never contain newlines, so a match cannot span entries.
+            self._names = list(self._files)
+            self._starts = []
+            offset = 0
+            for name in self._names:
+                self._starts.append(offset)
+                offset += len(name) + 1
+            self._haystack = "\n".join(self._names)
+        found: set[str] = set()
+        position = self._haystack.find(needle)
+        while position != -1:
+            slot = bisect.bisect_right(self._starts, position) - 1
+            found.add(self._names[slot])
+            next_start = self._starts[slot + 1] if slot + 1 < len(self._starts) else len(self._haystack)
+            position = self._haystack.find(needle, next_start)
+        return found
+
+    def _token_candidates(self, tokens: set[str]) -> set[str]:
+        postings = []
+        for token in tokens:
+            names = self._postings.get(token)
+            if not names:
+                return set()
+            postings.append(names)
+        postings.sort(key=len)
+        return set(postings[0]).intersection(*postings[1:])
+
+    def find(self, title: str, title_is_normalized: bool = False) -> Optional[str]:
+        normalized_title = title if title_is_normalized else normalize_title(title)
+        candidates: set[str] = set()
+        if normalized_title in self._files:
+            candidates.add(normalized_title)
+        tokens = _title_tokens_for_fuzzy_match(title, title_is_normalized=title_is_normalized)
+        if tokens:
+            candidates |= self._token_candidates(tokens)
+            if normalized_title:
+                candidates |= self._substring_candidates(normalized_title)
+        if not candidates:
+            return None
+        return self._files[min(candidates, key=self._order.__getitem__)]
+
+
 def find_existing_file_match(
     title: str,
-    existing_files_map: Dict[str, str],
+    existing_files_map: Mapping[str, str],
     title_is_normalized: bool = False,
 ) -> Optional[str]:
+    if isinstance(existing_files_map, FolderIndex):
+        return existing_files_map.find(title, title_is_normalized=title_is_normalized)
     for existing_norm_name, filename in existing_files_map.items():
         if is_existing_file_match(title, existing_norm_name, title_is_normalized=title_is_normalized):
             return filename
@@ -73,14 +155,16 @@ def find_existing_file_match(
 def get_existing_files(
     folder_path: str | os.PathLike[str],
     audio_extensions: Iterable[str] = SUPPORTED_AUDIO_EXTENSIONS,
-) -> Dict[str, str]:
-    """Return {normalized_stem: original audio filename} for direct child audio files."""
+) -> FolderIndex:
+    """Return a FolderIndex of {normalized_stem: original audio filename} for direct child audio files."""
     folder = Path(folder_path)
+    index = FolderIndex()
     if not folder.exists():
-        return {}
+        return index
     allowed = {ext.lower() for ext in audio_extensions}
-    files: Dict[str, str] = {}
-    for child in folder.iterdir():
-        if child.is_file() and child.suffix.lower() in allowed:
-            files[normalize_title(child.stem)] = child.name
-    return files
+    with os.scandir(folder) as entries:
+        for child in entries:
+            stem, suffix = os.path.splitext(child.name)
+            if suffix.lower() in allowed and child.is_file():
+                index.add(normalize_title(stem), child.name)
+    return index
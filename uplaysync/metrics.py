@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+from typing import Any, Callable, Iterable
+
+from .events import DOWNLOAD_FINISHED, SyncEvent
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DOWNLOAD_SECONDS_BUCKETS = (1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0)
+THROUGHPUT_BUCKETS = (16e3, 64e3, 256e3, 1e6, 4e6, 16e6, 64e6)
+
+# Lower-cased substrings of yt-dlp/downloader errors, checked in order.
+FAILURE_REASON_PATTERNS = (
+    ("cancelled", ("cancelled", "canceled")),
+    ("private", ("private video", "members-only", "members only", "sign in to confirm", "login required")),
+    ("age_restricted", ("age-restricted", "confirm your age", "inappropriate for some users")),
+    ("geo_blocked", ("not available in your country", "geo restriction", "geo-restricted")),
+    ("copyright", ("copyright",)),
+    ("unavailable", ("video unavailable", "not available", "has been removed", "account associated", "terminated")),
+    ("rate_limited", ("http error 429", "too many requests", "rate limit")),
+    ("network", ("timed out", "timeout", "connection", "network is unreachable", "name resolution", "ssl")),
+    ("postprocess", ("ffmpeg", "postprocess", "final file was not found")),
+)
+
+
+def failure_reason_class(error: str | None) -> str:
+    """Bucket a free-form download error into a small, label-safe reason class."""
+    text = (error or "").lower()
+    for reason, needles in FAILURE_REASON_PATTERNS:
+        if any(needle in text for needle in needles):
+            return reason
+    return "other"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Iterable[tuple[str, Any]]) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in labels]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: dict[tuple[str, ...], Any] = {}
+
+    def _key(self, labels: dict[str, Any]) -> tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def samples(self) -> list[tuple[str, tuple[tuple[str, Any], ...], float]]:
+        with self._lock:
+            return [(self.name, tuple(zip(self.labelnames, key)), value) for key, value in sorted(self._values.items())]
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {_escape(self.documentation)}", f"# TYPE {self.name} {self.kind}"]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        if amount < 0:
+            raise ValueError("counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"buckets": [0] * (len(self.buckets) + 1), "sum": 0.0, "count": 0}
+            state["buckets"][bisect.bisect_left(self.buckets, value)] += 1
+            state["sum"] += value
+            state["count"] += 1
+
+    def samples(self) -> list[tuple[str, tuple[tuple[str, Any], ...], float]]:
+        samples = []
+        with self._lock:
+            for key, state in sorted(self._values.items()):
+                labels = tuple(zip(self.labelnames, key))
+                cumulative = 0
+                for bound, count in zip(self.buckets + (math.inf,), state["buckets"]):
+                    cumulative += count
+                    samples.append((f"{self.name}_bucket", labels + (("le", _format_value(bound)),), cumulative))
+                samples.append((f"{self.name}_sum", labels, state["sum"]))
+                samples.append((f"{self.name}_count", labels, state["count"]))
+        return samples
+
+
+class MetricsRegistry:
+    """In-process metrics rendered in the Prometheus text exposition format.
+
+    Collectors registered with ``on_collect`` run on every ``render`` to
+    refresh gauges derived from current state (queue depth, last sync, ...).
+    """
+
+    def __init__(self) -> None:
+        self._metrics: list[_Metric] = []
+        self._collectors: list[Callable[[], None]] = []
+
+    def _add(self, metric: _Metric) -> Any:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._add(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._add(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._add(Histogram(name, documentation, labelnames, buckets))
+
+    def on_collect(self, collector: Callable[[], None]) -> Callable[[], None]:
+        self._collectors.append(collector)
+        return collector
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            collector()
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class DownloadMetrics:
+    """Download counters shared by the queue worker and sync runs (as an event sink)."""
+
+    def __init__(self, registry: MetricsRegistry):
+        self.downloads = registry.counter(
+            "uplaysync_downloads_total", "Finished downloads by source and outcome.", ("source", "outcome")
+        )
+        self.failures = registry.counter(
+            "uplaysync_download_failures_total", "Failed downloads by source and reason class.", ("source", "reason")
+        )
+        self.bytes = registry.counter(
+            "uplaysync_download_bytes_total", "Bytes of successfully downloaded files.", ("source",)
+        )
+        self.seconds = registry.histogram(
+            "uplaysync_download_duration_seconds",
+            "Wall-clock time per download, including post-processing.",
+            ("source",),
+            DOWNLOAD_SECONDS_BUCKETS,
+        )
+        self.throughput = registry.histogram(
+            "uplaysync_download_throughput_bytes_per_second",
+            "Per-download throughput (file size / download time).",
+            ("source",),
+            THROUGHPUT_BUCKETS,
+        )
+
+    def observe(
+        self,
+        source: str,
+        *,
+        ok: bool,
+        cancelled: bool = False,
+        error: str | None = None,
+        size: int | None = None,
+        seconds: float | None = None,
+    ) -> None:
+        outcome = "cancelled" if cancelled else "ok" if ok else "failed"
+        self.downloads.inc(source=source, outcome=outcome)
+        if outcome == "failed":
+            self.failures.inc(source=source, reason=failure_reason_class(error))
+        if seconds is not None:
+            self.seconds.observe(seconds, source=source)
+        if ok and size:
+            self.bytes.inc(size, source=source)
+            if seconds:
+                self.throughput.observe(size / seconds, source=source)
+
+    def sink(self, source: str) -> Callable[[SyncEvent], None]:
+        """Event sink recording ``download_finished`` events of a sync run."""
+
+        def record(event: SyncEvent) -> None:
+            if event.type != DOWNLOAD_FINISHED or event.data.get("preexisting"):
+                return
+            data = event.data
+            self.observe(
+                source,
+                ok=bool(data.get("ok")),
+                cancelled=bool(data.get("cancelled")),
+                error=data.get("error"),
+                size=data.get("bytes"),
+                seconds=data.get("seconds"),
+            )
+
+        return record
@@ -1,11 +1,25 @@
-from typing import Any
+from __future__ import annotations
 
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from queue import Queue
+from typing import Any, Callable, Iterable, Iterator
+
+DEFAULT_MAX_PARALLEL_PLAYLIST_FETCHES = 4
+PLAYLIST_CACHE_DIR = "playlist_cache"
+DEFAULT_PLAYLIST_CACHE_TTL = 600.0
+
+logger = logging.getLogger(__name__)
 
-def get_playlist_items(playlist_url: str) -> list[dict[str, Any]]:
-    """Fetch playlist metadata only."""
-    import yt_dlp
 
-    ydl_opts = {
+def _playlist_options() -> dict[str, Any]:
+    return {
         "extract_flat": True,
         "quiet": True,
         "ignoreerrors": True,
@@ -13,8 +27,293 @@ def get_playlist_items(playlist_url: str) -> list[dict[str, Any]]:
             "Accept-Language": "ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7",
         },
     }
-    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+
+
+class PlaylistItems(list):
+    """Fetched entries; ``errors`` counts what yt-dlp dropped under ``ignoreerrors``."""
+
+    def __init__(self, entries: Iterable[dict[str, Any]] = (), errors: int = 0):
+        super().__init__(entries)
+        self.errors = errors
+
+
+class PlaylistStream:
+    """Iterator over flat entries that counts the ones yt-dlp dropped (``None``) in ``errors``."""
+
+    def __init__(self, entries: Iterable[dict[str, Any] | None]):
+        self._entries = iter(entries)
+        self.errors = 0
+
+    def __iter__(self) -> "PlaylistStream":
+        return self
+
+    def __next__(self) -> dict[str, Any]:
+        while True:
+            entry = next(self._entries)
+            if entry:
+                return entry
+            self.errors += 1
+
+
+def get_playlist_items(playlist_url: str) -> PlaylistItems:
+    """Fetch playlist metadata only."""
+    import yt_dlp
+
+    with yt_dlp.YoutubeDL(_playlist_options()) as ydl:
         result = ydl.extract_info(playlist_url, download=False)
         if result and "entries" in result:
-            return [entry for entry in result["entries"] if entry]
-        return []
+            entries = list(result["entries"] or [])
+            return PlaylistItems((entry for entry in entries if entry), errors=entries.count(None))
+        # ``ignoreerrors`` turns a failed extraction into ``None``.
+        return PlaylistItems(errors=0 if result else 1)
+
+
+def _playlist_entries(playlist_url: str) -> Iterator[dict[str, Any] | None]:
+    import yt_dlp
+
+    opts = {**_playlist_options(), "lazy_playlist": True}
+    with yt_dlp.YoutubeDL(opts) as ydl:
+        result = ydl.extract_info(playlist_url, download=False, process=False)
+        # Unprocessed results may redirect (e.g. channel -> uploads tab); follow them.
+        for _ in range(5):
+            if not result or result.get("_type") not in ("url", "url_transparent"):
+                break
+            result = ydl.extract_info(result["url"], ie_key=result.get("ie_key"), download=False, process=False)
+        if not result:
+            yield None
+            return
+        yield from result.get("entries") or []
+
+
+def iter_playlist_items(playlist_url: str) -> PlaylistStream:
+    """Yield flat playlist entries as yt-dlp paginates, instead of building the full list."""
+    return PlaylistStream(_playlist_entries(playlist_url))
+
+
+class _StreamBuffer:
+    """Hands entries from a background producer to one consumer as they arrive."""
+
+    _DONE = object()
+
+    def __init__(self):
+        self._queue: Queue = Queue()
+        self._items: list[dict[str, Any]] = []
+        self._consumed = False
+        self._cancelled = threading.Event()
+        self.seconds: float | None = None
+
+    def fill(self, provider: Callable[[str], Iterable[dict[str, Any]]], url: str) -> None:
+        started = time.perf_counter()
+        try:
+            for entry in provider(url):
+                if self._cancelled.is_set():
+                    break
+                self._queue.put(entry)
+        except BaseException as exc:
+            self._queue.put(exc)
+        finally:
+            # Set before _DONE so a consumer that saw the end also sees the duration.
+            self.seconds = time.perf_counter() - started
+            self._queue.put(self._DONE)
+
+    def consume(self) -> Iterator[dict[str, Any]]:
+        if self._consumed:
+            # Same URL configured twice: replay what the first consumer saw.
+            yield from list(self._items)
+            return
+        self._consumed = True
+        while True:
+            entry = self._queue.get()
+            if entry is self._DONE:
+                return
+            if isinstance(entry, BaseException):
+                raise entry
+            self._items.append(entry)
+            yield entry
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+
+class PlaylistPrefetcher:
+    """Fetch playlist metadata for many URLs on a bounded thread pool.
+
+    ``get`` returns results (or re-raises the fetch error) in whatever order the
+    caller asks, so per-playlist processing stays deterministic. With
+    ``max_workers <= 1`` nothing is prefetched and ``get`` fetches inline.
+
+    In ``stream`` mode the provider returns an iterator; workers drain it into a
+    buffer and ``get`` returns a generator that yields entries as they arrive.
+
+    Workers time their own fetches; ``take_fetch_seconds`` hands that duration
+    over, since the caller only sees how long it waited.
+    """
+
+    def __init__(
+        self,
+        urls: Iterable[str],
+        provider: Callable[[str], Any] = get_playlist_items,
+        max_workers: int = DEFAULT_MAX_PARALLEL_PLAYLIST_FETCHES,
+        *,
+        stream: bool = False,
+    ):
+        self._provider = provider
+        self._stream = stream
+        self._futures: dict[str, Future] = {}
+        self._buffers: dict[str, _StreamBuffer] = {}
+        self._fetch_seconds: dict[str, float] = {}
+        self._executor: ThreadPoolExecutor | None = None
+        unique_urls = list(dict.fromkeys(url for url in urls if url))
+        workers = min(int(max_workers or 1), len(unique_urls))
+        if workers > 1:
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="uplaysync-playlist-fetch")
+            for url in unique_urls:
+                if stream:
+                    buffer = self._buffers[url] = _StreamBuffer()
+                    self._futures[url] = self._executor.submit(buffer.fill, provider, url)
+                else:
+                    self._futures[url] = self._executor.submit(self._timed_fetch, url)
+
+    def _timed_fetch(self, url: str) -> Any:
+        started = time.perf_counter()
+        try:
+            return self._provider(url)
+        finally:
+            self._fetch_seconds[url] = time.perf_counter() - started
+
+    def get(self, url: str) -> Any:
+        if self._stream and url in self._buffers:
+            return self._buffers[url].consume()
+        future = self._futures.get(url)
+        if future is None:
+            return self._provider(url)
+        return future.result()
+
+    def take_fetch_seconds(self, url: str) -> float | None:
+        """How long the worker spent fetching ``url``, once per URL.
+
+        None when ``url`` was fetched inline, was already taken, or its stream
+        has not finished yet.
+        """
+        buffer = self._buffers.get(url)
+        if buffer is not None:
+            seconds, buffer.seconds = buffer.seconds, None
+            return seconds
+        return self._fetch_seconds.pop(url, None)
+
+    def close(self) -> None:
+        for buffer in self._buffers.values():
+            buffer.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self) -> "PlaylistPrefetcher":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+class PlaylistMetadataCache:
+    """On-disk playlist metadata cache, one JSON file per playlist URL.
+
+    Entries younger than ``ttl`` seconds are served without touching the
+    network; ``force_refresh`` always fetches and rewrites the entry so the next
+    reader (e.g. a sync started right after a manual refresh) reuses it.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        *,
+        ttl: float = DEFAULT_PLAYLIST_CACHE_TTL,
+        provider: Callable[[str], Iterable[dict[str, Any]]] = get_playlist_items,
+    ):
+        self.directory = Path(directory)
+        self.ttl = float(ttl)
+        self._provider = provider
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def path_for(self, url: str) -> Path:
+        digest = hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+        return self.directory / f"{digest}.json"
+
+    def _read(self, url: str) -> dict[str, Any] | None:
+        path = self.path_for(url)
+        try:
+            with path.open("r", encoding="utf-8") as f:
+                cached = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError) as exc:
+            logger.warning("Ignoring unreadable playlist cache %s: %s", path, exc)
+            return None
+        if not isinstance(cached, dict) or cached.get("url") != url or not isinstance(cached.get("items"), list):
+            return None
+        return cached
+
+    def store(self, url: str, items: list[dict[str, Any]]) -> None:
+        path = self.path_for(url)
+        payload = {"url": url, "fetched_at": time.time(), "count": len(items), "items": items}
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+            with tmp.open("w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False, separators=(",", ":"), default=str)
+            os.replace(tmp, path)
+        except OSError as exc:
+            logger.warning("Failed to write playlist cache %s: %s", path, exc)
+
+    def _store_complete(self, url: str, items: list[dict[str, Any]], source: Any) -> None:
+        """Store ``items`` unless the fetch came back empty or lost entries to errors.
+
+        With ``ignoreerrors`` a failed fetch looks like a short or empty
+        playlist; caching it would hide the missing entries for a whole TTL.
+        """
+        errors = getattr(source, "errors", 0)
+        if not items or errors:
+            logger.info("Not caching playlist %s: %s item(s), %s error(s)", url, len(items), errors)
+            return
+        self.store(url, items)
+
+    def get(self, url: str, *, force_refresh: bool = False) -> list[dict[str, Any]]:
+        if not force_refresh and self.ttl > 0:
+            cached = self._read(url)
+            if cached is not None and time.time() - float(cached.get("fetched_at") or 0) < self.ttl:
+                with self._lock:
+                    self.hits += 1
+                return cached["items"]
+        with self._lock:
+            self.misses += 1
+        source = self._provider(url)
+        items = list(source)
+        self._store_complete(url, items, source)
+        return items
+
+    def iter(self, url: str, *, force_refresh: bool = False) -> Iterator[dict[str, Any]]:
+        """Streaming variant of ``get``: entries are yielded while fetching and stored once exhausted."""
+        if not force_refresh and self.ttl > 0:
+            cached = self._read(url)
+            if cached is not None and time.time() - float(cached.get("fetched_at") or 0) < self.ttl:
+                with self._lock:
+                    self.hits += 1
+                yield from cached["items"]
+                return
+        with self._lock:
+            self.misses += 1
+        items: list[dict[str, Any]] = []
+        source = self._provider(url)
+        for entry in source:
+            items.append(entry)
+            yield entry
+        self._store_complete(url, items, source)
+
+    def refresh(self, url: str) -> list[dict[str, Any]]:
+        return self.get(url, force_refresh=True)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
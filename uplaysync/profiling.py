@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, TypeVar
+
+PROFILE_DIR = "profiles"
+DEFAULT_HOTSPOTS = 15
+# Worker pools started by a sync run (ThreadPoolExecutor names threads "<prefix>_<n>").
+PROFILED_THREAD_PREFIXES = ("uplaysync-download_", "uplaysync-playlist-fetch_")
+# (label, path fragment) groups summarised separately in the run log.
+PROFILE_GROUPS = (("yt-dlp", f"{os.sep}yt_dlp{os.sep}"), ("matching", f"uplaysync{os.sep}matching.py"))
+
+T = TypeVar("T")
+
+
+def profile_requested(value: str | None) -> bool:
+    return (value or "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def profile_output_path(state_path: str | Path) -> Path:
+    """``<state dir>/profiles/sync-YYYYMMDD-HHMMSS.pstats``."""
+    return Path(state_path).parent / PROFILE_DIR / time.strftime("sync-%Y%m%d-%H%M%S.pstats")
+
+
+class SyncProfiler:
+    """cProfile the calling thread plus sync worker threads started while it is active.
+
+    Each worker thread gets its own profiler (installed through
+    ``threading.setprofile``); ``stop`` merges them into one ``pstats.Stats``.
+    On interpreters where cProfile already sees every thread, the per-thread
+    profilers are skipped.
+    """
+
+    def __init__(self, thread_prefixes: tuple[str, ...] = PROFILED_THREAD_PREFIXES):
+        self._thread_prefixes = thread_prefixes
+        self._main = cProfile.Profile()
+        self._threads: list[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    def _thread_hook(self, frame: Any, event: str, arg: Any) -> None:
+        sys.setprofile(None)
+        if not threading.current_thread().name.startswith(self._thread_prefixes):
+            return
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:  # a profiler is already active for all threads
+            return
+        with self._lock:
+            self._threads.append(profile)
+
+    def start(self) -> None:
+        self._main.enable()
+        threading.setprofile(self._thread_hook)
+
+    def stop(self) -> pstats.Stats:
+        threading.setprofile(None)  # type: ignore[arg-type]
+        self._main.disable()
+        stats = pstats.Stats(self._main)
+        with self._lock:
+            threads = list(self._threads)
+        for profile in threads:
+            # Pool threads have exited by now; profiles of live ones are a snapshot.
+            profile.create_stats()
+            stats.add(profile)
+        return stats
+
+
+def _label(func: tuple[str, int, str]) -> str:
+    filename, line, name = func
+    if filename == "~":
+        return name
+    return f"{_short_path(filename)}:{line}({name})"
+
+
+def _short_path(filename: str) -> str:
+    parts = Path(filename).parts
+    for anchor in ("uplaysync", "yt_dlp", "web"):
+        if anchor in parts:
+            return "/".join(parts[parts.index(anchor):])
+    return Path(filename).name
+
+
+def hotspot_lines(stats: pstats.Stats, limit: int = DEFAULT_HOTSPOTS) -> list[str]:
+    """Top functions by self time, then per-group totals for yt-dlp and matching."""
+    rows = [
+        (func, calls, total, cumulative)
+        for func, (_primitive, calls, total, cumulative, _callers) in stats.stats.items()  # type: ignore[attr-defined]
+    ]
+    rows.sort(key=lambda row: row[2], reverse=True)
+    lines = [f"[프로파일] self time 상위 {min(limit, len(rows))}개 (전체 {stats.total_tt:.3f}s):"]  # type: ignore[attr-defined]
+    for func, calls, total, cumulative in rows[:limit]:
+        lines.append(f"  {total:9.3f}s self {cumulative:9.3f}s cum {calls:8d}회  {_label(func)}")
+    for label, fragment in PROFILE_GROUPS:
+        group = [row for row in rows if fragment in row[0][0]]
+        if not group:
+            continue
+        lines.append(f"[프로파일] {label}: self {sum(row[2] for row in group):.3f}s, {len(group)}개 함수")
+        for func, calls, total, cumulative in group[:3]:
+            lines.append(f"  {total:9.3f}s self {cumulative:9.3f}s cum {calls:8d}회  {_label(func)}")
+    return lines
+
+
+def run_profiled(
+    target: Callable[[], T],
+    output: str | Path,
+    *,
+    log: Callable[[str], None] = print,
+    hotspots: int = DEFAULT_HOTSPOTS,
+) -> T:
+    """Run ``target`` under ``SyncProfiler``, write ``output`` (.pstats) and log the hotspots."""
+    profiler = SyncProfiler()
+    profiler.start()
+    try:
+        return target()
+    finally:
+        stats = profiler.stop()
+        output = Path(output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        stats.dump_stats(str(output))
+        for line in hotspot_lines(stats, hotspots):
+            log(line)
+        log(f"[프로파일] 저장: {output}")
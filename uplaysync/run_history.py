@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Any
+
+from .state import _atomic_write_json, _load_json, utc_now
+
+STATUS_FILE = "status.json"
+DEFAULT_RUN_HISTORY_LIMIT = 20
+SUMMARY_COUNTS = ("checked", "downloaded", "skipped", "failed", "queued", "redownload")
+
+_status_lock = threading.Lock()
+
+
+def load_status(path: str | Path) -> dict[str, Any]:
+    status = _load_json(Path(path), {})
+    return status if isinstance(status, dict) else {}
+
+
+def update_status(path: str | Path, **fields: Any) -> dict[str, Any]:
+    """Merge ``fields`` into status.json, keeping keys written by other writers (e.g. ``runs``)."""
+    with _status_lock:
+        status = load_status(path)
+        status.update(fields)
+        _atomic_write_json(Path(path), status)
+        return status
+
+
+def run_record(
+    summary: dict[str, Any] | None = None,
+    *,
+    started_at: str | None = None,
+    error: BaseException | str | None = None,
+) -> dict[str, Any]:
+    """Compact, JSON-friendly record of one sync run for the status.json history."""
+    summary = summary or {}
+    timings = summary.get("timings") or {}
+    return {
+        "started_at": summary.get("started_at") or started_at,
+        "finished_at": summary.get("finished_at") or utc_now(),
+        "seconds": summary.get("seconds"),
+        "ok": error is None,
+        "cancelled": bool(summary.get("cancelled")),
+        "error": str(error) if error is not None else None,
+        "counts": {key: summary[key] for key in SUMMARY_COUNTS if key in summary},
+        "phases": timings.get("phases", {}),
+        "playlists": {
+            name: {phase: stats["seconds"] for phase, stats in phases.items()}
+            for name, phases in (timings.get("playlists") or {}).items()
+        },
+    }
+
+
+def record_run(path: str | Path, record: dict[str, Any], limit: int = DEFAULT_RUN_HISTORY_LIMIT) -> None:
+    """Append ``record`` to status.json ``runs``, keeping the newest ``limit`` entries."""
+    with _status_lock:
+        status = load_status(path)
+        runs = status.get("runs")
+        runs = runs if isinstance(runs, list) else []
+        runs.append(record)
+        status["runs"] = runs[-max(1, int(limit)):]
+        _atomic_write_json(Path(path), status)
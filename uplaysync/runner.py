@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import threading
+from collections import deque
+from typing import Any, Callable, Iterator
+
+from .events import SyncEvent
+
+# Events kept for a slow or missing SSE consumer; older ones are dropped first.
+EVENT_BUFFER_SIZE = 1000
+
+
+class InProcessSync:
+    """One sync run executed on a worker thread of the calling process.
+
+    ``target`` receives this object and should pass ``log`` and
+    ``cancel_event`` (and ``emit`` as ``on_event``) through to
+    ``sync_playlists``. Everything the run reports is turned into event dicts
+    (``{"type": "log", "message": ...}``, ``{"type": "progress", "event":
+    SyncEvent.to_dict()}`` and a final ``{"type": "done", ...}``) that
+    ``events`` yields to a single consumer from a bounded buffer (the oldest
+    events are dropped when it is full). Log lines are also printed while no
+    consumer is attached, e.g. after the SSE client disconnected. Runs nobody
+    streams (``stream=False``) print their log lines and drop progress events.
+    """
+
+    def __init__(
+        self,
+        target: Callable[["InProcessSync"], Any],
+        *,
+        stream: bool = True,
+        name: str = "uplaysync-sync",
+        buffer_size: int = EVENT_BUFFER_SIZE,
+    ):
+        self.stream = stream
+        self.cancel_event = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+        self._target = target
+        self._events: deque[dict[str, Any]] = deque(maxlen=max(1, buffer_size))
+        self._events_ready = threading.Condition()
+        self._dropped = 0
+        self._consumers = 0
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def start(self) -> "InProcessSync":
+        self._thread.start()
+        return self
+
+    def log(self, message: str) -> None:
+        if not self.stream or not self._consumers:
+            print(message)
+        if not self.stream:
+            return
+        for line in str(message).strip("\n").splitlines():
+            self._put({"type": "log", "message": line})
+
+    def emit(self, event: SyncEvent) -> None:
+        if self.stream:
+            self._put({"type": "progress", "event": event.to_dict()})
+
+    def _put(self, event: dict[str, Any]) -> None:
+        with self._events_ready:
+            if len(self._events) == self._events.maxlen:
+                self._dropped += 1
+            self._events.append(event)
+            self._events_ready.notify()
+
+    def cancel(self) -> None:
+        self.cancel_event.set()
+
+    def is_running(self) -> bool:
+        return self._thread.is_alive()
+
+    def join(self, timeout: float | None = None) -> bool:
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def events(self) -> Iterator[dict[str, Any]]:
+        """Yield events until the run finishes; ``done`` is always the last one."""
+        with self._events_ready:
+            self._consumers += 1
+        try:
+            while True:
+                with self._events_ready:
+                    while not self._events:
+                        self._events_ready.wait()
+                    event = self._events.popleft()
+                    dropped, self._dropped = self._dropped, 0
+                if dropped:
+                    yield {"type": "log", "message": f"[시스템] 밀린 이벤트 {dropped}개를 건너뛰었습니다."}
+                yield event
+                if event["type"] == "done":
+                    return
+        finally:
+            with self._events_ready:
+                self._consumers -= 1
+
+    def _run(self) -> None:
+        done: dict[str, Any] = {"type": "done", "ok": False, "cancelled": False, "error": None}
+        try:
+            self.result = self._target(self)
+            done["ok"] = True
+        except Exception as exc:
+            self.error = exc
+            done["error"] = str(exc)
+        finally:
+            done["cancelled"] = self.cancel_event.is_set()
+            summary = self.result.get("summary") if isinstance(self.result, dict) else None
+            if summary is not None:
+                done["summary"] = summary
+            self._put(done)
@@ -0,0 +1,326 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Iterable
+
+from .state import SCHEMA_VERSION, empty_state, load_state_file, normalize_state
+
+logger = logging.getLogger(__name__)
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS items (
+    video_id TEXT PRIMARY KEY,
+    status TEXT,
+    folder TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_items_status ON items(status);
+CREATE TABLE IF NOT EXISTS item_playlists (
+    video_id TEXT NOT NULL,
+    playlist_name TEXT NOT NULL,
+    PRIMARY KEY (video_id, playlist_name)
+);
+CREATE INDEX IF NOT EXISTS idx_item_playlists_playlist ON item_playlists(playlist_name);
+CREATE TABLE IF NOT EXISTS history (
+    position INTEGER PRIMARY KEY,
+    video_id TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS playlist_snapshots (
+    key TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS snapshot_items (
+    playlist_key TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    video_id TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (playlist_key, position)
+);
+CREATE INDEX IF NOT EXISTS idx_snapshot_items_video ON snapshot_items(video_id);
+CREATE TABLE IF NOT EXISTS queue (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    video_id TEXT,
+    status TEXT,
+    playlist_name TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_queue_video ON queue(video_id);
+CREATE INDEX IF NOT EXISTS idx_queue_status ON queue(status);
+CREATE INDEX IF NOT EXISTS idx_queue_playlist ON queue(playlist_name);
+"""
+
+# Top-level sections with dedicated tables; everything else lives in ``meta``.
+TABLE_SECTIONS = {"schema_version", "items", "history", "playlist_snapshots", "queue"}
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+
+
+class SqliteStateStore:
+    """SQLite-backed persistence for the state dict used by ``state``/``management``.
+
+    The store also satisfies the ``ItemWriter`` protocol, so passing it as
+    ``journal=`` to the ``record_*`` helpers writes just the touched row.
+    Each thread reuses one connection; the schema and WAL mode are set up by
+    the first connection only. Use ``sqlite_store`` to share a store per path.
+    """
+
+    def __init__(self, db_path: str | Path):
+        self.path = Path(db_path)
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def connect(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it (and the schema) on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with self._init_lock:
+            if not self._initialized:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(SQLITE_SCHEMA)
+                self._initialized = True
+        self._local.conn = conn
+        return conn
+
+    def close(self) -> None:
+        """Close the calling thread's connection (others close when their thread exits)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            conn.close()
+
+    # -- load -------------------------------------------------------------
+
+    def load(self) -> dict[str, Any]:
+        if not self.path.exists():
+            return empty_state()
+        conn = self.connect()
+        raw: dict[str, Any] = {}
+        for key, value in conn.execute("SELECT key, value FROM meta"):
+            raw[key] = json.loads(value)
+        raw["items"] = {vid: json.loads(data) for vid, data in conn.execute("SELECT video_id, data FROM items")}
+        raw["history"] = [vid for (vid,) in conn.execute("SELECT video_id FROM history ORDER BY position")]
+        snapshots: dict[str, Any] = {}
+        for key, data in conn.execute("SELECT key, data FROM playlist_snapshots ORDER BY position"):
+            snapshot = json.loads(data)
+            snapshot["items"] = []
+            snapshots[key] = snapshot
+        rows = conn.execute("SELECT playlist_key, data FROM snapshot_items ORDER BY playlist_key, position")
+        for key, data in rows:
+            if key in snapshots:
+                snapshots[key]["items"].append(json.loads(data))
+        if snapshots:
+            raw["playlist_snapshots"] = snapshots
+        queue = [json.loads(data) for (data,) in conn.execute("SELECT data FROM queue ORDER BY position")]
+        if queue:
+            raw["queue"] = queue
+        raw.setdefault("schema_version", SCHEMA_VERSION)
+        return normalize_state(raw, self.path)
+
+    # -- full save --------------------------------------------------------
+
+    def save(self, state: dict[str, Any]) -> None:
+        with self.connect() as conn:
+            self._save_meta(conn, state)
+            self._save_items(conn, state.get("items", {}) or {})
+            self._save_history(conn, state.get("history", []) or [])
+            self._save_snapshots(conn, state.get("playlist_snapshots", {}) or {})
+            self._save_queue(conn, state.get("queue", []) or [])
+
+    def _save_meta(self, conn: sqlite3.Connection, state: dict[str, Any]) -> None:
+        rows = [("schema_version", _dumps(state.get("schema_version", SCHEMA_VERSION)))]
+        rows.extend((key, _dumps(value)) for key, value in state.items() if key not in TABLE_SECTIONS)
+        conn.execute("DELETE FROM meta WHERE key NOT IN (%s)" % ",".join("?" * len(rows)), [key for key, _ in rows])
+        conn.executemany(
+            "INSERT INTO meta(key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value WHERE value IS NOT excluded.value",
+            rows,
+        )
+
+    def _save_items(self, conn: sqlite3.Connection, items: dict[str, Any]) -> None:
+        stored = dict(conn.execute("SELECT video_id, data FROM items"))
+        for video_id, entry in items.items():
+            data = _dumps(entry)
+            if stored.pop(video_id, None) != data:
+                self._upsert_item(conn, video_id, entry, data)
+        if stored:
+            conn.executemany("DELETE FROM items WHERE video_id = ?", [(vid,) for vid in stored])
+            conn.executemany("DELETE FROM item_playlists WHERE video_id = ?", [(vid,) for vid in stored])
+
+    def _upsert_item(self, conn: sqlite3.Connection, video_id: str, entry: dict[str, Any], data: str | None = None) -> None:
+        conn.execute(
+            "INSERT INTO items(video_id, status, folder, data) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(video_id) DO UPDATE SET status = excluded.status, folder = excluded.folder, data = excluded.data",
+            (video_id, entry.get("status"), entry.get("folder"), data if data is not None else _dumps(entry)),
+        )
+        conn.execute("DELETE FROM item_playlists WHERE video_id = ?", (video_id,))
+        conn.executemany(
+            "INSERT OR IGNORE INTO item_playlists(video_id, playlist_name) VALUES (?, ?)",
+            [(video_id, name) for name in entry.get("playlist_names") or [] if name],
+        )
+
+    def _save_history(self, conn: sqlite3.Connection, history: list[str]) -> None:
+        stored = list(conn.execute("SELECT position, video_id FROM history ORDER BY position"))
+        common = 0
+        for (_, stored_vid), vid in zip(stored, history):
+            if stored_vid != vid:
+                break
+            common += 1
+        if common == len(stored) == len(history):
+            return
+        if common < len(stored):
+            conn.execute("DELETE FROM history WHERE position >= ?", (stored[common][0],))
+        conn.executemany("INSERT OR REPLACE INTO history(video_id) VALUES (?)", [(vid,) for vid in history[common:]])
+
+    def _save_snapshots(self, conn: sqlite3.Connection, snapshots: dict[str, Any]) -> None:
+        stored = dict(conn.execute("SELECT key, digest FROM playlist_snapshots"))
+        for position, (key, snapshot) in enumerate(snapshots.items()):
+            self._write_snapshot(conn, key, position, snapshot, stored.pop(key, None))
+        for key in stored:
+            conn.execute("DELETE FROM playlist_snapshots WHERE key = ?", (key,))
+            conn.execute("DELETE FROM snapshot_items WHERE playlist_key = ?", (key,))
+
+    def _write_snapshot(
+        self,
+        conn: sqlite3.Connection,
+        key: str,
+        position: int,
+        snapshot: dict[str, Any],
+        previous_digest: str | None,
+    ) -> None:
+        header = {k: v for k, v in snapshot.items() if k != "items"}
+        items = snapshot.get("items", []) or []
+        item_rows = [_dumps(item) for item in items]
+        digest = hashlib.sha1("\n".join([_dumps(header), *item_rows]).encode("utf-8")).hexdigest()
+        conn.execute(
+            "INSERT INTO playlist_snapshots(key, position, digest, data) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET position = excluded.position, digest = excluded.digest, data = excluded.data",
+            (key, position, digest, _dumps(header)),
+        )
+        if previous_digest == digest:
+            return
+        conn.execute("DELETE FROM snapshot_items WHERE playlist_key = ?", (key,))
+        conn.executemany(
+            "INSERT INTO snapshot_items(playlist_key, position, video_id, data) VALUES (?, ?, ?, ?)",
+            [(key, pos, item.get("video_id") or "", row) for pos, (item, row) in enumerate(zip(items, item_rows))],
+        )
+
+    def _save_queue(self, conn: sqlite3.Connection, queue: list[dict[str, Any]]) -> None:
+        stored = {job_id: (position, data) for job_id, position, data in conn.execute("SELECT id, position, data FROM queue")}
+        for position, job in enumerate(queue):
+            job_id = job.get("id")
+            if not job_id:
+                continue
+            data = _dumps(job)
+            if stored.pop(job_id, None) == (position, data):
+                continue
+            self._upsert_job(conn, job, position, data)
+        if stored:
+            conn.executemany("DELETE FROM queue WHERE id = ?", [(job_id,) for job_id in stored])
+
+    def _upsert_job(self, conn: sqlite3.Connection, job: dict[str, Any], position: int, data: str | None = None) -> None:
+        conn.execute(
+            "INSERT INTO queue(id, position, video_id, status, playlist_name, data) VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET position = excluded.position, video_id = excluded.video_id, "
+            "status = excluded.status, playlist_name = excluded.playlist_name, data = excluded.data",
+            (job["id"], position, job.get("video_id"), job.get("status"), job.get("playlist_name"), data or _dumps(job)),
+        )
+
+    # -- row-level helpers ------------------------------------------------
+
+    def append_item(self, state: dict[str, Any], video_id: str, *, history: bool = False) -> None:
+        entry = state.get("items", {}).get(video_id)
+        if entry is None:
+            return
+        with self.connect() as conn:
+            self._upsert_item(conn, video_id, entry)
+            if history:
+                conn.execute("DELETE FROM history WHERE video_id = ?", (video_id,))
+                conn.execute("INSERT INTO history(video_id) VALUES (?)", (video_id,))
+
+    def needs_compaction(self) -> bool:
+        return False
+
+    def reset(self) -> None:
+        return None
+
+
+_stores: dict[str, SqliteStateStore] = {}
+_stores_lock = threading.Lock()
+
+
+def sqlite_store(db_path: str | Path) -> SqliteStateStore:
+    """The process-wide store for ``db_path``, so connections and schema setup are reused."""
+    key = os.path.abspath(db_path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = SqliteStateStore(db_path)
+        return store
+
+
+def _forget_store(db_path: str | Path) -> None:
+    with _stores_lock:
+        store = _stores.pop(os.path.abspath(db_path), None)
+    if store is not None:
+        store.close()
+
+
+def load_sqlite_state(db_path: str | Path) -> dict[str, Any]:
+    return sqlite_store(db_path).load()
+
+
+def save_sqlite_state(state: dict[str, Any], db_path: str | Path) -> None:
+    sqlite_store(db_path).save(state)
+
+
+def import_json_state(json_path: str | Path, db_path: str | Path, *, overwrite: bool = False) -> dict[str, Any]:
+    """One-shot import of a schema v1 ``sync_state.json`` (plus journal) into SQLite."""
+    db = Path(db_path)
+    if db.exists() and not overwrite:
+        raise FileExistsError(f"sqlite state already exists: {db}")
+    state = load_state_file(json_path)
+    if overwrite:
+        # Connections to the replaced file must not be reused.
+        _forget_store(db)
+        for suffix in ("", "-wal", "-shm"):
+            Path(f"{db}{suffix}").unlink(missing_ok=True)
+    sqlite_store(db).save(state)
+    logger.info("Imported %s item(s) from %s into %s", len(state.get("items", {})), json_path, db)
+    return state
+
+
+def main(argv: Iterable[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Import sync_state.json into a SQLite state store.")
+    parser.add_argument("json_path")
+    parser.add_argument("db_path")
+    parser.add_argument("--overwrite", action="store_true")
+    args = parser.parse_args(list(argv) if argv is not None else None)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    state = import_json_state(args.json_path, args.db_path, overwrite=args.overwrite)
+    print(f"{len(state.get('items', {}))}개 항목을 {args.db_path}로 가져왔습니다.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
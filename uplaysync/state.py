@@ -5,14 +5,22 @@ import logging
 import os
 import shutil
 import errno
+import threading
+import time
+import weakref
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Iterable, Optional
+from typing import Any, Callable, Iterable, Optional, Protocol
 
 SCHEMA_VERSION = 1
 STATE_FILE = "sync_state.json"
 ID_MAP_FILE = "id_map.json"
 DOWNLOAD_HISTORY_FILE = "download_history.json"
+JOURNAL_SUFFIX = ".journal"
+SQLITE_SUFFIXES = frozenset({".sqlite", ".sqlite3", ".db"})
+STATE_BACKENDS = frozenset({"json", "sqlite"})
+DEFAULT_LEGACY_MIRROR_INTERVAL = 30.0
+DEFAULT_JOURNAL_COMPACT_EVERY = 500
 
 logger = logging.getLogger(__name__)
 
@@ -21,8 +29,46 @@ def utc_now() -> str:
     return datetime.now(timezone.utc).isoformat(timespec="seconds")
 
 
+class SyncState(dict):
+    """State document plus in-memory change tracking that is never serialized."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.dirty_items: set[str] = set()
+        self.indexes: dict[str, Any] = {}
+
+
+def mark_dirty(state: dict[str, Any], video_id: str) -> None:
+    dirty = getattr(state, "dirty_items", None)
+    if dirty is not None:
+        dirty.add(video_id)
+
+
+def clear_dirty(state: dict[str, Any]) -> None:
+    dirty = getattr(state, "dirty_items", None)
+    if dirty is not None:
+        dirty.clear()
+
+
+def cached_index(state: dict[str, Any], name: str, build: Callable[[dict[str, Any]], Any]) -> Any:
+    """Return the derived index ``name`` kept on a SyncState; plain dicts get a fresh build."""
+    indexes = getattr(state, "indexes", None)
+    if indexes is None:
+        return build(state)
+    index = indexes.get(name)
+    if index is None:
+        index = indexes[name] = build(state)
+    return index
+
+
+def drop_index(state: dict[str, Any], name: str) -> None:
+    indexes = getattr(state, "indexes", None)
+    if indexes is not None:
+        indexes.pop(name, None)
+
+
 def empty_state() -> dict[str, Any]:
-    return {"schema_version": SCHEMA_VERSION, "items": {}, "history": []}
+    return SyncState({"schema_version": SCHEMA_VERSION, "items": {}, "history": []})
 
 
 def _load_json(path: Path, default: Any) -> Any:
@@ -133,16 +179,201 @@ def normalize_state(raw_state: Any, source: str | Path = STATE_FILE) -> dict[str
         logger.warning("State %s has invalid history; using empty history", source)
         history = []
 
-    normalized = dict(raw_state)
+    normalized = SyncState(raw_state)
     normalized["schema_version"] = SCHEMA_VERSION
     normalized["items"] = items
     normalized["history"] = [str(video_id) for video_id in history if str(video_id) in items]
     return normalized
 
 
+def is_sqlite_state_path(state_path: str | Path) -> bool:
+    return Path(state_path).suffix.lower() in SQLITE_SUFFIXES
+
+
+def resolve_state_backend(config: dict[str, Any] | None = None) -> str:
+    """``UPLAYSYNC_STATE_BACKEND`` or config ``state_backend``; unknown values fall back to ``json``."""
+    env_backend = os.environ.get("UPLAYSYNC_STATE_BACKEND")
+    source = "UPLAYSYNC_STATE_BACKEND" if env_backend else "state_backend"
+    backend = str(env_backend or (config or {}).get("state_backend") or "json").strip().lower()
+    if backend not in STATE_BACKENDS:
+        logger.warning(
+            "Unsupported %s %r (expected one of: %s); using the json backend",
+            source,
+            backend,
+            ", ".join(sorted(STATE_BACKENDS)),
+        )
+        return "json"
+    return backend
+
+
+def resolve_state_path(state_path: str | Path, backend: str = "json") -> Path:
+    """Map the configured state path onto the selected backend's file."""
+    path = Path(state_path)
+    if backend == "sqlite" and not is_sqlite_state_path(path):
+        return path.with_suffix(".sqlite3")
+    return path
+
+
+def json_sibling_for(state_path: str | Path) -> Path:
+    return Path(state_path).with_suffix(".json")
+
+
+def prepare_state_backend(state_path: str | Path) -> bool:
+    """Import ``<name>.json`` into a new SQLite store once. Returns True if imported."""
+    path = Path(state_path)
+    if not is_sqlite_state_path(path) or path.exists():
+        return False
+    source = json_sibling_for(path)
+    if not source.exists():
+        return False
+    from .sqlite_state import import_json_state
+
+    import_json_state(source, path)
+    return True
+
+
+def open_state_journal(
+    state_path: str | Path,
+    compact_every: int | None = None,
+) -> Optional[ItemWriter]:
+    """Return the per-item writer for ``state_path``, or None for full-snapshot saves."""
+    if is_sqlite_state_path(state_path):
+        from .sqlite_state import sqlite_store
+
+        return sqlite_store(state_path)
+    if compact_every:
+        return StateJournal(state_path, compact_every=compact_every)
+    return None
+
+
+def journal_path_for(state_path: str | Path) -> Path:
+    path = Path(state_path)
+    return path.with_name(f"{path.name}{JOURNAL_SUFFIX}")
+
+
+def read_journal(journal_path: str | Path) -> list[dict[str, Any]]:
+    """Read journal records, stopping at the first torn/partial line."""
+    path = Path(journal_path)
+    if not path.exists():
+        return []
+    records: list[dict[str, Any]] = []
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash mid-append leaves at most one partial trailing record.
+                    logger.warning("Ignoring torn journal record at %s:%s", path, line_number)
+                    break
+                if isinstance(record, dict):
+                    records.append(record)
+    except OSError as exc:
+        logger.warning("Failed to read journal %s: %s", path, exc)
+    return records
+
+
+def apply_journal_record(state: dict[str, Any], record: dict[str, Any]) -> None:
+    op = record.get("op")
+    if op != "item":
+        logger.warning("Ignoring unknown journal op: %s", op)
+        return
+    video_id = record.get("id")
+    entry = record.get("entry")
+    if not video_id or not isinstance(entry, dict):
+        return
+    state.setdefault("items", {})[str(video_id)] = entry
+    if record.get("history"):
+        add_history(state, str(video_id))
+
+
+def replay_journal(state: dict[str, Any], journal_path: str | Path) -> int:
+    records = read_journal(journal_path)
+    for record in records:
+        apply_journal_record(state, record)
+    if records:
+        logger.info("Replayed %s journal record(s) from %s", len(records), journal_path)
+    return len(records)
+
+
+class ItemWriter(Protocol):
+    """Per-item writer passed as ``journal=`` (``StateJournal`` or ``SqliteStateStore``)."""
+
+    def append_item(self, state: dict[str, Any], video_id: str, *, history: bool = False) -> None: ...
+
+    def needs_compaction(self) -> bool: ...
+
+    def reset(self) -> None: ...
+
+
+class StateJournal:
+    """Append-only log of item mutations written between full state snapshots."""
+
+    def __init__(
+        self,
+        state_path: str | Path = STATE_FILE,
+        *,
+        compact_every: int = DEFAULT_JOURNAL_COMPACT_EVERY,
+        fsync: bool = True,
+    ):
+        self.path = journal_path_for(state_path)
+        self.compact_every = max(1, int(compact_every))
+        self.fsync = fsync
+        self.pending = 0
+
+    def append_item(self, state: dict[str, Any], video_id: str, *, history: bool = False) -> None:
+        entry = state.get("items", {}).get(video_id)
+        if entry is None:
+            return
+        record: dict[str, Any] = {"op": "item", "id": video_id, "entry": entry}
+        if history:
+            record["history"] = True
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Reopen per record so a snapshot written by another process (which
+        # removes the journal) never leaves us appending to an unlinked file.
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(line + "\n")
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        self.pending += 1
+
+    def needs_compaction(self) -> bool:
+        return self.pending >= self.compact_every
+
+    def reset(self) -> None:
+        self.path.unlink(missing_ok=True)
+        self.pending = 0
+
+
+def state_signature(state_path: str | Path) -> tuple[Any, ...]:
+    """Cheap change detector for a state store: (inode, mtime_ns, size) of its files."""
+    path = Path(state_path)
+    companion = Path(f"{path}-wal") if is_sqlite_state_path(path) else journal_path_for(path)
+    parts: list[Any] = []
+    for candidate in (path, companion):
+        try:
+            st = candidate.stat()
+        except FileNotFoundError:
+            parts.append(None)
+            continue
+        parts.append((st.st_ino, st.st_mtime_ns, st.st_size))
+    return tuple(parts)
+
+
 def load_state_file(state_path: str | Path = STATE_FILE) -> dict[str, Any]:
     path = Path(state_path)
-    return normalize_state(_load_json(path, empty_state()), path)
+    if is_sqlite_state_path(path):
+        from .sqlite_state import load_sqlite_state
+
+        return load_sqlite_state(path)
+    state = normalize_state(_load_json(path, empty_state()), path)
+    replay_journal(state, journal_path_for(path))
+    return state
 
 
 def load_or_migrate_state(
@@ -156,7 +387,7 @@ def load_or_migrate_state(
     state_file = Path(state_path)
     id_file = Path(id_map_path)
     history_file = Path(history_path)
-    if state_file.exists():
+    if state_file.exists() or prepare_state_backend(state_file):
         return load_state_file(state_file)
 
     if create_backups:
@@ -173,54 +404,220 @@ def save_state(
     id_map_path: str | Path = ID_MAP_FILE,
     history_path: str | Path = DOWNLOAD_HISTORY_FILE,
     mirror_legacy: bool = True,
+    journal: ItemWriter | None = None,
+    json_export_path: str | Path | None = None,
+    mirror_interval: float = 0.0,
 ) -> None:
     state.setdefault("schema_version", SCHEMA_VERSION)
     state.setdefault("items", {})
     state.setdefault("history", [])
-    _atomic_write_json(Path(state_path), state)
+    if is_sqlite_state_path(state_path):
+        from .sqlite_state import save_sqlite_state
+
+        save_sqlite_state(state, state_path)
+    else:
+        _atomic_write_json(Path(state_path), state)
+        # The snapshot now contains every journaled mutation; drop the log only
+        # after the snapshot has been atomically replaced.
+        if journal is not None:
+            journal.reset()
+        else:
+            journal_path_for(state_path).unlink(missing_ok=True)
+    if json_export_path:
+        _atomic_write_json(Path(json_export_path), state)
     if mirror_legacy:
-        write_legacy_mirror(state, Path(id_map_path), Path(history_path))
+        legacy_mirror_writer(id_map_path, history_path).update(state, interval=mirror_interval)
+    clear_dirty(state)
 
 
-def write_legacy_mirror(state: dict[str, Any], id_map_path: Path, history_path: Path) -> None:
+def legacy_id_map_value(entry: dict[str, Any] | None) -> str | None:
+    if not entry:
+        return None
+    status = entry.get("status")
+    if status == "failed":
+        return f"ERROR: {entry.get('failure_reason') or 'unknown error'}"
+    if status == "downloaded" and entry.get("filename"):
+        return entry["filename"]
+    return None
+
+
+def build_legacy_mirror(state: dict[str, Any]) -> tuple[dict[str, str], list[str]]:
+    items = state.get("items", {})
     id_map: dict[str, str] = {}
-    for vid, entry in state.get("items", {}).items():
-        status = entry.get("status")
-        if status == "failed":
-            id_map[vid] = f"ERROR: {entry.get('failure_reason') or 'unknown error'}"
-        elif status == "downloaded" and entry.get("filename"):
-            id_map[vid] = entry["filename"]
-    history = [vid for vid in state.get("history", []) if vid in state.get("items", {})]
+    for vid, entry in items.items():
+        value = legacy_id_map_value(entry)
+        if value is not None:
+            id_map[vid] = value
+    history = [vid for vid in state.get("history", []) if vid in items]
+    return id_map, history
+
+
+def write_legacy_mirror(state: dict[str, Any], id_map_path: Path, history_path: Path) -> None:
+    id_map, history = build_legacy_mirror(state)
     _atomic_write_json(id_map_path, id_map)
     _atomic_write_json(history_path, history)
 
 
+class LegacyMirrorWriter:
+    """Keeps id_map.json/download_history.json in sync, writing only on change.
+
+    Dirty item ids recorded on a ``SyncState`` are applied incrementally when the
+    same state object is saved again; any other object triggers a full rebuild.
+    Writes inside ``interval`` seconds of the previous one are coalesced and
+    flushed by a timer, ``flush()`` or the next unthrottled update.
+    """
+
+    def __init__(self, id_map_path: str | Path, history_path: str | Path):
+        self.id_map_path = Path(id_map_path)
+        self.history_path = Path(history_path)
+        self.writes = 0
+        self._lock = threading.Lock()
+        self._state_ref: Any = None
+        self._id_map: dict[str, str] | None = None
+        self._history: list[str] | None = None
+        self._pending = False
+        self._last_write: float | None = None
+        self._timer: threading.Timer | None = None
+
+    def update(self, state: dict[str, Any], *, interval: float = 0.0) -> bool:
+        with self._lock:
+            self._refresh(state)
+            if not self._pending:
+                return False
+            elapsed = time.monotonic() - self._last_write if self._last_write is not None else interval
+            if interval <= 0 or elapsed >= interval:
+                self._write_locked()
+                return True
+            if self._timer is None:
+                self._timer = threading.Timer(interval - elapsed, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+            return False
+
+    def flush(self) -> bool:
+        with self._lock:
+            if not self._pending:
+                return False
+            self._write_locked()
+            return True
+
+    def _refresh(self, state: dict[str, Any]) -> None:
+        dirty = getattr(state, "dirty_items", None)
+        same_state = self._state_ref is not None and self._state_ref() is state
+        if same_state and dirty is not None and self._id_map is not None:
+            items = state.get("items", {})
+            for vid in dirty:
+                value = legacy_id_map_value(items.get(vid))
+                if self._id_map.get(vid) == value:
+                    continue
+                if value is None:
+                    self._id_map.pop(vid, None)
+                else:
+                    self._id_map[vid] = value
+                self._pending = True
+            history = [vid for vid in state.get("history", []) if vid in items]
+        else:
+            id_map, history = build_legacy_mirror(state)
+            if id_map != self._id_map:
+                self._id_map = id_map
+                self._pending = True
+            try:
+                self._state_ref = weakref.ref(state)
+            except TypeError:
+                self._state_ref = None
+        if history != self._history:
+            self._history = history
+            self._pending = True
+        if not self._pending and not (self.id_map_path.exists() and self.history_path.exists()):
+            self._pending = True
+
+    def _write_locked(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        _atomic_write_json(self.id_map_path, self._id_map or {})
+        _atomic_write_json(self.history_path, self._history or [])
+        self._pending = False
+        self._last_write = time.monotonic()
+        self.writes += 1
+
+
+_mirror_writers: dict[tuple[str, str], LegacyMirrorWriter] = {}
+_mirror_writers_lock = threading.Lock()
+
+
+def legacy_mirror_writer(id_map_path: str | Path, history_path: str | Path) -> LegacyMirrorWriter:
+    key = (os.path.abspath(id_map_path), os.path.abspath(history_path))
+    with _mirror_writers_lock:
+        writer = _mirror_writers.get(key)
+        if writer is None:
+            writer = _mirror_writers[key] = LegacyMirrorWriter(id_map_path, history_path)
+        return writer
+
+
+def flush_legacy_mirrors() -> int:
+    """Write every coalesced mirror update now; call at end of run/shutdown."""
+    with _mirror_writers_lock:
+        writers = list(_mirror_writers.values())
+    return sum(1 for writer in writers if writer.flush())
+
+
 def add_history(state: dict[str, Any], video_id: str) -> None:
+    mark_dirty(state, video_id)
     history = state.setdefault("history", [])
     if video_id in history:
         history.remove(video_id)
     history.append(video_id)
 
 
-def file_exists_for_entry(entry: dict[str, Any], fallback_folder: str | Path | None = None) -> bool:
+class DirectoryListing:
+    """Answers existence checks from one ``scandir`` per directory instead of one stat per path."""
+
+    def __init__(self):
+        self._names: dict[str, frozenset[str] | None] = {}
+        self.scans = 0
+
+    def names(self, folder: str | Path) -> frozenset[str] | None:
+        key = os.path.abspath(folder)
+        if key not in self._names:
+            self.scans += 1
+            try:
+                with os.scandir(key) as entries:
+                    self._names[key] = frozenset(entry.name for entry in entries)
+            except OSError:
+                self._names[key] = None
+        return self._names[key]
+
+    def exists(self, path: str | Path) -> bool:
+        path = Path(path)
+        names = self.names(path.parent)
+        return names is not None and path.name in names
+
+
+def file_exists_for_entry(
+    entry: dict[str, Any],
+    fallback_folder: str | Path | None = None,
+    listing: DirectoryListing | None = None,
+) -> bool:
+    exists = listing.exists if listing is not None else os.path.exists
     filename = entry.get("filename")
     if not filename:
         return False
     path = Path(filename)
-    if path.is_absolute() and path.exists():
+    if path.is_absolute() and exists(path):
         return True
 
     folder_value = entry.get("folder") or fallback_folder
     folder = Path(folder_value) if folder_value else None
-    if folder and (folder / filename).exists():
+    if folder and exists(folder / filename):
         return True
 
     relative_path = entry.get("relative_path")
     if relative_path:
         rel = Path(relative_path)
-        if rel.is_absolute() and rel.exists():
+        if rel.is_absolute() and exists(rel):
             return True
-        if folder and (folder.parent / rel).exists():
+        if folder and exists(folder.parent / rel):
             return True
     return False
 
@@ -234,6 +631,7 @@ def record_downloaded(
     playlist_name: str | None,
     folder: str,
     filename: str,
+    journal: ItemWriter | None = None,
 ) -> dict[str, Any]:
     now = utc_now()
     entry = state.setdefault("items", {}).get(video_id, {})
@@ -258,14 +656,19 @@ def record_downloaded(
     })
     state["items"][video_id] = entry
     add_history(state, video_id)
+    if journal is not None:
+        journal.append_item(state, video_id, history=True)
     return entry
 
 
-def record_attempt(state: dict[str, Any], video_id: str) -> None:
+def record_attempt(state: dict[str, Any], video_id: str, journal: ItemWriter | None = None) -> None:
+    mark_dirty(state, video_id)
     entry = state.setdefault("items", {}).setdefault(video_id, {"video_id": video_id})
     entry["attempt_count"] = int(entry.get("attempt_count") or 0) + 1
     entry["last_attempt_at"] = utc_now()
     entry["updated_at"] = entry["last_attempt_at"]
+    if journal is not None:
+        journal.append_item(state, video_id)
 
 
 def record_failure(
@@ -277,6 +680,7 @@ def record_failure(
     playlist_name: str | None,
     folder: str | None,
     reason: str,
+    journal: ItemWriter | None = None,
 ) -> dict[str, Any]:
     now = utc_now()
     entry = state.setdefault("items", {}).get(video_id, {})
@@ -300,4 +704,6 @@ def record_failure(
     })
     state["items"][video_id] = entry
     add_history(state, video_id)
+    if journal is not None:
+        journal.append_item(state, video_id, history=True)
     return entry
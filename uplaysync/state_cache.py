@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Any, Callable
+
+from .state import load_state_file, state_signature
+
+
+class StateCache:
+    """Process-wide cache of the loaded state document.
+
+    The cached object is reused until the state files' signature changes (for
+    example when a sync subprocess writes) or ``store``/``invalidate`` is called.
+    ``version`` increases monotonically on every reload or store so callers can
+    use it for cheap change detection.
+
+    While an object is ``pin``-ned (an in-process sync holds it), ``get``
+    always returns it and ``invalidate`` only bumps the version: swapping in a
+    freshly loaded dict would let the sync's later saves overwrite whatever
+    was written to the new one.
+    """
+
+    def __init__(self, loader: Callable[[str | Path], dict[str, Any]] = load_state_file):
+        self._loader = loader
+        self._lock = threading.RLock()
+        self._path: str | None = None
+        self._state: dict[str, Any] | None = None
+        self._signature: tuple[Any, ...] | None = None
+        self._pinned = False
+        self.version = 0
+        self.hits = 0
+        self.loads = 0
+
+    def get(self, state_path: str | Path) -> dict[str, Any]:
+        path = str(state_path)
+        with self._lock:
+            if self._pinned and path == self._path:
+                self.hits += 1
+                return self._state  # type: ignore[return-value]
+            signature = state_signature(path)
+            if self._state is None or path != self._path or signature != self._signature:
+                self._state = self._loader(path)
+                self._path = path
+                self._signature = signature
+                self.version += 1
+                self.loads += 1
+            else:
+                self.hits += 1
+            return self._state
+
+    def current_version(self, state_path: str | Path) -> int:
+        """Return the version after picking up any external write."""
+        with self._lock:
+            if self._pinned and str(state_path) == self._path:
+                return self.version
+            if self._state is None or str(state_path) != self._path or state_signature(state_path) != self._signature:
+                self.get(state_path)
+            return self.version
+
+    def store(self, state_path: str | Path, state: dict[str, Any]) -> int:
+        """Record that ``state`` was just saved to ``state_path`` by this process."""
+        with self._lock:
+            self._path = str(state_path)
+            self._state = state
+            self._signature = state_signature(state_path)
+            self.version += 1
+            return self.version
+
+    def pin(self, state_path: str | Path, state: dict[str, Any]) -> None:
+        """Serve ``state`` for ``state_path`` until ``unpin``, whatever happens on disk."""
+        with self._lock:
+            self.store(state_path, state)
+            self._pinned = True
+
+    def unpin(self) -> None:
+        with self._lock:
+            self._pinned = False
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self.version += 1
+            if self._pinned:
+                # Keep the shared object; a failed mutation may have left it partially changed.
+                return
+            self._state = None
+            self._signature = None
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import bisect
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+PHASE_PLAYLIST_FETCH = "playlist_fetch"
+# Time the sync loop blocked on a playlist that was fetched by a prefetch worker.
+PHASE_PLAYLIST_WAIT = "playlist_wait"
+PHASE_FOLDER_SCAN = "folder_scan"
+PHASE_MATCHING = "matching"
+PHASE_DOWNLOAD = "download"
+PHASE_POSTPROCESS = "postprocess"
+PHASE_STATE_SAVE = "state_save"
+PHASES = (
+    PHASE_PLAYLIST_FETCH,
+    PHASE_PLAYLIST_WAIT,
+    PHASE_FOLDER_SCAN,
+    PHASE_MATCHING,
+    PHASE_DOWNLOAD,
+    PHASE_POSTPROCESS,
+    PHASE_STATE_SAVE,
+)
+# Upper bounds (seconds) of the duration histogram buckets; the last bucket is open-ended.
+PHASE_BUCKETS = (0.001, 0.01, 0.1, 0.5, 1.0, 5.0, 30.0, 120.0, 600.0)
+
+
+class PhaseStats:
+    """Wall-clock total, count, max and bucketed histogram for one phase."""
+
+    __slots__ = ("count", "seconds", "max", "buckets")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.seconds = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(PHASE_BUCKETS) + 1)
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        self.max = max(self.max, seconds)
+        self.buckets[bisect.bisect_left(PHASE_BUCKETS, seconds)] += 1
+
+    def to_dict(self) -> dict[str, Any]:
+        labels = [str(bound) for bound in PHASE_BUCKETS] + ["+Inf"]
+        return {
+            "count": self.count,
+            "seconds": round(self.seconds, 6),
+            "max": round(self.max, 6),
+            "histogram": {label: count for label, count in zip(labels, self.buckets) if count},
+        }
+
+
+class PhaseTimer:
+    """Per-phase timings for one sync run, overall and per playlist.
+
+    Not thread-safe: ``sync_playlists`` records every phase from its own thread
+    (download durations are measured on the workers and recorded when results
+    are applied).
+    """
+
+    def __init__(self) -> None:
+        self._phases: dict[str, PhaseStats] = {}
+        self._playlists: dict[str, dict[str, PhaseStats]] = {}
+
+    def record(self, phase: str, seconds: float, playlist: str | None = None) -> None:
+        self._phases.setdefault(phase, PhaseStats()).add(seconds)
+        if playlist is not None:
+            self._playlists.setdefault(playlist, {}).setdefault(phase, PhaseStats()).add(seconds)
+
+    @contextmanager
+    def measure(self, phase: str, playlist: str | None = None) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - started, playlist)
+
+    def playlist(self, name: str) -> dict[str, Any]:
+        return {phase: stats.to_dict() for phase, stats in self._playlists.get(name, {}).items()}
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "phases": {phase: stats.to_dict() for phase, stats in self._phases.items()},
+            "playlists": {name: self.playlist(name) for name in self._playlists},
+        }
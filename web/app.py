@@ -1,4 +1,4 @@
-from flask import Flask, render_template, Response, jsonify, request
+from flask import Flask, render_template, Response, g, jsonify, request
 import subprocess
 import os
 import sys
@@ -7,8 +7,11 @@ from apscheduler.schedulers.background import BackgroundScheduler
 import atexit
 import json
 import datetime
+import hashlib
+import itertools
 import threading
 import time
+from contextlib import closing, contextmanager
 
 app = Flask(__name__)
 
@@ -17,45 +20,89 @@ PROJECT_ROOT = os.path.dirname(BASE_DIR)
 if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
+from uplaysync.change_feed import ChangeFeed, format_sse  # noqa: E402
 from uplaysync.config import merge_config_preserving_unknown, strip_legacy_metube_fields  # noqa: E402
 from uplaysync.downloader import DirectYtdlpDownloader  # noqa: E402
+from uplaysync.engine import sync_options_from_config, sync_playlists  # noqa: E402
+from uplaysync.lock import ProcessLock, SyncGate  # noqa: E402
+from uplaysync.events import EventBus  # noqa: E402
+from uplaysync.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE  # noqa: E402
+from uplaysync.metrics import DOWNLOAD_SECONDS_BUCKETS, DownloadMetrics, MetricsRegistry  # noqa: E402
 from uplaysync.management import (  # noqa: E402
+    QUEUE_PRIORITY_INTERACTIVE,
     build_management_view,
+    bulk_enqueue,
+    bulk_restore,
+    bulk_trash,
+    bump_queue_job,
     cancel_queue_job,
     compact_queue,
     enqueue_item,
     ensure_management_sections,
+    fetch_all_playlist_items,
     move_entry_to_trash,
     next_queued_job,
+    queue_job_path_key,
+    record_fetched_playlists,
     refresh_playlist_snapshot,
     reset_interrupted_jobs,
     restore_trashed_entry,
+    select_playlist_items,
+    status_for_item,
 )
 from uplaysync.state import (  # noqa: E402
+    DEFAULT_LEGACY_MIRROR_INTERVAL,
     DOWNLOAD_HISTORY_FILE,
     ID_MAP_FILE,
     STATE_FILE,
+    flush_legacy_mirrors,
+    journal_path_for,
+    json_sibling_for,
+    load_or_migrate_state,
     load_state_file,
+    prepare_state_backend,
     record_attempt,
     record_downloaded,
     record_failure,
+    resolve_state_backend,
+    resolve_state_path,
     save_state,
     utc_now,
 )
+from uplaysync.profiling import profile_output_path, run_profiled  # noqa: E402
+from uplaysync.playlist import (  # noqa: E402
+    DEFAULT_MAX_PARALLEL_PLAYLIST_FETCHES,
+    DEFAULT_PLAYLIST_CACHE_TTL,
+    PLAYLIST_CACHE_DIR,
+    PlaylistMetadataCache,
+)
+from uplaysync.run_history import (  # noqa: E402
+    DEFAULT_RUN_HISTORY_LIMIT,
+    STATUS_FILE,
+    load_status,
+    record_run,
+    run_record,
+    update_status,
+)
+from uplaysync.runner import InProcessSync  # noqa: E402
+from uplaysync.state_cache import StateCache  # noqa: E402
 
 CONFIG_FILE_PATH = os.path.join(PROJECT_ROOT, 'config.yaml')
 SYNC_SCRIPT_PATH = os.path.join(PROJECT_ROOT, 'sync.py')
-STATUS_FILE_PATH = os.path.join(PROJECT_ROOT, 'status.json')
+STATUS_FILE_PATH = os.environ.get('UPLAYSYNC_STATUS_FILE', os.path.join(PROJECT_ROOT, STATUS_FILE))
 STATE_FILE_PATH = os.environ.get('UPLAYSYNC_STATE_FILE', os.path.join(PROJECT_ROOT, STATE_FILE))
 ID_MAP_PATH = os.environ.get('UPLAYSYNC_ID_MAP_FILE', os.path.join(PROJECT_ROOT, ID_MAP_FILE))
 HISTORY_PATH = os.environ.get('UPLAYSYNC_HISTORY_FILE', os.path.join(PROJECT_ROOT, DOWNLOAD_HISTORY_FILE))
+SYNC_LOCK_PATH = os.environ.get('UPLAYSYNC_LOCK_FILE') or os.path.join(PROJECT_ROOT, '.uplaysync.lock')
 
 # Global Scheduler / process state
 scheduler = BackgroundScheduler()
 scheduler.start()
 atexit.register(lambda: scheduler.shutdown())
 current_process = None
-sync_process_lock = threading.Lock()
+current_sync = None  # InProcessSync while an in-process run is active
+SYNC_STOP_TIMEOUT = 5.0
+sync_process_lock = SyncGate()
 state_io_lock = threading.Lock()
 
 
@@ -66,14 +113,149 @@ def load_current_config():
         return strip_legacy_metube_fields(yaml.safe_load(f) or {})
 
 
-def load_current_state():
-    state = load_state_file(STATE_FILE_PATH)
+_startup_config = load_current_config()
+STATE_FILE_PATH = str(resolve_state_path(STATE_FILE_PATH, resolve_state_backend(_startup_config)))
+STATE_JSON_EXPORT_PATH = (
+    str(json_sibling_for(STATE_FILE_PATH))
+    if _startup_config.get('state_json_export') and not STATE_FILE_PATH.endswith('.json')
+    else None
+)
+LEGACY_MIRROR_INTERVAL = float(
+    os.environ.get('UPLAYSYNC_LEGACY_MIRROR_INTERVAL')
+    or _startup_config.get('legacy_mirror_interval', DEFAULT_LEGACY_MIRROR_INTERVAL)
+)
+atexit.register(flush_legacy_mirrors)
+# Manual refreshes always hit the network and write the cache for the next sync.
+playlist_cache = PlaylistMetadataCache(
+    os.path.join(os.path.dirname(os.path.abspath(STATE_FILE_PATH)), PLAYLIST_CACHE_DIR),
+    ttl=float(_startup_config.get('playlist_cache_ttl', DEFAULT_PLAYLIST_CACHE_TTL)),
+)
+
+
+# Prometheus-style telemetry served at /metrics; gauges derived from state are refreshed per scrape.
+metrics = MetricsRegistry()
+download_metrics = DownloadMetrics(metrics)
+QUEUE_JOB_STATUSES = ('queued', 'running', 'completed', 'failed', 'canceled')
+queue_jobs_gauge = metrics.gauge('uplaysync_queue_jobs', 'Download queue jobs by status.', ('status',))
+queue_oldest_queued_gauge = metrics.gauge(
+    'uplaysync_queue_oldest_queued_age_seconds', 'Age of the oldest job still waiting in the download queue.'
+)
+queue_job_seconds = metrics.histogram(
+    'uplaysync_queue_job_duration_seconds', 'Queue job run time by final status.', ('status',), DOWNLOAD_SECONDS_BUCKETS
+)
+state_load_seconds = metrics.histogram('uplaysync_state_load_seconds', 'Time to load the state store from disk.')
+state_save_seconds = metrics.histogram('uplaysync_state_save_seconds', 'Time for the web app to save the state store.')
+state_size_gauge = metrics.gauge('uplaysync_state_size_bytes', 'Size of the state store files on disk.')
+state_items_gauge = metrics.gauge('uplaysync_state_items', 'Items tracked in the state.')
+http_request_seconds = metrics.histogram(
+    'uplaysync_http_request_duration_seconds',
+    'Time until a response is returned, per route (streams count until headers).',
+    ('route', 'method', 'status'),
+)
+sync_running_gauge = metrics.gauge('uplaysync_sync_running', '1 while a sync run holds the sync lock.')
+last_sync_seconds_gauge = metrics.gauge('uplaysync_last_sync_duration_seconds', 'Wall-clock time of the most recent sync.')
+last_sync_success_gauge = metrics.gauge(
+    'uplaysync_last_sync_success', '1 if the most recent sync finished without error and was not cancelled.'
+)
+last_sync_finished_gauge = metrics.gauge(
+    'uplaysync_last_sync_finished_timestamp_seconds', 'Unix time the most recent sync finished.'
+)
+last_sync_items_gauge = metrics.gauge('uplaysync_last_sync_items', 'Item counts of the most recent sync.', ('outcome',))
+last_sync_phase_gauge = metrics.gauge(
+    'uplaysync_last_sync_phase_seconds', 'Time spent per phase in the most recent sync.', ('phase',)
+)
+
+
+def _load_state_with_sections(path):
+    started = time.perf_counter()
+    state = load_state_file(path)
     ensure_management_sections(state)
+    state_load_seconds.observe(time.perf_counter() - started)
     return state
 
 
+state_cache = StateCache(_load_state_with_sections)
+
+
+def load_current_state():
+    """Return the shared cached state; callers must hold state_io_lock to mutate it."""
+    return state_cache.get(STATE_FILE_PATH)
+
+
 def save_current_state(state):
-    save_state(state, STATE_FILE_PATH, ID_MAP_PATH, HISTORY_PATH)
+    started = time.perf_counter()
+    save_state(
+        state,
+        STATE_FILE_PATH,
+        ID_MAP_PATH,
+        HISTORY_PATH,
+        json_export_path=STATE_JSON_EXPORT_PATH,
+        mirror_interval=LEGACY_MIRROR_INTERVAL,
+    )
+    state_save_seconds.observe(time.perf_counter() - started)
+    global _feed_state_version
+    _feed_state_version = state_cache.store(STATE_FILE_PATH, state)
+
+
+@contextmanager
+def state_transaction():
+    """Lock and yield the cached state; drop the cache if the block fails mid-mutation."""
+    with state_io_lock:
+        state = load_current_state()
+        try:
+            yield state
+        except BaseException:
+            state_cache.invalidate()
+            raise
+
+
+# Change stream for /manage: mutations publish deltas after saving; see /api/manage/events.
+change_feed = ChangeFeed()
+MANAGE_EVENTS_HEARTBEAT = 5.0
+_feed_state_version = None  # last StateCache version the feed has accounted for
+
+
+def publish_job_change(state, job):
+    queue = state.get('queue', []) or []
+    change_feed.publish('job', {
+        'job': dict(job),
+        'summary': {
+            'queue': len(queue),
+            'queue_active': sum(1 for candidate in queue if candidate.get('status') in ('queued', 'running')),
+        },
+    })
+
+
+def publish_item_change(state, video_id):
+    entry = state.get('items', {}).get(video_id) or {}
+    status, _ = status_for_item(state, {'video_id': video_id, 'folder': entry.get('folder')})
+    change_feed.publish('item', {
+        'video_id': video_id,
+        'status': status,
+        'title': entry.get('title'),
+        'filename': entry.get('filename'),
+        'failure_reason': entry.get('failure_reason'),
+        'trashed_at': entry.get('trashed_at'),
+    })
+
+
+def check_external_state_change():
+    """Publish ``resync`` when the state changed on disk without going through this process."""
+    global _feed_state_version
+    with state_io_lock:
+        version = state_cache.current_version(STATE_FILE_PATH)
+        if _feed_state_version is None:
+            _feed_state_version = version
+        elif version != _feed_state_version:
+            _feed_state_version = version
+            change_feed.publish('resync', {'reason': 'state changed on disk'})
+
+
+def _file_size(path):
+    try:
+        return os.path.getsize(path) if path else None
+    except OSError:
+        return None
 
 
 def find_queue_job(state, job_id):
@@ -84,52 +266,86 @@ def find_queue_job(state, job_id):
 
 
 class DownloadQueueWorker:
-    def __init__(self):
+    """Runs queued jobs on ``slots`` threads that sleep until enqueue/cancel/resume signal them.
+
+    Slots claim jobs under ``state_io_lock`` and skip jobs whose output path is
+    already being written by another slot.
+    """
+
+    def __init__(self, slots=1):
+        self.slots = max(1, int(slots or 1))
         self._lock = threading.Lock()
-        self._thread = None
+        self._wakeup = threading.Condition(self._lock)
+        self._generation = 0
+        self._threads = []
         self._cancel_events = {}
+        self._running_paths = set()  # guarded by state_io_lock
 
     def ensure_running(self):
         with self._lock:
-            if self._thread and self._thread.is_alive():
-                return
-            self._thread = threading.Thread(target=self._loop, name='uplaysync-download-queue', daemon=True)
-            self._thread.start()
+            self._threads = [thread for thread in self._threads if thread.is_alive()]
+            while len(self._threads) < self.slots:
+                thread = threading.Thread(
+                    target=self._loop,
+                    name=f'uplaysync-download-queue-{len(self._threads) + 1}',
+                    daemon=True,
+                )
+                self._threads.append(thread)
+                thread.start()
+
+    def notify(self):
+        """Signal that the queue changed; every idle slot rescans it once."""
+        self.ensure_running()
+        with self._wakeup:
+            self._generation += 1
+            self._wakeup.notify_all()
 
     def cancel(self, job_id):
         event = self._cancel_events.get(job_id)
         if event:
             event.set()
+            # A job blocked behind a running sync gives up as soon as it is woken.
+            sync_process_lock.wake()
 
     def resume_interrupted(self):
-        with state_io_lock:
-            state = load_current_state()
+        with state_transaction() as state:
             changed = reset_interrupted_jobs(state)
             if changed:
                 save_current_state(state)
-        if changed or self._has_queued_jobs():
-            self.ensure_running()
-
-    def _has_queued_jobs(self):
-        with state_io_lock:
-            state = load_current_state()
-            return next_queued_job(state) is not None
+                change_feed.publish('resync', {'reason': 'queue resumed'})
+            has_jobs = next_queued_job(state) is not None
+        if changed or has_jobs:
+            self.notify()
 
     def _loop(self):
+        seen = -1
         while True:
-            job_id = None
-            cancel_event = threading.Event()
-            with state_io_lock:
-                state = load_current_state()
-                job = next_queued_job(state)
+            with self._wakeup:
+                while self._generation == seen:
+                    self._wakeup.wait()
+                seen = self._generation
+            try:
+                while self._run_next():
+                    pass
+            except Exception as exc:
+                print(f"[Queue] Worker error: {exc}")
+
+    def _claim(self):
+        """Atomically move the next runnable job to ``running``; returns None when nothing is runnable."""
+        while True:
+            with state_transaction() as state:
+                job = next_queued_job(state, exclude_paths=self._running_paths)
                 if not job:
-                    return
+                    return None
                 if job.get('cancel_requested'):
                     job.update({'status': 'canceled', 'finished_at': utc_now()})
                     save_current_state(state)
+                    publish_job_change(state, job)
                     continue
-                job_id = job['id']
-                self._cancel_events[job_id] = cancel_event
+                path_key = queue_job_path_key(job)
+                self._running_paths.add(path_key)
+                cancel_event = threading.Event()
+                self._cancel_events[job['id']] = cancel_event
                 job.update({
                     'status': 'running',
                     'started_at': utc_now(),
@@ -147,21 +363,23 @@ class DownloadQueueWorker:
                         pass
                 record_attempt(state, job['video_id'])
                 save_current_state(state)
-
-            acquired = False
+                publish_job_change(state, job)
+                if job['trash_moved']:
+                    publish_item_change(state, job['video_id'])
+                return dict(job), path_key, cancel_event
+
+    def _run_next(self):
+        claimed = self._claim()
+        if claimed is None:
+            return False
+        job, path_key, cancel_event = claimed
+        job_id = job['id']
+        try:
+            if not sync_process_lock.acquire_shared_unless(cancel_event.is_set):
+                self._mark_job_cancelled(job_id)
+                return True
+            started = time.perf_counter()
             try:
-                while not acquired:
-                    acquired = sync_process_lock.acquire(blocking=False)
-                    if acquired:
-                        break
-                    if cancel_event.is_set():
-                        self._mark_job_cancelled(job_id)
-                        break
-                    time.sleep(1)
-                if not acquired:
-                    self._cancel_events.pop(job_id, None)
-                    continue
-
                 result = DirectYtdlpDownloader().download(
                     url=job['url'],
                     video_id=job['video_id'],
@@ -170,54 +388,145 @@ class DownloadQueueWorker:
                     cancel_event=cancel_event,
                 )
             finally:
-                if acquired:
-                    sync_process_lock.release()
-
+                sync_process_lock.release_shared()
+            seconds = time.perf_counter() - started
+            self._record_result(job_id, result)
+            ok = bool(result.ok and result.filename)
+            outcome = 'completed' if ok else 'canceled' if result.cancelled or cancel_event.is_set() else 'failed'
+            queue_job_seconds.observe(seconds, status=outcome)
+            download_metrics.observe(
+                'queue',
+                ok=ok,
+                cancelled=outcome == 'canceled',
+                error=result.error,
+                size=_file_size(result.path),
+                seconds=seconds,
+            )
+        finally:
+            self._cancel_events.pop(job_id, None)
             with state_io_lock:
-                state = load_current_state()
-                job = find_queue_job(state, job_id)
-                if not job:
-                    self._cancel_events.pop(job_id, None)
-                    continue
-                if result.ok and result.filename:
-                    record_downloaded(
+                self._running_paths.discard(path_key)
+            if self.slots > 1:
+                # A job skipped because this path was busy may be runnable now.
+                self.notify()
+        return True
+
+    def _record_result(self, job_id, result):
+        with state_transaction() as state:
+            job = find_queue_job(state, job_id)
+            if not job:
+                return
+            if result.ok and result.filename:
+                record_downloaded(
+                    state,
+                    video_id=job['video_id'],
+                    title=job.get('title') or result.title or job['video_id'],
+                    url=job['url'],
+                    playlist_name=job.get('playlist_name'),
+                    folder=job['folder'],
+                    filename=result.filename,
+                )
+                job.update({'status': 'completed', 'finished_at': utc_now(), 'error': None})
+            elif result.cancelled or job.get('cancel_requested'):
+                job.update({'status': 'canceled', 'finished_at': utc_now(), 'error': result.error})
+            else:
+                if not job.get('trash_moved'):
+                    record_failure(
                         state,
                         video_id=job['video_id'],
-                        title=job.get('title') or result.title or job['video_id'],
+                        title=job.get('title'),
                         url=job['url'],
                         playlist_name=job.get('playlist_name'),
                         folder=job['folder'],
-                        filename=result.filename,
+                        reason=result.error or 'unknown download failure',
                     )
-                    job.update({'status': 'completed', 'finished_at': utc_now(), 'error': None})
-                elif result.cancelled or job.get('cancel_requested'):
-                    job.update({'status': 'canceled', 'finished_at': utc_now(), 'error': result.error})
-                else:
-                    if not job.get('trash_moved'):
-                        record_failure(
-                            state,
-                            video_id=job['video_id'],
-                            title=job.get('title'),
-                            url=job['url'],
-                            playlist_name=job.get('playlist_name'),
-                            folder=job['folder'],
-                            reason=result.error or 'unknown download failure',
-                        )
-                    job.update({'status': 'failed', 'finished_at': utc_now(), 'error': result.error})
-                compact_queue(state)
-                save_current_state(state)
-            self._cancel_events.pop(job_id, None)
+                job.update({'status': 'failed', 'finished_at': utc_now(), 'error': result.error})
+            compact_queue(state)
+            save_current_state(state)
+            publish_job_change(state, job)
+            publish_item_change(state, job['video_id'])
 
     def _mark_job_cancelled(self, job_id):
-        with state_io_lock:
-            state = load_current_state()
+        with state_transaction() as state:
             job = find_queue_job(state, job_id)
             if job:
                 job.update({'status': 'canceled', 'finished_at': utc_now(), 'cancel_requested': True})
                 save_current_state(state)
+                publish_job_change(state, job)
+
+
+queue_worker = DownloadQueueWorker(slots=int(_startup_config.get('queue_workers', 1) or 1))
+
+
+def sync_runner_mode(config=None):
+    """``inprocess`` (default) runs the engine on a thread; ``subprocess`` spawns sync.py for isolation."""
+    config = load_current_config() if config is None else config
+    return 'subprocess' if str(config.get('sync_runner') or '').lower() == 'subprocess' else 'inprocess'
+
+
+def _store_synced_state(state):
+    # The engine mutates the cached object in place; keep serving it after its writes.
+    state_cache.store(STATE_FILE_PATH, state)
+
+
+def _sync_in_process(run, profile=False):
+    config = load_current_config()
+    options = sync_options_from_config(config, STATE_FILE_PATH)
+    options['mirror_interval'] = LEGACY_MIRROR_INTERVAL
+    run_history_limit = int(config.get('run_history_limit', DEFAULT_RUN_HISTORY_LIMIT))
+    with ProcessLock(SYNC_LOCK_PATH):
+        started_at = utc_now()
+        try:
+            with state_io_lock:
+                if not os.path.exists(STATE_FILE_PATH):
+                    load_or_migrate_state(STATE_FILE_PATH, ID_MAP_PATH, HISTORY_PATH)
+                state = load_current_state()
+                # Web mutations must land in the engine's object until the run ends.
+                state_cache.pin(STATE_FILE_PATH, state)
+
+            def sync():
+                return sync_playlists(
+                    config,
+                    state_path=STATE_FILE_PATH,
+                    id_map_path=ID_MAP_PATH,
+                    history_path=HISTORY_PATH,
+                    state=state,
+                    state_lock=state_io_lock,
+                    on_state_saved=_store_synced_state,
+                    log=run.log,
+                    on_event=EventBus(run.emit, download_metrics.sink('sync')).dispatch,
+                    cancel_event=run.cancel_event,
+                    **options,
+                )
+
+            if profile:
+                result = run_profiled(sync, profile_output_path(STATE_FILE_PATH), log=run.log)
+            else:
+                result = sync()
+        except Exception as exc:
+            record_run(STATUS_FILE_PATH, run_record(started_at=started_at, error=exc), run_history_limit)
+            raise
+        finally:
+            with state_io_lock:
+                state_cache.unpin()
+        record_run(STATUS_FILE_PATH, run_record(result['summary']), run_history_limit)
+        return result
+
 
+def start_in_process_sync(stream, profile=False):
+    """Start a sync thread that shares the web state; it releases ``sync_process_lock`` (held by the caller) when done."""
+    global current_sync
 
-queue_worker = DownloadQueueWorker()
+    def target(run):
+        global current_sync
+        try:
+            return _sync_in_process(run, profile=profile)
+        finally:
+            current_sync = None
+            sync_process_lock.release()
+
+    current_sync = InProcessSync(target, stream=stream)
+    return current_sync.start()
 
 
 def run_sync_job():
@@ -227,19 +536,26 @@ def run_sync_job():
         print("[Scheduler] Sync skipped because another sync is already running.")
         return
     print("[Scheduler] Starting scheduled sync...")
+    run = None
     try:
-        with open(STATUS_FILE_PATH, 'w', encoding='utf-8') as f:
-            json.dump({'last_run': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}, f)
-        current_process = subprocess.Popen([sys.executable, SYNC_SCRIPT_PATH], cwd=PROJECT_ROOT)
-        current_process.wait()
-        if current_process.returncode != 0:
-            raise subprocess.CalledProcessError(current_process.returncode, [sys.executable, SYNC_SCRIPT_PATH])
+        update_status(STATUS_FILE_PATH, last_run=datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+        if sync_runner_mode() == 'subprocess':
+            current_process = subprocess.Popen([sys.executable, SYNC_SCRIPT_PATH], cwd=PROJECT_ROOT)
+            current_process.wait()
+            if current_process.returncode != 0:
+                raise subprocess.CalledProcessError(current_process.returncode, [sys.executable, SYNC_SCRIPT_PATH])
+        else:
+            run = start_in_process_sync(stream=False)
+            run.join()
+            if run.error is not None:
+                raise run.error
         print("[Scheduler] Sync job completed.")
     except Exception as e:
         print(f"[Scheduler] Sync job failed: {e}")
     finally:
         current_process = None
-        sync_process_lock.release()
+        if run is None:
+            sync_process_lock.release()
 
 
 def update_scheduler():
@@ -281,12 +597,88 @@ def update_scheduler():
 
 # Initialize scheduler on startup
 update_scheduler()
+try:
+    if prepare_state_backend(STATE_FILE_PATH):
+        print(f"[State] Imported JSON state into {STATE_FILE_PATH}")
+except Exception as exc:
+    print(f"[State] Failed to prepare state backend: {exc}")
 try:
     queue_worker.resume_interrupted()
 except Exception as exc:
     print(f"[Queue] Failed to resume queue: {exc}")
 
 
+@app.before_request
+def _start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def _observe_request_latency(response):
+    started = getattr(g, 'request_started', None)
+    if started is not None:
+        # The rule template (not the path) keeps label cardinality bounded.
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        http_request_seconds.observe(
+            time.perf_counter() - started, route=route, method=request.method, status=response.status_code
+        )
+    return response
+
+
+def _timestamp(value):
+    try:
+        return datetime.datetime.fromisoformat(value).timestamp() if value else None
+    except ValueError:
+        return None
+
+
+@metrics.on_collect
+def _collect_state_metrics():
+    with state_io_lock:
+        state = load_current_state()
+        queue = list(state.get('queue', []) or [])
+        item_count = len(state.get('items', {}))
+    counts = dict.fromkeys(QUEUE_JOB_STATUSES, 0)
+    for job in queue:
+        status = job.get('status') or 'unknown'
+        counts[status] = counts.get(status, 0) + 1
+    queue_jobs_gauge.clear()
+    for status, count in counts.items():
+        queue_jobs_gauge.set(count, status=status)
+    waiting = [_timestamp(job.get('created_at')) for job in queue if job.get('status') == 'queued']
+    waiting = [created for created in waiting if created is not None]
+    queue_oldest_queued_gauge.set(max(0.0, time.time() - min(waiting)) if waiting else 0)
+    state_items_gauge.set(item_count)
+    store_files = (STATE_FILE_PATH, f'{STATE_FILE_PATH}-wal', journal_path_for(STATE_FILE_PATH))
+    state_size_gauge.set(sum(_file_size(path) or 0 for path in store_files))
+    sync_running_gauge.set(1 if current_sync is not None or current_process is not None else 0)
+
+
+@metrics.on_collect
+def _collect_last_sync_metrics():
+    runs = load_status(STATUS_FILE_PATH).get('runs') or []
+    if not runs:
+        return
+    last = runs[-1]
+    if last.get('seconds') is not None:
+        last_sync_seconds_gauge.set(last['seconds'])
+    last_sync_success_gauge.set(1 if last.get('ok') and not last.get('cancelled') else 0)
+    finished = _timestamp(last.get('finished_at'))
+    if finished is not None:
+        last_sync_finished_gauge.set(finished)
+    last_sync_items_gauge.clear()
+    for outcome, count in (last.get('counts') or {}).items():
+        last_sync_items_gauge.set(count, outcome=outcome)
+    last_sync_phase_gauge.clear()
+    for phase, stats in (last.get('phases') or {}).items():
+        last_sync_phase_gauge.set(stats.get('seconds', 0), phase=phase)
+
+
+@app.route('/metrics')
+def get_metrics():
+    return Response(metrics.render(), content_type=METRICS_CONTENT_TYPE)
+
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -301,13 +693,84 @@ def _json_error(exc, status=400):
     return jsonify({'status': 'error', 'error': str(exc)}), status
 
 
+def _file_stamp(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _etag_for(*parts):
+    """Weak ETag over the given version parts and the query args (minus the ``t`` cache buster)."""
+    query = sorted((key, value) for key, value in request.args.items() if key != 't')
+    digest = hashlib.sha1(repr((parts, query)).encode('utf-8')).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def _not_modified(etag):
+    header = request.headers.get('If-None-Match') or ''
+    tags = {tag.strip() for tag in header.split(',')}
+    return etag in tags or '*' in tags
+
+
+def _conditional_json(etag, build):
+    """304 when the client already has ``etag``; otherwise build the payload and tag it."""
+    if _not_modified(etag):
+        return Response(status=304, headers={'ETag': etag, 'Cache-Control': 'no-cache'})
+    return jsonify(build()), 200, {'ETag': etag, 'Cache-Control': 'no-cache'}
+
+
+def _management_etag(config):
+    # Item status also depends on files on disk, so folder mtimes are part of the version.
+    folders = [playlist.get('folder') for playlist in config.get('playlists', []) or []]
+    return _etag_for(
+        state_cache.current_version(STATE_FILE_PATH),
+        _file_stamp(CONFIG_FILE_PATH),
+        [_file_stamp(folder) if folder else None for folder in folders],
+    )
+
+
+def _int_arg(name, default=None):
+    value = request.args.get(name)
+    if value in (None, ''):
+        return default
+    return int(value)
+
+
+def _list_arg(name):
+    value = request.args.get(name)
+    if not value:
+        return None
+    return [part.strip() for part in value.split(',') if part.strip()]
+
+
+def _bool_arg(name):
+    return (request.args.get(name) or '').lower() in {'1', 'true', 'yes'}
+
+
 @app.route('/api/manage', methods=['GET'])
 def get_management_view():
+    """Management payload; query args page and filter item rows (see build_management_view)."""
     try:
+        options = {
+            'playlists': _list_arg('playlist'),
+            'statuses': _list_arg('status'),
+            'offset': _int_arg('offset', 0),
+            'limit': _int_arg('limit'),
+            'summary_only': _bool_arg('summary_only'),
+            'queue_limit': _int_arg('queue_limit'),
+            'trash_limit': _int_arg('trash_limit'),
+        }
+    except ValueError as exc:
+        return _json_error(exc, 400)
+    try:
+        config = load_current_config()
         with state_io_lock:
-            state = load_current_state()
-            view = build_management_view(load_current_config(), state)
-        return jsonify(view)
+            etag = _management_etag(config)
+            return _conditional_json(etag, lambda: build_management_view(config, load_current_state(), **options))
+    except ValueError as exc:
+        return _json_error(exc, 400)
     except Exception as exc:
         return _json_error(exc, 500)
 
@@ -315,10 +778,15 @@ def get_management_view():
 @app.route('/api/manage/playlists/<int:playlist_index>/refresh', methods=['POST'])
 def refresh_management_playlist(playlist_index):
     try:
-        with state_io_lock:
-            state = load_current_state()
-            snapshot = refresh_playlist_snapshot(state, load_current_config(), playlist_index)
+        with state_transaction() as state:
+            snapshot = refresh_playlist_snapshot(
+                state,
+                load_current_config(),
+                playlist_index,
+                playlist_provider=playlist_cache.refresh,
+            )
             save_current_state(state)
+        change_feed.publish('snapshot', {'keys': [snapshot.get('key')]})
         return jsonify({'status': 'success', 'snapshot': snapshot})
     except IndexError as exc:
         return _json_error(exc, 404)
@@ -326,16 +794,33 @@ def refresh_management_playlist(playlist_index):
         return _json_error(exc, 500)
 
 
+@app.route('/api/manage/playlists/refresh', methods=['POST'])
+def refresh_all_management_playlists():
+    try:
+        config = load_current_config()
+        max_workers = int(config.get('max_parallel_playlist_fetches', DEFAULT_MAX_PARALLEL_PLAYLIST_FETCHES))
+        # Network fetches run outside the state lock; only recording needs it.
+        fetched = fetch_all_playlist_items(config, playlist_provider=playlist_cache.refresh, max_workers=max_workers)
+        with state_transaction() as state:
+            result = record_fetched_playlists(state, fetched)
+            save_current_state(state)
+        change_feed.publish('snapshot', {'keys': [snapshot.get('key') for snapshot in result['snapshots']]})
+        return jsonify({'status': 'success', **result})
+    except Exception as exc:
+        return _json_error(exc, 500)
+
+
 @app.route('/api/manage/items/<video_id>/enqueue', methods=['POST'])
 def enqueue_management_item(video_id):
     try:
         payload = request.json or {}
         action = payload.get('action') or 'download'
-        with state_io_lock:
-            state = load_current_state()
-            job, created = enqueue_item(state, video_id, action=action)
+        priority = int(payload.get('priority', QUEUE_PRIORITY_INTERACTIVE))
+        with state_transaction() as state:
+            job, created = enqueue_item(state, video_id, action=action, priority=priority)
             save_current_state(state)
-        queue_worker.ensure_running()
+            publish_job_change(state, job)
+        queue_worker.notify()
         code = 201 if created else 200
         return jsonify({'status': 'success', 'created': created, 'job': job}), code
     except KeyError as exc:
@@ -347,10 +832,10 @@ def enqueue_management_item(video_id):
 @app.route('/api/manage/items/<video_id>/trash', methods=['POST'])
 def trash_management_item(video_id):
     try:
-        with state_io_lock:
-            state = load_current_state()
+        with state_transaction() as state:
             entry = move_entry_to_trash(state, video_id, reason='user-trash')
             save_current_state(state)
+            publish_item_change(state, video_id)
         return jsonify({'status': 'success', 'item': entry})
     except KeyError as exc:
         return _json_error(exc, 404)
@@ -363,10 +848,10 @@ def trash_management_item(video_id):
 @app.route('/api/manage/items/<video_id>/restore', methods=['POST'])
 def restore_management_item(video_id):
     try:
-        with state_io_lock:
-            state = load_current_state()
+        with state_transaction() as state:
             entry = restore_trashed_entry(state, video_id)
             save_current_state(state)
+            publish_item_change(state, video_id)
         return jsonify({'status': 'success', 'item': entry})
     except KeyError as exc:
         return _json_error(exc, 404)
@@ -379,11 +864,12 @@ def restore_management_item(video_id):
 @app.route('/api/manage/queue/<job_id>/cancel', methods=['POST'])
 def cancel_management_queue_job(job_id):
     try:
-        with state_io_lock:
-            state = load_current_state()
+        with state_transaction() as state:
             job = cancel_queue_job(state, job_id)
             save_current_state(state)
+            publish_job_change(state, job)
         queue_worker.cancel(job_id)
+        queue_worker.notify()
         return jsonify({'status': 'success', 'job': job})
     except KeyError as exc:
         return _json_error(exc, 404)
@@ -391,47 +877,200 @@ def cancel_management_queue_job(job_id):
         return _json_error(exc, 400)
 
 
-@app.route('/api/run')
-def run_sync():
-    """Run sync.py and stream output as SSE."""
-    if not sync_process_lock.acquire(blocking=False):
-        return jsonify({'status': 'already_running', 'message': '이미 동기화 작업이 실행 중입니다.'}), 409
+@app.route('/api/manage/queue/<job_id>/bump', methods=['POST'])
+def bump_management_queue_job(job_id):
+    try:
+        payload = request.json or {}
+        priority = payload.get('priority')
+        with state_transaction() as state:
+            job = bump_queue_job(state, job_id, None if priority is None else int(priority))
+            save_current_state(state)
+            publish_job_change(state, job)
+        queue_worker.notify()
+        return jsonify({'status': 'success', 'job': job})
+    except KeyError as exc:
+        return _json_error(exc, 404)
+    except Exception as exc:
+        return _json_error(exc, 400)
 
-    def generate():
-        global current_process
-        yield "data: [시스템] 동기화 프로세스를 시작합니다...\n\n"
-        try:
-            current_process = subprocess.Popen(
-                [sys.executable, "-u", SYNC_SCRIPT_PATH],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1,
-                cwd=PROJECT_ROOT,
+
+def _bulk_response(results):
+    ok = sum(1 for result in results if result['ok'])
+    return jsonify({'status': 'success', 'ok': ok, 'failed': len(results) - ok, 'results': results})
+
+
+def _payload_video_ids(payload):
+    video_ids = payload.get('video_ids') or []
+    if not isinstance(video_ids, list) or not all(isinstance(video_id, str) for video_id in video_ids):
+        raise ValueError('video_ids must be a list of strings')
+    return video_ids
+
+
+@app.route('/api/manage/bulk/enqueue', methods=['POST'])
+def bulk_enqueue_management_items():
+    """Enqueue ``video_ids`` or every item of ``playlist`` in ``statuses`` with one state write."""
+    try:
+        payload = request.json or {}
+        video_ids = _payload_video_ids(payload)
+        playlist = payload.get('playlist')
+        statuses = payload.get('statuses') or ['missing', 'failed']
+        config = load_current_config() if playlist is not None else None
+        with state_transaction() as state:
+            selected = select_playlist_items(config, state, playlist, statuses) if playlist is not None else {}
+            results = bulk_enqueue(
+                state,
+                [*video_ids, *selected],
+                action=payload.get('action'),
+                statuses=selected,
             )
+            if any(result['ok'] for result in results):
+                save_current_state(state)
+                change_feed.publish('resync', {'reason': 'bulk enqueue'})
+        queue_worker.notify()
+        return _bulk_response(results)
+    except KeyError as exc:
+        return _json_error(exc, 404)
+    except Exception as exc:
+        return _json_error(exc, 400)
 
-            for line in current_process.stdout:
-                yield f"data: {line.strip()}\n\n"
 
-            current_process.wait()
-            if current_process.returncode == 0:
-                yield "data: [시스템] 프로세스 종료 (성공)\n\n"
-            else:
-                yield f"data: [시스템] 프로세스 종료 (오류 코드: {current_process.returncode})\n\n"
-        except Exception as e:
-            yield f"data: [오류] 실행 중 예외 발생: {str(e)}\n\n"
-        finally:
-            current_process = None
-            sync_process_lock.release()
+@app.route('/api/manage/bulk/trash', methods=['POST'])
+def bulk_trash_management_items():
+    try:
+        video_ids = _payload_video_ids(request.json or {})
+        with state_transaction() as state:
+            results = bulk_trash(state, video_ids)
+            if any(result['ok'] for result in results):
+                save_current_state(state)
+                change_feed.publish('resync', {'reason': 'bulk trash'})
+        return _bulk_response(results)
+    except Exception as exc:
+        return _json_error(exc, 400)
+
+
+@app.route('/api/manage/bulk/restore', methods=['POST'])
+def bulk_restore_management_items():
+    try:
+        video_ids = _payload_video_ids(request.json or {})
+        with state_transaction() as state:
+            results = bulk_restore(state, video_ids)
+            if any(result['ok'] for result in results):
+                save_current_state(state)
+                change_feed.publish('resync', {'reason': 'bulk restore'})
+        return _bulk_response(results)
+    except Exception as exc:
+        return _json_error(exc, 400)
+
+
+@app.route('/api/manage/events')
+def management_events():
+    """Stream management changes as SSE; resumes from Last-Event-ID while it is still retained."""
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('since')
+    try:
+        cursor = int(last_event_id) if last_event_id else change_feed.latest
+    except ValueError:
+        cursor = change_feed.latest
+
+    def generate():
+        nonlocal cursor
+        yield "retry: 3000\n\n"
+        while True:
+            events = change_feed.since(cursor, timeout=MANAGE_EVENTS_HEARTBEAT)
+            if events is None:
+                cursor = change_feed.latest
+                yield format_sse({'id': cursor, 'event': 'resync', 'data': {'reason': 'stream gap'}})
+                continue
+            if not events:
+                check_external_state_change()
+                yield ": keepalive\n\n"
+                continue
+            for event in events:
+                cursor = event['id']
+                yield format_sse(event)
+
+    return Response(generate(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+def _stream_sync_subprocess(profile=False):
+    global current_process
+    yield "data: [시스템] 동기화 프로세스를 시작합니다...\n\n"
+    try:
+        current_process = subprocess.Popen(
+            [sys.executable, "-u", SYNC_SCRIPT_PATH] + (["--profile"] if profile else []),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+            cwd=PROJECT_ROOT,
+        )
+
+        for line in current_process.stdout:
+            yield f"data: {line.strip()}\n\n"
+
+        current_process.wait()
+        if current_process.returncode == 0:
+            yield "data: [시스템] 프로세스 종료 (성공)\n\n"
+        else:
+            yield f"data: [시스템] 프로세스 종료 (오류 코드: {current_process.returncode})\n\n"
+    except Exception as e:
+        yield f"data: [오류] 실행 중 예외 발생: {str(e)}\n\n"
+    finally:
+        current_process = None
+        sync_process_lock.release()
+
+    yield "event: close\ndata: close\n\n"
+
+
+def _stream_sync_events(run):
+    yield "data: [시스템] 동기화를 시작합니다...\n\n"
+    # A disconnecting client closes this generator; closing ``events`` detaches
+    # it so the run prints its log to the console instead.
+    with closing(run.events()) as events:
+        for event in events:
+            if event['type'] == 'log':
+                yield f"data: {event['message']}\n\n"
+            elif event['type'] == 'progress':
+                yield format_sse({'event': 'progress', 'data': event['event']})
+            elif event['type'] == 'done':
+                if event['cancelled']:
+                    yield "data: [시스템] 프로세스 종료 (중지됨)\n\n"
+                elif event['ok']:
+                    yield "data: [시스템] 프로세스 종료 (성공)\n\n"
+                else:
+                    yield f"data: [오류] 실행 중 예외 발생: {event['error']}\n\n"
+                    yield "data: [시스템] 프로세스 종료 (오류)\n\n"
+    yield "event: close\ndata: close\n\n"
+
 
-        yield "event: close\ndata: close\n\n"
+@app.route('/api/run')
+def run_sync():
+    """Run a sync and stream its progress as SSE (in-process unless ``sync_runner: subprocess``).
 
-    return Response(generate(), mimetype='text/event-stream')
+    ``?profile=1`` runs it under cProfile and appends the hotspots to the log.
+    """
+    profile = _bool_arg('profile')
+    if not sync_process_lock.acquire(blocking=False):
+        return jsonify({'status': 'already_running', 'message': '이미 동기화 작업이 실행 중입니다.'}), 409
+    try:
+        if sync_runner_mode() == 'subprocess':
+            return Response(_stream_sync_subprocess(profile), mimetype='text/event-stream')
+        run = start_in_process_sync(stream=True, profile=profile)
+    except Exception:
+        sync_process_lock.release()
+        raise
+    # The run keeps going if the client disconnects; /api/stop cancels it.
+    return Response(_stream_sync_events(run), mimetype='text/event-stream')
 
 
 @app.route('/api/stop', methods=['POST'])
 def stop_sync():
     global current_process
+    run = current_sync
+    if run is not None and run.is_running():
+        run.cancel()
+        if run.join(timeout=SYNC_STOP_TIMEOUT):
+            return jsonify({'status': 'stopped', 'message': '동기화 작업이 중지되었습니다.'})
+        return jsonify({'status': 'stopping', 'message': '진행 중인 항목이 끝나는 대로 동기화 작업이 중지됩니다.'})
     if current_process and current_process.poll() is None:
         current_process.terminate()
         try:
@@ -451,15 +1090,9 @@ def get_config():
             with open(CONFIG_FILE_PATH, 'r', encoding='utf-8') as f:
                 config = strip_legacy_metube_fields(yaml.safe_load(f) or {})
 
-        if os.path.exists(STATUS_FILE_PATH):
-            try:
-                with open(STATUS_FILE_PATH, 'r', encoding='utf-8') as f:
-                    content = f.read().strip()
-                    if content:
-                        status = json.loads(content)
-                        config['last_run'] = status.get('last_run')
-            except Exception as e:
-                print(f"[API] Warning: Failed to parse status.json: {e}")
+        status = load_status(STATUS_FILE_PATH)
+        config['last_run'] = status.get('last_run')
+        config['recent_runs'] = status.get('runs') or []
 
         job = scheduler.get_job('auto_sync')
         if job and job.next_run_time:
@@ -491,27 +1124,101 @@ def save_config():
             yaml.dump(merged, f, allow_unicode=True, default_flow_style=False)
 
         update_scheduler()
+        change_feed.publish('resync', {'reason': 'config saved'})
         return jsonify({'status': 'success', 'message': '설정이 저장되었습니다.'})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
-def _history_from_state():
-    state = load_state_file(STATE_FILE_PATH)
-    items = state.get('items', {})
-    result = []
-    for vid in reversed(state.get('history', [])):
+DEFAULT_HISTORY_PAGE_SIZE = 50
+# Rows copied per ``state_io_lock`` hold while streaming ``format=jsonl``.
+HISTORY_EXPORT_CHUNK = 500
+
+
+def _history_rows(history, items, start):
+    """Newest-first ``(position, row)`` pairs below ``start``, built lazily so a page only touches its entries."""
+    for position in range(start - 1, -1, -1):
+        vid = history[position]
         entry = items.get(vid, {})
-        result.append({
+        yield position, {
             'id': vid,
             'filename': entry.get('filename') or f"ID: {vid}",
             'status': entry.get('status') or 'unknown',
             'failure_reason': entry.get('failure_reason'),
-        })
-    return result
+        }
+
+
+def _legacy_history_rows(history_ids, id_map, start):
+    for position in range(start - 1, -1, -1):
+        vid = history_ids[position]
+        value = str(id_map.get(vid, ''))
+        failed = value.startswith('ERROR:')
+        yield position, {
+            'id': vid,
+            'filename': id_map.get(vid, f"ID: {vid}"),
+            'status': 'failed' if failed else 'downloaded',
+            'failure_reason': value[len('ERROR:'):].strip() if failed else None,
+        }
+
+
+def _history_cursor(position, video_id):
+    return f'{position}:{video_id}'
+
 
+def _cursor_start(history, after):
+    """Position below which rows after the ``<position>:<video id>`` cursor start.
 
-def _history_from_legacy():
+    Re-downloads move an id to the newest end of the history. The id finds the
+    cursor row when older rows moved away beneath it; the position still holds
+    when the cursor row itself moved. A bare video id is looked up by id only.
+    """
+    if after is None:
+        return len(history)
+    position, sep, video_id = after.partition(':')
+    if not sep or not position.isdigit():
+        position, video_id = None, after
+    try:
+        found = history.index(video_id)
+    except ValueError:
+        found = None
+    if found is not None and (position is None or found <= int(position)):
+        return found
+    return 0 if position is None else min(int(position), len(history))
+
+
+def _filter_history(rows, query=None):
+    needle = (query or '').lower()
+    for position, row in rows:
+        if not needle or needle in row['id'].lower() or needle in str(row['filename']).lower():
+            yield position, row
+
+
+def _take(rows, count):
+    return list(rows if count is None else itertools.islice(rows, count))
+
+
+def _history_snapshot(after, query, count):
+    """Up to ``count`` filtered ``(position, row)`` pairs after the cursor, or None to use the legacy mirrors.
+
+    Rows are copied while ``state_io_lock`` is held, so a streamed response
+    never reads the shared items while a sync mutates them. The mirrors are
+    only consulted while the canonical state has never recorded an item;
+    afterwards they can lag behind it by up to ``legacy_mirror_interval`` (an
+    emptied history must not resurrect the old mirror).
+    """
+    if not os.path.exists(STATE_FILE_PATH):
+        return None
+    with state_io_lock:
+        state = load_current_state()
+        history = state.get('history', []) or []
+        items = state.get('items', {})
+        if not history and not items and os.path.exists(HISTORY_PATH):
+            return None
+        rows = _history_rows(history, items, _cursor_start(history, after))
+        return _take(_filter_history(rows, query), count)
+
+
+def _legacy_history_snapshot(after, query, count):
     id_map = {}
     if os.path.exists(ID_MAP_PATH):
         with open(ID_MAP_PATH, 'r', encoding='utf-8') as f:
@@ -520,26 +1227,93 @@ def _history_from_legacy():
     if os.path.exists(HISTORY_PATH):
         with open(HISTORY_PATH, 'r', encoding='utf-8') as f:
             history_ids = json.load(f)
-    return [
-        {
-            'id': vid,
-            'filename': id_map.get(vid, f"ID: {vid}"),
-            'status': 'failed' if str(id_map.get(vid, '')).startswith('ERROR:') else 'downloaded',
-            'failure_reason': str(id_map.get(vid, ''))[len('ERROR:'):].strip()
-            if str(id_map.get(vid, '')).startswith('ERROR:') else None,
-        }
-        for vid in reversed(history_ids)
-    ]
+    rows = _legacy_history_rows(history_ids, id_map, _cursor_start(history_ids, after))
+    return _take(_filter_history(rows, query), count)
+
+
+def _history_chunk(after, query, count):
+    rows = _history_snapshot(after, query, count)
+    if rows is None:
+        rows = _legacy_history_snapshot(after, query, count)
+    return rows
+
+
+def _export_count(remaining):
+    return HISTORY_EXPORT_CHUNK if remaining is None else min(remaining, HISTORY_EXPORT_CHUNK)
+
+
+def _history_export(rows, count, query, limit):
+    """jsonl lines for ``rows`` and the chunks after it, up to ``limit`` rows in total.
+
+    Each further chunk is snapshotted on its own (resuming from the last
+    row's cursor), so the lock is never held for the whole export and at most
+    ``HISTORY_EXPORT_CHUNK`` rows are buffered at a time.
+    """
+    remaining = limit
+    while True:
+        for _, row in rows:
+            yield json.dumps(row, ensure_ascii=False) + '\n'
+        if remaining is not None:
+            remaining -= len(rows)
+        if len(rows) < count or remaining == 0:
+            return
+        count = _export_count(remaining)
+        position, row = rows[-1]
+        rows = _history_chunk(_history_cursor(position, row['id']), query, count)
+
+
+def _history_page(rows, limit):
+    more = len(rows) > limit
+    page = rows[:limit]
+    next_after = _history_cursor(page[-1][0], page[-1][1]['id']) if more and page else None
+    return {'items': [row for _, row in page], 'next_after': next_after}
 
 
 @app.route('/api/history', methods=['GET'])
 def get_history():
+    """History rows, newest first.
+
+    Without arguments the full list is returned. ``limit`` (with optional
+    ``after`` cursor and ``q`` filter) returns ``{"items", "next_after"}``;
+    ``format=jsonl`` streams one row per line instead, reading the state in
+    ``HISTORY_EXPORT_CHUNK``-row chunks. ``next_after`` is an
+    opaque ``<position>:<video id>`` cursor that stays valid when items are
+    re-downloaded between pages.
+    """
     try:
-        if os.path.exists(STATE_FILE_PATH):
-            state_history = _history_from_state()
-            if state_history or not os.path.exists(HISTORY_PATH):
-                return jsonify(state_history)
-        return jsonify(_history_from_legacy())
+        limit = _int_arg('limit')
+        after = request.args.get('after') or None
+        query = request.args.get('q') or None
+        streamed = request.args.get('format') == 'jsonl'
+        if limit is not None and limit < 0:
+            raise ValueError('limit must be >= 0')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        has_state = os.path.exists(STATE_FILE_PATH)
+        etag = _etag_for(
+            state_cache.current_version(STATE_FILE_PATH) if has_state else None,
+            _file_stamp(ID_MAP_PATH),
+            _file_stamp(HISTORY_PATH),
+        )
+        if _not_modified(etag):
+            return _conditional_json(etag, list)
+        paged = not streamed and (limit is not None or after is not None)
+        page_size = DEFAULT_HISTORY_PAGE_SIZE if limit is None else limit
+        if paged:
+            # A page fetches one extra row to know whether there is a next one.
+            count = page_size + 1
+        elif streamed:
+            count = _export_count(limit)
+        else:
+            count = limit
+        rows = _history_chunk(after, query, count)
+        if streamed:
+            lines = _history_export(rows, count, query, limit)
+            return Response(lines, mimetype='application/x-ndjson', headers={'ETag': etag, 'Cache-Control': 'no-cache'})
+        if paged:
+            return _conditional_json(etag, lambda: _history_page(rows, page_size))
+        return _conditional_json(etag, lambda: [row for _, row in rows])
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -548,9 +1322,11 @@ def get_history():
 def clear_history():
     try:
         if os.path.exists(STATE_FILE_PATH):
-            sync_state = load_state_file(STATE_FILE_PATH)
-            sync_state['history'] = []
-            save_state(sync_state, STATE_FILE_PATH, ID_MAP_PATH, HISTORY_PATH)
+            with state_transaction() as sync_state:
+                sync_state['history'] = []
+                save_current_state(sync_state)
+            # Don't leave an emptied history waiting behind the mirror interval.
+            flush_legacy_mirrors()
         else:
             with open(HISTORY_PATH, 'w', encoding='utf-8') as f:
                 json.dump([], f)
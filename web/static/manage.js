@@ -9,6 +9,17 @@ document.addEventListener('DOMContentLoaded', () => {
 
     let refreshTimer = null;
     let currentData = null;
+    const PAGE_SIZE = 100;
+    const LIST_LIMIT = 200;
+    // Row loading is per panel: closed panels only show counts from the summary request.
+    const panelState = {};
+    const statusFilters = [
+        ['', '전체'],
+        ['missing', '파일 없음'],
+        ['failed', '실패'],
+        ['not_downloaded', '미다운'],
+        ['trashed', '휴지통']
+    ];
 
     const statusLabels = {
         downloaded: '완료',
@@ -37,6 +48,29 @@ document.addEventListener('DOMContentLoaded', () => {
         statusText.textContent = text;
     }
 
+    // Last body and ETag per GET url; a 304 reuses the body and skips the re-render.
+    const conditionalCache = new Map();
+
+    async function getCached(path) {
+        const cached = conditionalCache.get(path);
+        const res = await fetch(path, {
+            cache: 'no-store',
+            headers: cached ? { 'If-None-Match': cached.etag } : {}
+        });
+        if (res.status === 304 && cached) {
+            return { data: cached.data, changed: false };
+        }
+        const data = await res.json();
+        if (!res.ok || data.status === 'error') {
+            throw new Error(data.error || data.message || '요청 실패');
+        }
+        const etag = res.headers.get('ETag');
+        if (etag) {
+            conditionalCache.set(path, { etag, data });
+        }
+        return { data, changed: true };
+    }
+
     async function api(path, options = {}) {
         const res = await fetch(path, {
             ...options,
@@ -55,11 +89,15 @@ document.addEventListener('DOMContentLoaded', () => {
     async function loadManage() {
         const scrollState = captureScrollState();
         try {
-            currentData = await api('/api/manage?t=' + Date.now());
-            render(currentData);
-            restoreScrollState(scrollState);
-            const active = currentData.summary?.queue_active || 0;
-            setStatus(active > 0 ? 'running' : '', active > 0 ? `큐 ${active}개 진행/대기` : '대기 중');
+            const summary = await getCached(`/api/manage?summary_only=1&queue_limit=${LIST_LIMIT}&trash_limit=${LIST_LIMIT}`);
+            const data = { ...summary.data, playlists: (summary.data.playlists || []).map(pl => ({ ...pl })) };
+            const panelsChanged = await loadOpenPanels(data.playlists);
+            if (summary.changed || panelsChanged || !currentData) {
+                currentData = data;
+                render(currentData);
+                restoreScrollState(scrollState);
+            }
+            updateStatusLine();
         } catch (err) {
             console.error(err);
             setStatus('error', '오류');
@@ -67,6 +105,130 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     }
 
+    function updateStatusLine() {
+        const active = currentData?.summary?.queue_active || 0;
+        setStatus(active > 0 ? 'running' : '', active > 0 ? `큐 ${active}개 진행/대기` : '대기 중');
+    }
+
+    // --- Change stream: apply deltas right away, reconcile counts with a debounced summary fetch ---
+    let eventSource = null;
+    let reconcileTimer = null;
+
+    function scheduleReconcile(delay = 2000) {
+        clearTimeout(reconcileTimer);
+        reconcileTimer = setTimeout(loadManage, delay);
+    }
+
+    function startPolling() {
+        if (!refreshTimer) {
+            refreshTimer = setInterval(loadManage, 3000);
+        }
+    }
+
+    function stopPolling() {
+        clearInterval(refreshTimer);
+        refreshTimer = null;
+    }
+
+    function patchItemRows(videoId, fields) {
+        let changed = false;
+        (currentData?.playlists || []).forEach(pl => {
+            (pl.items || []).forEach(item => {
+                if (item.video_id === videoId) {
+                    Object.assign(item, fields);
+                    changed = true;
+                }
+            });
+        });
+        if (changed) {
+            const scrollState = captureScrollState();
+            renderPlaylists(currentData.playlists || []);
+            restoreScrollState(scrollState);
+        }
+    }
+
+    function applyJobEvent({ job, summary }) {
+        if (!currentData) return scheduleReconcile(0);
+        const queue = currentData.queue || (currentData.queue = []);
+        const index = queue.findIndex(candidate => candidate.id === job.id);
+        if (index >= 0) {
+            queue[index] = job;
+        } else {
+            queue.push(job);
+            if (queue.length > LIST_LIMIT) queue.shift();
+        }
+        Object.assign(currentData.summary || (currentData.summary = {}), summary || {});
+        renderSummary(currentData.summary);
+        renderQueue(queue);
+        updateStatusLine();
+        if (['queued', 'running'].includes(job.status)) {
+            patchItemRows(job.video_id, { status: job.status });
+        }
+        scheduleReconcile();
+    }
+
+    function applyItemEvent(item) {
+        if (!currentData) return scheduleReconcile(0);
+        patchItemRows(item.video_id, {
+            status: item.status,
+            filename: item.filename,
+            failure_reason: item.failure_reason
+        });
+        const trash = (currentData.trash || []).filter(entry => entry.video_id !== item.video_id);
+        if (item.status === 'trashed') {
+            trash.push(item);
+        }
+        currentData.trash = trash;
+        renderTrash(trash);
+        scheduleReconcile();
+    }
+
+    function connectEvents() {
+        if (!window.EventSource) {
+            startPolling();
+            return;
+        }
+        eventSource = new EventSource('/api/manage/events');
+        // EventSource reconnects on its own; poll only while it is down, then catch up once.
+        eventSource.addEventListener('open', () => {
+            stopPolling();
+            loadManage();
+        });
+        eventSource.addEventListener('error', startPolling);
+        eventSource.addEventListener('job', e => applyJobEvent(JSON.parse(e.data)));
+        eventSource.addEventListener('item', e => applyItemEvent(JSON.parse(e.data)));
+        eventSource.addEventListener('snapshot', () => scheduleReconcile(0));
+        eventSource.addEventListener('resync', () => scheduleReconcile(0));
+    }
+
+    function panelFor(key) {
+        if (!panelState[key]) {
+            panelState[key] = { open: false, status: '', limit: PAGE_SIZE, rendered: null };
+        }
+        return panelState[key];
+    }
+
+    async function loadOpenPanels(playlists) {
+        const changed = await Promise.all(playlists.map(async pl => {
+            const panel = panelFor(pl.key);
+            if (!panel.open) {
+                const wasShown = Boolean(panel.rendered);
+                panel.rendered = null;
+                return wasShown;
+            }
+            const params = new URLSearchParams({ playlist: pl.index, limit: panel.limit, queue_limit: 0, trash_limit: 0 });
+            if (panel.status) params.set('status', panel.status);
+            const page = await getCached(`/api/manage?${params}`);
+            const rows = (page.data.playlists || [])[0] || {};
+            pl.items = rows.items || [];
+            pl.matched = rows.matched || 0;
+            const fresh = page.changed || panel.rendered !== params.toString();
+            panel.rendered = params.toString();
+            return fresh;
+        }));
+        return changed.some(Boolean);
+    }
+
     function captureScrollState() {
         const tableScroll = {};
         document.querySelectorAll('.playlist-panel[data-playlist-key]').forEach(panel => {
@@ -130,10 +292,12 @@ document.addEventListener('DOMContentLoaded', () => {
                     <div class="item-title">${esc(job.title || job.video_id)}</div>
                     <div class="item-meta">
                         ${badge(job.status)} ${esc(job.action || '')} · ${esc(job.video_id)}
+                        ${job.status === 'queued' && job.priority ? ` · 우선순위 ${esc(job.priority)}` : ''}
                         ${job.error ? ` · <span class="error-text">${esc(job.error)}</span>` : ''}
                     </div>
                 </div>
                 <div class="row-actions">
+                    ${job.status === 'queued' ? `<button class="tiny-button" data-bump-job="${esc(job.id)}">먼저</button>` : ''}
                     ${['queued', 'running'].includes(job.status) ? `<button class="tiny-button danger" data-cancel-job="${esc(job.id)}">취소/중지</button>` : ''}
                 </div>
             </div>
@@ -153,14 +317,36 @@ document.addEventListener('DOMContentLoaded', () => {
                         <div class="item-meta">${esc(pl.folder || '')}</div>
                         <div class="item-meta">최근 스캔: ${esc(pl.last_scanned_at || '없음')}</div>
                     </div>
-                    <button class="tiny-button" data-refresh-playlist="${esc(pl.index)}">수동 갱신</button>
+                    <div class="row-actions">
+                        <button class="tiny-button" data-toggle-panel="${esc(pl.key)}">${panelFor(pl.key).open ? '접기' : '항목 보기'}</button>
+                        <button class="tiny-button" data-refresh-playlist="${esc(pl.index)}">수동 갱신</button>
+                        ${(pl.counts?.missing || pl.counts?.failed) ? `<button class="tiny-button" data-bulk-enqueue="${esc(pl.index)}">누락/실패 모두 받기</button>` : ''}
+                    </div>
                 </div>
                 ${renderCounts(pl.counts || {})}
-                ${renderItemsTable(pl.items || [])}
+                ${panelFor(pl.key).open ? renderPanelRows(pl) : ''}
             </article>
         `).join('');
     }
 
+    function renderPanelRows(pl) {
+        const panel = panelFor(pl.key);
+        const options = statusFilters.map(([value, label]) => `
+            <option value="${esc(value)}" ${panel.status === value ? 'selected' : ''}>${esc(label)}</option>
+        `).join('');
+        const items = pl.items || [];
+        const more = items.length < (pl.matched || 0)
+            ? `<button class="tiny-button" data-more-rows="${esc(pl.key)}">더 보기 (${items.length}/${esc(pl.matched)})</button>`
+            : '';
+        return `
+            <div class="row-actions">
+                <select data-status-filter="${esc(pl.key)}">${options}</select>
+            </div>
+            ${renderItemsTable(items, pl.count ? '조건에 맞는 항목이 없습니다.' : '')}
+            ${more}
+        `;
+    }
+
     function renderCounts(counts) {
         const entries = Object.entries(counts);
         if (!entries.length) {
@@ -171,9 +357,9 @@ document.addEventListener('DOMContentLoaded', () => {
         `).join('')}</div>`;
     }
 
-    function renderItemsTable(items) {
+    function renderItemsTable(items, emptyText) {
         if (!items.length) {
-            return '<div class="empty-state compact">스냅샷 없음. 수동 갱신을 눌러 현재 상태를 가져오세요.</div>';
+            return `<div class="empty-state compact">${esc(emptyText || '스냅샷 없음. 수동 갱신을 눌러 현재 상태를 가져오세요.')}</div>`;
         }
         return `
             <div class="manage-table-wrap">
@@ -242,7 +428,11 @@ document.addEventListener('DOMContentLoaded', () => {
             trashEl.innerHTML = '<div class="empty-state">휴지통이 비어 있습니다.</div>';
             return;
         }
-        trashEl.innerHTML = trash.map(item => `
+        trashEl.innerHTML = `
+            <div class="row-actions">
+                <button class="tiny-button" data-restore-all>표시된 항목 모두 복원</button>
+            </div>
+        ` + trash.map(item => `
             <div class="queue-item">
                 <div>
                     <div class="item-title">${esc(item.title || item.filename || item.video_id)}</div>
@@ -262,6 +452,14 @@ document.addEventListener('DOMContentLoaded', () => {
         return `<span class="item-status status-${cls}">${esc(statusLabels[status] || status || '알 수 없음')}</span>`;
     }
 
+    async function bulkAction(path, body) {
+        const result = await api(path, { method: 'POST', body: JSON.stringify(body) });
+        if (result.failed) {
+            const errors = result.results.filter(r => !r.ok).slice(0, 10);
+            alert(`${result.ok}개 성공, ${result.failed}개 실패\n` + errors.map(r => `${r.video_id}: ${r.error}`).join('\n'));
+        }
+    }
+
     async function mutate(button, fn) {
         const oldText = button.textContent;
         button.disabled = true;
@@ -280,7 +478,27 @@ document.addEventListener('DOMContentLoaded', () => {
     document.addEventListener('click', (e) => {
         const button = e.target.closest('button');
         if (!button) return;
-        if (button.dataset.refreshPlaylist !== undefined) {
+        if (button.dataset.togglePanel) {
+            const panel = panelFor(button.dataset.togglePanel);
+            panel.open = !panel.open;
+            loadManage();
+        } else if (button.dataset.moreRows) {
+            panelFor(button.dataset.moreRows).limit += PAGE_SIZE;
+            mutate(button, async () => {});
+        } else if (button.dataset.bulkEnqueue !== undefined) {
+            mutate(button, () => bulkAction('/api/manage/bulk/enqueue', { playlist: Number(button.dataset.bulkEnqueue) }));
+        } else if (button.dataset.restoreAll !== undefined) {
+            const ids = (currentData?.trash || []).map(item => item.video_id);
+            if (!ids.length || !confirm(`${ids.length}개 항목을 복원할까요?`)) return;
+            mutate(button, () => bulkAction('/api/manage/bulk/restore', { video_ids: ids }));
+        } else if (button.dataset.refreshAllPlaylists !== undefined) {
+            mutate(button, async () => {
+                const result = await api('/api/manage/playlists/refresh', { method: 'POST' });
+                if (result.errors?.length) {
+                    alert(result.errors.map(err => `#${err.index + 1}: ${err.error}`).join('\n'));
+                }
+            });
+        } else if (button.dataset.refreshPlaylist !== undefined) {
             mutate(button, () => api(`/api/manage/playlists/${button.dataset.refreshPlaylist}/refresh`, { method: 'POST' }));
         } else if (button.dataset.enqueue) {
             mutate(button, () => api(`/api/manage/items/${button.dataset.enqueue}/enqueue`, {
@@ -292,13 +510,27 @@ document.addEventListener('DOMContentLoaded', () => {
             mutate(button, () => api(`/api/manage/items/${button.dataset.trash}/trash`, { method: 'POST' }));
         } else if (button.dataset.restore) {
             mutate(button, () => api(`/api/manage/items/${button.dataset.restore}/restore`, { method: 'POST' }));
+        } else if (button.dataset.bumpJob) {
+            mutate(button, () => api(`/api/manage/queue/${button.dataset.bumpJob}/bump`, { method: 'POST' }));
         } else if (button.dataset.cancelJob) {
             mutate(button, () => api(`/api/manage/queue/${button.dataset.cancelJob}/cancel`, { method: 'POST' }));
         }
     });
 
+    document.addEventListener('change', (e) => {
+        const select = e.target.closest('select[data-status-filter]');
+        if (!select) return;
+        const panel = panelFor(select.dataset.statusFilter);
+        panel.status = select.value;
+        panel.limit = PAGE_SIZE;
+        loadManage();
+    });
+
     reloadBtn.addEventListener('click', loadManage);
     loadManage();
-    refreshTimer = setInterval(loadManage, 3000);
-    window.addEventListener('beforeunload', () => clearInterval(refreshTimer));
+    connectEvents();
+    window.addEventListener('beforeunload', () => {
+        stopPolling();
+        if (eventSource) eventSource.close();
+    });
 });
@@ -4,8 +4,10 @@ document.addEventListener('DOMContentLoaded', () => {
     const logContainer = document.getElementById('logContainer');
     const statusBadge = document.getElementById('statusBadge');
     const statusText = document.getElementById('statusText');
+    const syncProgress = document.getElementById('syncProgress');
 
     let eventSource = null;
+    let progress = null;
 
     runBtn.addEventListener('click', () => {
         startSync();
@@ -49,6 +51,12 @@ document.addEventListener('DOMContentLoaded', () => {
             addLog('normal', event.data);
         };
 
+        // Structured engine events (in-process runner only)
+        progress = null;
+        eventSource.addEventListener('progress', (event) => {
+            updateProgress(JSON.parse(event.data));
+        });
+
         eventSource.onerror = function() {
             // Only fire if connection died unexpectedly
             addLog('error', '[오류] 서버와의 연결이 끊어졌습니다.');
@@ -56,11 +64,62 @@ document.addEventListener('DOMContentLoaded', () => {
         };
     }
 
+    function formatBytes(bytes) {
+        if (!bytes) return '0B';
+        const units = ['B', 'KB', 'MB', 'GB'];
+        let value = bytes;
+        let unit = 0;
+        while (value >= 1024 && unit < units.length - 1) {
+            value /= 1024;
+            unit += 1;
+        }
+        return `${value.toFixed(unit ? 1 : 0)}${units[unit]}`;
+    }
+
+    function formatSeconds(seconds) {
+        const total = Math.max(0, Math.round(seconds || 0));
+        return `${Math.floor(total / 60)}:${String(total % 60).padStart(2, '0')}`;
+    }
+
+    function updateProgress(event) {
+        if (event.type === 'playlist_started') {
+            progress = { playlist: event.playlist, index: event.index + 1, count: event.count, total: null, checked: 0, download: null };
+        }
+        if (!progress) return;
+        if (event.type === 'playlist_fetched') {
+            progress.total = event.total;
+        } else if (event.type === 'item_decided') {
+            progress.checked += 1;
+        } else if (event.type === 'download_progress') {
+            progress.download = event;
+        } else if (event.type === 'download_finished') {
+            progress.download = null;
+        } else if (event.type === 'sync_finished') {
+            syncProgress.hidden = true;
+            progress = null;
+            return;
+        }
+
+        const parts = [`플레이리스트 ${progress.index}/${progress.count} · ${progress.playlist}`];
+        parts.push(progress.total == null ? `${progress.checked}개 확인` : `${progress.checked}/${progress.total} 확인`);
+        const download = progress.download;
+        if (download) {
+            const percent = download.total_bytes ? Math.floor(100 * download.downloaded_bytes / download.total_bytes) : null;
+            let text = `다운로드 ${percent == null ? formatBytes(download.downloaded_bytes) : percent + '%'}`;
+            if (download.speed) text += ` · ${formatBytes(download.speed)}/s`;
+            if (download.eta != null) text += ` · 남은 시간 ${formatSeconds(download.eta)}`;
+            parts.push(text);
+        }
+        syncProgress.textContent = parts.join(' · ');
+        syncProgress.hidden = false;
+    }
+
     function stopSync(isError = false) {
         if (eventSource) {
             eventSource.close();
             eventSource = null;
         }
+        syncProgress.hidden = true;
 
         runBtn.style.display = 'inline-block';
         stopBtn.style.display = 'none';
@@ -161,17 +220,45 @@ document.addEventListener('DOMContentLoaded', () => {
     });
 
     // --- History Logic ---
-    function fetchHistory() {
-        fetch('/api/history?t=' + new Date().getTime())
-            .then(res => res.json())
-            .then(data => {
-                // Data is now an ordered array [{id, filename}, ...] from backend
-                fullHistory = data;
+    // Pages of HISTORY_PAGE_SIZE rows, newest first; search runs on the server across all history.
+    const HISTORY_PAGE_SIZE = 50;
+    const historyMoreBtn = document.getElementById('historyMoreBtn');
+    let historyEtag = null;
+    let historyNextAfter = null;
+    let historyQuery = '';
+    let historySearchTimer = null;
+
+    function historyUrl(after) {
+        const params = new URLSearchParams({ limit: HISTORY_PAGE_SIZE });
+        if (after) params.set('after', after);
+        if (historyQuery) params.set('q', historyQuery);
+        return '/api/history?' + params;
+    }
+
+    function fetchHistory(append = false) {
+        const headers = !append && historyEtag ? { 'If-None-Match': historyEtag } : {};
+        fetch(historyUrl(append ? historyNextAfter : null), { cache: 'no-store', headers })
+            .then(res => {
+                if (res.status === 304) {
+                    return null; // unchanged since the last fetch; keep fullHistory
+                }
+                if (!append) historyEtag = res.headers.get('ETag');
+                return res.json();
+            })
+            .then(page => {
+                if (page !== null) {
+                    fullHistory = append ? fullHistory.concat(page.items) : page.items;
+                    historyNextAfter = page.next_after;
+                }
                 renderHistory(fullHistory);
             })
             .catch(err => console.error('Error fetching history:', err));
     }
 
+    if (historyMoreBtn) {
+        historyMoreBtn.addEventListener('click', () => fetchHistory(true));
+    }
+
     const clearHistoryBtn = document.getElementById('clearHistoryBtn');
     if (clearHistoryBtn) {
         clearHistoryBtn.addEventListener('click', () => {
@@ -180,6 +267,8 @@ document.addEventListener('DOMContentLoaded', () => {
                     .then(res => res.json())
                     .then(data => {
                         if (data.status === 'success') {
+                            historyEtag = null;
+                            historyNextAfter = null;
                             fullHistory = [];
                             renderHistory([]);
                         } else {
@@ -192,6 +281,9 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 
     function renderHistory(items) {
+        if (historyMoreBtn) {
+            historyMoreBtn.style.display = historyNextAfter ? '' : 'none';
+        }
         historyTableBody.innerHTML = '';
         if (items.length === 0) {
             historyTableBody.innerHTML = '<tr><td colspan="2" style="text-align:center; padding: 2rem; color: #888;">기록이 없습니다.</td></tr>';
@@ -209,12 +301,12 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 
     historySearch.addEventListener('input', (e) => {
-        const searchTerm = e.target.value.toLowerCase();
-        const filtered = fullHistory.filter(item => 
-            item.id.toLowerCase().includes(searchTerm) || 
-            item.filename.toLowerCase().includes(searchTerm)
-        );
-        renderHistory(filtered);
+        clearTimeout(historySearchTimer);
+        historySearchTimer = setTimeout(() => {
+            historyQuery = e.target.value.trim();
+            historyEtag = null;
+            fetchHistory();
+        }, 250);
     });
 
     // --- Config Logic ---
@@ -265,11 +357,52 @@ document.addEventListener('DOMContentLoaded', () => {
                     nextRunDisplay.textContent = '비활성';
                 }
 
+                renderRecentRuns(data.recent_runs || []);
                 renderPlaylists(data.playlists || []);
             })
             .catch(err => alert('설정을 불러오는 중 오류가 발생했습니다: ' + err));
     }
 
+    const PHASE_LABELS = {
+        playlist_fetch: '목록 조회',
+        playlist_wait: '목록 대기',
+        folder_scan: '폴더 스캔',
+        matching: '매칭',
+        download: '다운로드',
+        postprocess: '후처리',
+        state_save: '상태 저장'
+    };
+
+    function renderRecentRuns(runs) {
+        const container = document.getElementById('recentRuns');
+        container.innerHTML = '';
+        if (!runs.length) {
+            const empty = document.createElement('div');
+            empty.className = 'recent-run empty';
+            empty.textContent = '기록 없음';
+            container.appendChild(empty);
+            return;
+        }
+        runs.slice(-5).reverse().forEach(run => {
+            const row = document.createElement('div');
+            row.className = `recent-run${run.ok ? '' : ' failed'}`;
+            const finished = run.finished_at ? new Date(run.finished_at).toLocaleString() : '-';
+            const counts = run.counts || {};
+            const parts = [finished];
+            if (run.seconds != null) parts.push(formatSeconds(run.seconds));
+            if (!run.ok) {
+                parts.push(`실패: ${run.error || ''}`);
+            } else {
+                parts.push(`새 다운로드 ${counts.downloaded || 0} · 실패 ${counts.failed || 0}`);
+                const slowest = Object.entries(run.phases || {}).sort((a, b) => b[1].seconds - a[1].seconds)[0];
+                if (slowest) parts.push(`최장 ${PHASE_LABELS[slowest[0]] || slowest[0]} ${formatSeconds(slowest[1].seconds)}`);
+                if (run.cancelled) parts.push('중지됨');
+            }
+            row.textContent = parts.join(' · ');
+            container.appendChild(row);
+        });
+    }
+
     function renderPlaylists(playlists) {
         playlistContainer.innerHTML = '';
         playlists.forEach((pl, index) => addPlaylistItem(pl, index));